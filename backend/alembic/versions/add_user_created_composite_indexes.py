@@ -0,0 +1,51 @@
+"""Add composite (owner, created_at DESC) indexes on queries and performance_metrics
+
+Revision ID: add_user_created_composite_indexes
+Revises: partition_time_series_tables
+Create Date: 2025-11-15
+
+Reemplaza los índices separados ix_queries_user_id y
+ix_performance_metrics_query_id por índices compuestos ordenados por
+created_at DESC, que sirven "últimos N registros de un usuario/query" con
+un único range scan. En PostgreSQL se agregan columnas INCLUDE para que
+el índice sea covering y se evite el acceso al heap.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_created_composite_indexes'
+down_revision: Union[str, Sequence[str], None] = 'partition_time_series_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - create composite indexes, drop single-column ones."""
+    op.create_index(
+        'ix_queries_user_created',
+        'queries',
+        ['user_id', sa.text('created_at DESC')],
+        postgresql_include=['cache_hit', 'response_time_ms']
+    )
+    op.drop_index('ix_queries_user_id', 'queries')
+
+    op.create_index(
+        'ix_performance_metrics_query_created',
+        'performance_metrics',
+        ['query_id', sa.text('created_at DESC')],
+        postgresql_include=['cache_hit', 'total_time_ms']
+    )
+    op.drop_index('ix_performance_metrics_query_id', 'performance_metrics')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore single-column indexes."""
+    op.create_index('ix_performance_metrics_query_id', 'performance_metrics', ['query_id'])
+    op.drop_index('ix_performance_metrics_query_created', 'performance_metrics')
+
+    op.create_index('ix_queries_user_id', 'queries', ['user_id'])
+    op.drop_index('ix_queries_user_created', 'queries')
@@ -0,0 +1,38 @@
+"""Add partial index on user.locked_until
+
+Revision ID: add_user_locked_until_partial_index
+Revises: drop_queries_query_text_index
+Create Date: 2025-11-15
+
+Listar usuarios bloqueados (WHERE locked_until > now()) recorría toda la
+tabla user. El índice es parcial (locked_until IS NOT NULL): solo contiene
+las cuentas con bloqueo registrado, por lo que es mínimo y casi no tiene
+costo de mantenimiento.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_locked_until_partial_index'
+down_revision: Union[str, Sequence[str], None] = 'drop_queries_query_text_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - create ix_user_locked_until."""
+    op.create_index(
+        'ix_user_locked_until',
+        'user',
+        ['locked_until'],
+        postgresql_where=sa.text('locked_until IS NOT NULL'),
+        sqlite_where=sa.text('locked_until IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop ix_user_locked_until."""
+    op.drop_index('ix_user_locked_until', 'user')
@@ -0,0 +1,58 @@
+"""Use BRIN for created_at indexes on append-only tables (PostgreSQL)
+
+Revision ID: brin_created_at_indexes
+Revises: add_user_locked_until_partial_index
+Create Date: 2025-11-15
+
+queries, performance_metrics y generated_content solo reciben INSERTs con
+created_at creciente, así que el orden físico coincide con el temporal. En
+PostgreSQL los índices B-tree sobre created_at se reemplazan por BRIN
+(resumen por rango de bloques): ocupan KB en lugar de GB y cada INSERT
+actualiza un resumen en vez de una hoja de B-tree.
+
+En SQLite (sin BRIN) se mantienen los índices B-tree actuales.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'brin_created_at_indexes'
+down_revision: Union[str, Sequence[str], None] = 'add_user_locked_until_partial_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre del índice, tabla)
+CREATED_AT_INDEXES = [
+    ('ix_queries_created_at', 'queries'),
+    ('ix_performance_metrics_created_at', 'performance_metrics'),
+    ('ix_generated_content_created_at', 'generated_content'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - B-tree -> BRIN on created_at (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for index_name, table in CREATED_AT_INDEXES:
+        op.drop_index(index_name, table)
+        op.create_index(
+            index_name,
+            table,
+            ['created_at'],
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema - BRIN -> B-tree on created_at (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for index_name, table in CREATED_AT_INDEXES:
+        op.drop_index(index_name, table)
+        op.create_index(index_name, table, ['created_at'])
@@ -0,0 +1,73 @@
+"""Store content_json as JSONB with a GIN index (PostgreSQL)
+
+Revision ID: content_json_jsonb
+Revises: document_generated_content_composite_indexes
+Create Date: 2025-11-15
+
+JSON guarda el texto tal cual y lo re-parsea en cada lectura; JSONB guarda
+una forma binaria ya parseada y permite indexar consultas de contención
+(@>). generated_content y learning_paths se leen mucho más de lo que se
+escriben, así que content_json pasa a JSONB en ambas tablas.
+
+generated_content además recibe un índice GIN (jsonb_path_ops) sobre
+content_json para las búsquedas por claves del contenido cacheado.
+
+En SQLite (sin JSONB) content_json sigue siendo JSON y no se crea el índice.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'content_json_jsonb'
+down_revision: Union[str, Sequence[str], None] = 'document_generated_content_composite_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CONTENT_JSON_TABLES = ['generated_content', 'learning_paths']
+
+
+def upgrade() -> None:
+    """Upgrade schema - JSON -> JSONB + GIN index (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in CONTENT_JSON_TABLES:
+        op.alter_column(
+            table,
+            'content_json',
+            existing_type=sa.JSON(),
+            type_=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using='content_json::jsonb'
+        )
+
+    op.create_index(
+        'ix_generated_content_content_json',
+        'generated_content',
+        ['content_json'],
+        postgresql_using='gin',
+        postgresql_ops={'content_json': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - JSONB -> JSON (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_generated_content_content_json', 'generated_content')
+
+    for table in CONTENT_JSON_TABLES:
+        op.alter_column(
+            table,
+            'content_json',
+            existing_type=postgresql.JSONB(),
+            type_=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using='content_json::json'
+        )
@@ -0,0 +1,58 @@
+"""Add composite indexes for document listing and generated_content cache lookups
+
+Revision ID: document_generated_content_composite_indexes
+Revises: generated_content_keyset_index
+Create Date: 2025-11-15
+
+El listado de documentos filtra por category y ordena por upload_date DESC
+con LIMIT/OFFSET. Con índices separados el planificador elige uno y ordena
+en memoria; con el compuesto (category, upload_date DESC) la consulta es un
+range scan de LIMIT filas sin ordenamiento. Reemplaza a ix_documents_category,
+que es prefijo del compuesto.
+
+Las búsquedas de caché y el listado admin de generated_content filtran por
+document_id, content_type y deleted_at. El compuesto
+(document_id, content_type, deleted_at) reemplaza a
+ix_generated_content_document_id por el mismo motivo.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'document_generated_content_composite_indexes'
+down_revision: Union[str, Sequence[str], None] = 'generated_content_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - composite indexes replace their leading-column indexes."""
+    op.create_index(
+        'ix_documents_category_upload_date',
+        'documents',
+        ['category', sa.text('upload_date DESC')]
+    )
+    op.drop_index('ix_documents_category', 'documents')
+
+    op.create_index(
+        'ix_generated_content_doc_type_deleted',
+        'generated_content',
+        ['document_id', 'content_type', 'deleted_at']
+    )
+    op.drop_index('ix_generated_content_document_id', 'generated_content')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore single-column indexes."""
+    op.create_index(
+        'ix_generated_content_document_id',
+        'generated_content',
+        ['document_id']
+    )
+    op.drop_index('ix_generated_content_doc_type_deleted', 'generated_content')
+
+    op.create_index('ix_documents_category', 'documents', ['category'])
+    op.drop_index('ix_documents_category_upload_date', 'documents')
@@ -0,0 +1,47 @@
+"""Add id to the documents (category, upload_date) index for keyset pagination
+
+Revision ID: document_keyset_index
+Revises: content_json_jsonb
+Create Date: 2025-11-15
+
+El listado de documentos pagina por keyset con
+WHERE (upload_date, id) < (:ts, :id) ORDER BY upload_date DESC, id DESC.
+id es el desempate del orden; sin él en el índice compuesto, las filas con
+la misma upload_date se reordenan en memoria. El índice
+(category, upload_date DESC, id DESC) reemplaza a
+ix_documents_category_upload_date.
+
+Sin filtro por categoría el orden lo sirve ix_documents_upload_date recorrido
+en sentido inverso (id es la clave de fila), así que se mantiene.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'document_keyset_index'
+down_revision: Union[str, Sequence[str], None] = 'content_json_jsonb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add id DESC to the category listing index."""
+    op.create_index(
+        'ix_documents_category_upload_date_id',
+        'documents',
+        ['category', sa.text('upload_date DESC'), sa.text('id DESC')]
+    )
+    op.drop_index('ix_documents_category_upload_date', 'documents')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore ix_documents_category_upload_date."""
+    op.create_index(
+        'ix_documents_category_upload_date',
+        'documents',
+        ['category', sa.text('upload_date DESC')]
+    )
+    op.drop_index('ix_documents_category_upload_date_id', 'documents')
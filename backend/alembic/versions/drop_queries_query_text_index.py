@@ -0,0 +1,31 @@
+"""Drop B-tree index on queries.query_text
+
+Revision ID: drop_queries_query_text_index
+Revises: fts5_external_content_triggers
+Create Date: 2025-11-15
+
+query_text es texto libre de hasta 500 caracteres que solo se escribe para
+auditoría; ninguna consulta filtra por igualdad exacta sobre esa columna.
+El índice ix_queries_query_text solo agregaba una actualización de B-tree
+por cada INSERT en queries.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'drop_queries_query_text_index'
+down_revision: Union[str, Sequence[str], None] = 'fts5_external_content_triggers'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - drop ix_queries_query_text."""
+    op.drop_index('ix_queries_query_text', 'queries')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore ix_queries_query_text."""
+    op.create_index('ix_queries_query_text', 'queries', ['query_text'])
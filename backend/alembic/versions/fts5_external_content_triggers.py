@@ -0,0 +1,146 @@
+"""Use true external-content FTS5 for documents_fts
+
+Revision ID: fts5_external_content_triggers
+Revises: add_user_created_composite_indexes
+Create Date: 2025-11-15
+
+documents_fts se declaraba con content='documents' pero con una columna
+propia document_id y triggers que hacían UPDATE/DELETE directos sobre la
+tabla virtual, lo que no es válido para tablas external-content.
+
+Esta migración recrea documents_fts como external-content real:
+- rowid de FTS5 = documents.id (ya no existe la columna document_id)
+- FTS5 no guarda copia del texto; snippet() lee desde documents
+- Triggers con el comando 'delete' de FTS5 según la documentación de SQLite
+- El trigger UPDATE solo se dispara cuando cambian title/content_text/category
+
+Se mantiene la regla de indexar solo documentos con content_text extraído,
+por eso el backfill usa INSERT ... SELECT filtrado en lugar de 'rebuild'
+(que indexaría todas las filas de documents).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fts5_external_content_triggers'
+down_revision: Union[str, Sequence[str], None] = 'add_user_created_composite_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drop_fts() -> None:
+    op.execute("DROP TRIGGER IF EXISTS documents_ad")
+    op.execute("DROP TRIGGER IF EXISTS documents_au")
+    op.execute("DROP TRIGGER IF EXISTS documents_ai")
+    op.execute("DROP TABLE IF EXISTS documents_fts")
+
+
+def upgrade() -> None:
+    """Recrea documents_fts como external-content con triggers 'delete'."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _drop_fts()
+
+    op.execute("""
+        CREATE VIRTUAL TABLE documents_fts USING fts5(
+            title,
+            content_text,
+            category,
+            content='documents',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+
+    # Trigger INSERT: indexar solo documentos con content_text
+    op.execute("""
+        CREATE TRIGGER documents_ai AFTER INSERT ON documents
+        WHEN new.content_text IS NOT NULL
+        BEGIN
+            INSERT INTO documents_fts(rowid, title, content_text, category)
+            VALUES (new.id, new.title, new.content_text, new.category);
+        END
+    """)
+
+    # Trigger UPDATE: quitar valores antiguos (si estaban indexados) y agregar nuevos
+    op.execute("""
+        CREATE TRIGGER documents_au AFTER UPDATE OF title, content_text, category ON documents
+        BEGIN
+            INSERT INTO documents_fts(documents_fts, rowid, title, content_text, category)
+            SELECT 'delete', old.id, old.title, old.content_text, old.category
+            WHERE old.content_text IS NOT NULL;
+            INSERT INTO documents_fts(rowid, title, content_text, category)
+            SELECT new.id, new.title, new.content_text, new.category
+            WHERE new.content_text IS NOT NULL;
+        END
+    """)
+
+    # Trigger DELETE: quitar del índice si estaba indexado
+    op.execute("""
+        CREATE TRIGGER documents_ad AFTER DELETE ON documents
+        WHEN old.content_text IS NOT NULL
+        BEGIN
+            INSERT INTO documents_fts(documents_fts, rowid, title, content_text, category)
+            VALUES ('delete', old.id, old.title, old.content_text, old.category);
+        END
+    """)
+
+    # Backfill en una sola sentencia
+    op.execute("""
+        INSERT INTO documents_fts(rowid, title, content_text, category)
+        SELECT id, title, content_text, category
+        FROM documents
+        WHERE content_text IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Restaura documents_fts con columna document_id (f24f93ff1ff8)."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _drop_fts()
+
+    op.execute("""
+        CREATE VIRTUAL TABLE documents_fts USING fts5(
+            document_id UNINDEXED,
+            title,
+            content_text,
+            category,
+            content='documents',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER documents_ai AFTER INSERT ON documents
+        WHEN new.content_text IS NOT NULL
+        BEGIN
+            INSERT INTO documents_fts(document_id, title, content_text, category)
+            VALUES (new.id, new.title, new.content_text, new.category);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER documents_au AFTER UPDATE ON documents BEGIN
+            UPDATE documents_fts
+            SET title = new.title,
+                content_text = new.content_text,
+                category = new.category
+            WHERE document_id = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER documents_ad AFTER DELETE ON documents BEGIN
+            DELETE FROM documents_fts WHERE document_id = old.id;
+        END
+    """)
+    op.execute("""
+        INSERT INTO documents_fts(document_id, title, content_text, category)
+        SELECT id, title, content_text, category
+        FROM documents
+        WHERE content_text IS NOT NULL
+    """)
@@ -0,0 +1,50 @@
+"""Add (created_at DESC, id DESC) index on generated_content for keyset pagination
+
+Revision ID: generated_content_keyset_index
+Revises: partition_auditlog_weekly
+Create Date: 2025-11-15
+
+El listado admin de contenido generado pagina con ORDER BY created_at DESC
+OFFSET N, cuyo costo crece con la profundidad de la página. Con el índice
+compuesto (created_at DESC, id DESC) la paginación por keyset
+(WHERE (created_at, id) < (:ts, :id)) es un range scan de M filas.
+
+El índice compuesto reemplaza a ix_generated_content_created_at: también
+sirve los filtros por rango de fechas del mismo listado.
+
+queries y performance_metrics no tienen listados paginados y mantienen su
+índice sobre created_at (BRIN en PostgreSQL).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'generated_content_keyset_index'
+down_revision: Union[str, Sequence[str], None] = 'partition_auditlog_weekly'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - composite keyset index replaces created_at index."""
+    op.create_index(
+        'ix_generated_content_created_id',
+        'generated_content',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.drop_index('ix_generated_content_created_at', 'generated_content')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore ix_generated_content_created_at."""
+    op.create_index(
+        'ix_generated_content_created_at',
+        'generated_content',
+        ['created_at'],
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32}
+    )
+    op.drop_index('ix_generated_content_created_id', 'generated_content')
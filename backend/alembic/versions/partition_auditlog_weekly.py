@@ -0,0 +1,67 @@
+"""Range-partition auditlog by week with 90-day retention
+
+Revision ID: partition_auditlog_weekly
+Revises: brin_created_at_indexes
+Create Date: 2025-11-15
+
+auditlog es la tabla que más crece bajo tráfico de fuerza bruta (cada login
+fallido escribe una fila). Purgarla con DELETE ... WHERE timestamp < X genera
+bloat MVCC y picos de WAL. En PostgreSQL se convierte en tabla particionada
+por rango sobre timestamp con particiones semanales:
+- La retención pasa a ser DETACH + DROP TABLE de particiones completas
+- maintain_time_partitions() pre-crea las semanas siguientes y elimina las
+  particiones con más de AUDIT_RETENTION_WEEKS semanas
+
+Funciones, reconstrucción y job de mantenimiento son los de
+app/core/partitioning.py, compartidos con partition_time_series_tables. El
+job debe ejecutarse a diario: sin pg_cron la migración lo advierte y hay que
+programarlo fuera de la base de datos; si no, las semanas pre-creadas se
+agotan y la retención se detiene.
+
+Como en las otras tablas particionadas, la PK pasa a ser (id, timestamp).
+
+En SQLite esta migración es un no-op.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.partitioning import (
+    AUDIT_COLUMN,
+    AUDIT_TABLE,
+    AUDIT_WEEKS_AHEAD,
+    create_partition_functions,
+    maintenance_function_sql,
+    rebuild_table,
+    schedule_maintenance,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_auditlog_weekly'
+down_revision: Union[str, Sequence[str], None] = 'brin_created_at_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Particiona auditlog por semana y agrega su retención al mantenimiento."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # Misma definición que instaló partition_time_series_tables
+    create_partition_functions()
+    rebuild_table(bind, AUDIT_TABLE, AUDIT_COLUMN, 'week', AUDIT_WEEKS_AHEAD)
+    op.execute(maintenance_function_sql(with_auditlog=True))
+    schedule_maintenance(bind)
+
+
+def downgrade() -> None:
+    """Vuelve auditlog a tabla plana con PK (id)."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute(maintenance_function_sql(with_auditlog=False))
+    rebuild_table(bind, AUDIT_TABLE, AUDIT_COLUMN, None, AUDIT_WEEKS_AHEAD)
@@ -0,0 +1,116 @@
+"""Range-partition queries and performance_metrics by created_at
+
+Revision ID: partition_time_series_tables
+Revises: add_user_security_fields
+Create Date: 2025-11-15
+
+Estas tablas son append-only y ordenadas por tiempo. En PostgreSQL se
+convierten en tablas particionadas por rango sobre created_at:
+- queries: particiones mensuales
+- performance_metrics: particiones diarias
+
+Se crean las particiones de los próximos PERIODS_AHEAD periodos más una
+partición DEFAULT que recibe las filas históricas. maintain_time_partitions()
+pre-crea los periodos siguientes y debe ejecutarse a diario: se programa con
+pg_cron si está instalado; si no, la migración lo advierte y el job debe
+programarse fuera de la base de datos (ver app/core/partitioning.py). La
+retención se aplica con detach_old_partitions() (DETACH + DROP TABLE en
+lugar de DELETE).
+
+generated_content no se particiona: learning_path_progress.path_id la
+referencia y esa integridad se mantiene.
+
+Restricción de PostgreSQL: la PK de una tabla particionada debe incluir la
+columna de partición, por lo que la PK pasa a ser (id, created_at) y la única
+FK entrante, performance_metrics.query_id -> queries.id, se elimina (y se
+restaura en downgrade). Cualquier otra FK entrante detiene la migración en
+lugar de eliminarse en silencio.
+
+En SQLite esta migración es un no-op (se mantiene el esquema actual).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.partitioning import (
+    PERIODS_AHEAD,
+    TIME_SERIES_COLUMN,
+    TIME_SERIES_TABLES,
+    create_partition_functions,
+    drop_partition_functions,
+    maintenance_function_sql,
+    rebuild_table,
+    schedule_maintenance,
+    unschedule_maintenance,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_time_series_tables'
+down_revision: Union[str, Sequence[str], None] = 'add_user_security_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# FKs entrantes que no pueden existir contra una tabla particionada. Son las
+# únicas que upgrade elimina y las que downgrade restaura:
+# (nombre, tabla, columna, tabla_referida, columna_referida)
+INCOMING_FOREIGN_KEYS = [
+    ('performance_metrics_query_id_fkey', 'performance_metrics', 'query_id', 'queries', 'id'),
+]
+
+
+def _drop_incoming_foreign_keys(bind) -> None:
+    """Elimina INCOMING_FOREIGN_KEYS; falla ante cualquier otra FK hacia una tabla particionada."""
+    partitioned = {table for table, _ in TIME_SERIES_TABLES}
+    expected = {
+        (table, column, referred_table)
+        for _, table, column, referred_table, _ in INCOMING_FOREIGN_KEYS
+    }
+    inspector = sa.inspect(bind)
+    for table_name in inspector.get_table_names():
+        for fk in inspector.get_foreign_keys(table_name):
+            if fk['referred_table'] not in partitioned:
+                continue
+            key = (table_name, fk['constrained_columns'][0], fk['referred_table'])
+            if len(fk['constrained_columns']) != 1 or key not in expected:
+                raise RuntimeError(
+                    f"FK {fk['name']} ({table_name} -> {fk['referred_table']}) impide "
+                    "particionar la tabla referida y no se restauraría en downgrade"
+                )
+            op.drop_constraint(fk['name'], table_name, type_='foreignkey')
+
+
+def upgrade() -> None:
+    """Particiona las tablas de series de tiempo (solo PostgreSQL)."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    create_partition_functions()
+    op.execute(maintenance_function_sql(with_auditlog=False))
+
+    _drop_incoming_foreign_keys(bind)
+
+    for table, period in TIME_SERIES_TABLES:
+        rebuild_table(bind, table, TIME_SERIES_COLUMN, period, PERIODS_AHEAD)
+
+    schedule_maintenance(bind)
+
+
+def downgrade() -> None:
+    """Vuelve a tablas planas con PK (id) y restaura las FKs entrantes eliminadas."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    unschedule_maintenance(bind)
+
+    for table, _ in reversed(TIME_SERIES_TABLES):
+        rebuild_table(bind, table, TIME_SERIES_COLUMN, None, PERIODS_AHEAD)
+
+    for name, table, column, referred_table, referred_column in INCOMING_FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referred_table, [column], [referred_column])
+
+    drop_partition_functions()
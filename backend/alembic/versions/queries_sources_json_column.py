@@ -0,0 +1,56 @@
+"""Store queries.sources_json as JSON instead of a JSON-encoded string
+
+Revision ID: queries_sources_json_column
+Revises: document_keyset_index
+Create Date: 2025-11-16
+
+sources_json se guardaba como VARCHAR con el resultado de json.dumps: la
+aplicación codificaba la lista y la columna no sabía que era JSON. Ahora el
+modelo declara list[dict] con tipo JSON (JSONB en PostgreSQL) y la
+serialización la hace el motor (orjson, ver app.database).
+
+En SQLite JSON se almacena como texto y las filas existentes ya son JSON
+válido, así que no hace falta migrar datos.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'queries_sources_json_column'
+down_revision: Union[str, Sequence[str], None] = 'document_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - VARCHAR -> JSONB (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'queries',
+        'sources_json',
+        existing_type=sa.String(),
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='sources_json::jsonb'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - JSONB -> VARCHAR (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'queries',
+        'sources_json',
+        existing_type=postgresql.JSONB(),
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using='sources_json::text'
+    )
@@ -0,0 +1,45 @@
+"""Add a GIN index on queries.sources_json (PostgreSQL)
+
+Revision ID: queries_sources_json_gin_index
+Revises: queries_sources_json_column
+Create Date: 2025-11-16
+
+Con sources_json en JSONB, las consultas de auditoría por documento fuente
+(sources_json @> '[{"document_id": 3}]') pueden usar un índice GIN en lugar
+de recorrer y parsear cada fila. jsonb_path_ops ocupa menos que el operador
+por defecto y basta para @>.
+
+En SQLite sources_json es texto y no se crea el índice.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'queries_sources_json_gin_index'
+down_revision: Union[str, Sequence[str], None] = 'queries_sources_json_column'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - GIN index on sources_json (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.create_index(
+        'ix_queries_sources_json',
+        'queries',
+        ['sources_json'],
+        postgresql_using='gin',
+        postgresql_ops={'sources_json': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop GIN index (solo PostgreSQL)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_queries_sources_json', 'queries')
@@ -5,18 +5,25 @@ from app.auth.service import AuthService
 from app.middleware.auth import get_current_user
 from app.database import get_session
 from app.models.user import User
+from app.services.audit_service import audit_log_writer
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
+# Endpoint sync: bcrypt y la sesión SQLite son bloqueantes, FastAPI lo
+# ejecuta en el threadpool para no detener el event loop
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     login_data: LoginRequest,
     db: Session = Depends(get_session),
     request: Request = None
 ):
     ip_address = request.client.host if request else None
     auth_service = AuthService(db)
-    return auth_service.authenticate_user(login_data, ip_address=ip_address)
+    token, pending_audit = auth_service.authenticate_user(login_data, ip_address=ip_address)
+
+    # Auditoría LOGIN se escribe en lote, fuera del camino del request
+    audit_log_writer.submit(pending_audit)
+    return token
 
 @router.post("/logout", response_model=SuccessResponse)
 async def logout(
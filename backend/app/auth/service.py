@@ -1,23 +1,50 @@
 import asyncio
-import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import orjson
 from fastapi import HTTPException, status
+from sqlalchemy import bindparam, case, lambda_stmt, update
 from sqlmodel import Session, select
 from app.models.user import User
 from app.models.audit import AuditLog, AuditAction, AuditResourceType
-from app.core.security import verify_password, create_access_token, check_account_locked
+from app.core.security import verify_password, get_password_hash, create_access_token, check_account_locked
 from app.core.config import get_settings
-from app.auth.models import LoginRequest, Token
+from app.auth.models import LoginRequest
+from app.middleware.auth import invalidate_user_cache
 
 logger = logging.getLogger(__name__)
 
+# Constantes de bloqueo de cuenta (Story 5.2), leídas una vez al importar
+_MAX_FAILED_LOGIN_ATTEMPTS = get_settings().max_failed_login_attempts
+_ACCOUNT_LOCKOUT_MINUTES = get_settings().account_lockout_minutes
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """
+    Hash de referencia para igualar el costo de bcrypt cuando el usuario no
+    existe. Se calcula en el primer login con usuario desconocido, no al importar.
+    """
+    return get_password_hash("not-a-real-password")
+
+# Lookup de login: lambda_stmt cachea la construcción y compilación del SELECT
+_USER_BY_USERNAME = lambda_stmt(
+    lambda: select(User).where(User.username == bindparam("username")).limit(1)
+)
+
+# details de LOGIN exitoso: payload constante, se serializa una sola vez
+_LOGIN_SUCCESS_DETAILS = orjson.dumps({"success": True}).decode()
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
-    def authenticate_user(self, login_data: LoginRequest, ip_address: Optional[str] = None) -> Token:
+    def authenticate_user(
+        self,
+        login_data: LoginRequest,
+        ip_address: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Autentica un usuario verificando credenciales y manejo de bloqueo de cuenta.
 
@@ -29,15 +56,25 @@ class AuthService:
         5. Si credenciales inválidas, incrementar failed_login_attempts
         6. Si se alcanza máximo, bloquear cuenta por ACCOUNT_LOCKOUT_MINUTES
         7. Si credenciales válidas, resetear intentos y generar token
-        """
-        settings = get_settings()
 
+        Los intentos fallidos y bloqueos se auditan en la misma transacción que
+        actualiza al usuario. El LOGIN exitoso no se escribe aquí: se retorna
+        como dict pendiente para que la ruta lo persista en background.
+
+        Returns:
+            Tuple[Dict, Dict]: Payload de Token (JWT) y datos de auditoría LOGIN pendientes
+        """
         # AC1: Buscar usuario por username
-        statement = select(User).where(User.username == login_data.username)
-        user = self.db.exec(statement).first()
+        # username es UNIQUE: LIMIT 1 + one_or_none() evita iterar el resultado
+        user = self.db.execute(
+            _USER_BY_USERNAME, {"username": login_data.username}
+        ).scalar_one_or_none()
 
         if not user:
-            # No revelar si usuario existe (seguridad contra enumeración)
+            # No revelar si usuario existe (seguridad contra enumeración):
+            # verificar contra un hash dummy para que el tiempo de respuesta
+            # sea equivalente al de un usuario existente con password incorrecto
+            verify_password(login_data.password, _dummy_password_hash())
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail={
@@ -46,28 +83,32 @@ class AuthService:
                 }
             )
 
+        # Leídos una vez: los atributos instrumentados expiran tras commit()
+        # y volver a leerlos dispararía un SELECT de refresco
+        user_id = user.id
+        role_value = user.role.value
+
         # AC3: Verificar si cuenta está bloqueada ANTES de validar credenciales
         # Esto previene timing attacks
         is_locked = check_account_locked(user)
 
         if is_locked:
             # Cuenta está bloqueada - responder 403 sin validar password
-            now_utc = datetime.now(timezone.utc)
-            # Compatibilidad con datetimes offset-naive de SQLite
-            if user.locked_until.tzinfo is None:
-                now_utc = now_utc.replace(tzinfo=None)
-            remaining_time = (user.locked_until - now_utc).total_seconds() / 60
+            # locked_until se carga siempre aware (ver _UTCDateTime en models.user)
+            remaining_time = (
+                user.locked_until - datetime.now(timezone.utc)
+            ).total_seconds() / 60
 
             # Auditoría: intento en cuenta bloqueada
             audit_log = AuditLog(
-                user_id=user.id,
+                user_id=user_id,
                 action="LOGIN_ATTEMPT_BLOCKED",
                 resource_type=AuditResourceType.USER,
-                resource_id=user.id,
-                details=json.dumps({
+                resource_id=user_id,
+                details=orjson.dumps({
                     "reason": "Account locked",
                     "remaining_minutes": round(remaining_time, 2)
-                }),
+                }).decode(),
                 ip_address=ip_address
             )
             self.db.add(audit_log)
@@ -96,63 +137,82 @@ class AuthService:
         password_valid = verify_password(login_data.password, user.hashed_password)
 
         if not password_valid:
-            # Credenciales inválidas: incrementar failed_login_attempts
-            user.failed_login_attempts += 1
+            # Credenciales inválidas: incremento atómico de failed_login_attempts.
+            # Un solo UPDATE ... RETURNING evita la carrera read-modify-write entre
+            # intentos concurrentes y decide el bloqueo con el contador real en BD.
+            # (autoflush persiste antes el reseteo de check_account_locked, si lo hubo)
+            lock_until = datetime.now(timezone.utc) + timedelta(minutes=_ACCOUNT_LOCKOUT_MINUTES)
+            statement = (
+                update(User)
+                .where(User.id == user_id)
+                .values(
+                    failed_login_attempts=User.failed_login_attempts + 1,
+                    locked_until=case(
+                        (User.failed_login_attempts + 1 >= _MAX_FAILED_LOGIN_ATTEMPTS, lock_until),
+                        else_=User.locked_until
+                    )
+                )
+                .returning(User.failed_login_attempts, User.locked_until)
+                .execution_options(synchronize_session=False)
+            )
+            failed_attempts, locked_until = self.db.execute(statement).one()
 
             # Determinar si se alcanzó el máximo de intentos
-            if user.failed_login_attempts >= settings.max_failed_login_attempts:
-                # AC1 + AC3: Bloquear cuenta por ACCOUNT_LOCKOUT_MINUTES
-                user.locked_until = datetime.now(timezone.utc) + timedelta(minutes=settings.account_lockout_minutes)
-                self.db.add(user)
-                self.db.commit()
+            if failed_attempts >= _MAX_FAILED_LOGIN_ATTEMPTS:
+                # AC1 + AC3: Cuenta bloqueada por ACCOUNT_LOCKOUT_MINUTES
 
-                # Auditoría: ACCOUNT_LOCKED
+                # Auditoría: ACCOUNT_LOCKED (única fila de este intento: implica el
+                # LOGIN_FAILED que disparó el bloqueo, no se escribe por separado)
                 audit_log = AuditLog(
-                    user_id=user.id,
+                    user_id=user_id,
                     action="ACCOUNT_LOCKED",
                     resource_type=AuditResourceType.USER,
-                    resource_id=user.id,
-                    details=json.dumps({
+                    resource_id=user_id,
+                    details=orjson.dumps({
                         "reason": "Max failed attempts exceeded",
-                        "failed_attempts": user.failed_login_attempts,
-                        "lockout_minutes": settings.account_lockout_minutes
-                    }),
+                        "failed_attempts": failed_attempts,
+                        "lockout_minutes": _ACCOUNT_LOCKOUT_MINUTES,
+                        "triggering_attempt": True
+                    }).decode(),
                     ip_address=ip_address
                 )
+                # Una sola transacción: UPDATE de usuario + auditoría
                 self.db.add(audit_log)
                 self.db.commit()
+                # El UPDATE Core no pasa por los eventos ORM de la sesión
+                invalidate_user_cache(user_id)
 
                 # Responder 403 - cuenta bloqueada
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail={
                         "code": "ACCOUNT_LOCKED",
-                        "message": f"Cuenta bloqueada por múltiples intentos fallidos. Intenta en {settings.account_lockout_minutes} minutos.",
-                        "locked_until": user.locked_until.isoformat()
+                        "message": f"Cuenta bloqueada por múltiples intentos fallidos. Intenta en {_ACCOUNT_LOCKOUT_MINUTES} minutos.",
+                        "locked_until": locked_until.isoformat()
                     }
                 )
             else:
                 # AC1: Intentos fallidos < MAX: responder 401 con remaining_attempts
-                self.db.add(user)
-                self.db.commit()
-
-                remaining_attempts = settings.max_failed_login_attempts - user.failed_login_attempts
+                remaining_attempts = _MAX_FAILED_LOGIN_ATTEMPTS - failed_attempts
 
                 # Auditoría: LOGIN_FAILED
                 audit_log = AuditLog(
-                    user_id=user.id,
+                    user_id=user_id,
                     action="LOGIN_FAILED",
                     resource_type=AuditResourceType.USER,
-                    resource_id=user.id,
-                    details=json.dumps({
+                    resource_id=user_id,
+                    details=orjson.dumps({
                         "reason": "Invalid password",
-                        "failed_attempts": user.failed_login_attempts,
+                        "failed_attempts": failed_attempts,
                         "remaining_attempts": remaining_attempts
-                    }),
+                    }).decode(),
                     ip_address=ip_address
                 )
+                # Una sola transacción: UPDATE de usuario + auditoría
                 self.db.add(audit_log)
                 self.db.commit()
+                # El UPDATE Core no pasa por los eventos ORM de la sesión
+                invalidate_user_cache(user_id)
 
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -171,33 +231,31 @@ class AuthService:
 
         self.db.add(user)
         self.db.commit()
-        self.db.refresh(user)
-
-        # Auditoría: LOGIN_SUCCESS
-        audit_log = AuditLog(
-            user_id=user.id,
-            action="LOGIN",
-            resource_type=AuditResourceType.USER,
-            resource_id=user.id,
-            details=json.dumps({
-                "success": True
-            }),
-            ip_address=ip_address
-        )
-        self.db.add(audit_log)
-        self.db.commit()
+
+        # Auditoría: LOGIN_SUCCESS (se persiste fuera del request path)
+        pending_audit = {
+            "user_id": user_id,
+            "action": "LOGIN",
+            "resource_type": AuditResourceType.USER,
+            "resource_id": user_id,
+            "details": _LOGIN_SUCCESS_DETAILS,
+            "ip_address": ip_address
+        }
 
         # Generar token JWT
         token_data = {
-            "sub": str(user.id),
-            "user_id": user.id,
-            "role": user.role.value
+            "sub": str(user_id),
+            "user_id": user_id,
+            "role": role_value
         }
 
         access_token = create_access_token(data=token_data)
 
-        return Token(
-            token=access_token,
-            user_id=user.id,
-            role=user.role.value
-        )
\ No newline at end of file
+        # Dict plano: response_model=Token de la ruta lo valida una sola vez
+        token = {
+            "token": access_token,
+            "user_id": user_id,
+            "role": role_value
+        }
+
+        return token, pending_audit
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Inserción masiva de registros append-only (auditoría, queries, métricas, preguntas).
+
+Usa SQLAlchemy Core (`table.insert()` con executemany) en lugar de
+`session.add()` por fila, evitando el overhead del unit-of-work del ORM
+(identity map, eventos por atributo) cuando se insertan muchas filas.
+"""
+
+from typing import Any, Dict, List, Type
+
+from sqlmodel import Session, SQLModel
+
+
+def bulk_insert(
+    session: Session,
+    model: Type[SQLModel],
+    rows: List[Dict[str, Any]],
+    commit: bool = True
+) -> int:
+    """
+    Inserta múltiples filas de un modelo en una sola sentencia executemany.
+
+    Los defaults de columna (ej. created_at) se aplican por fila igual que
+    con el ORM. Los objetos insertados NO se cargan en la sesión.
+
+    Args:
+        session: Sesión de base de datos
+        model: Clase SQLModel con table=True
+        rows: Lista de dicts {columna: valor}
+        commit: Si True, hace commit al final (una sola transacción)
+
+    Returns:
+        int: Número de filas insertadas
+    """
+    if not rows:
+        return 0
+
+    session.execute(model.__table__.insert(), rows)
+    if commit:
+        session.commit()
+    return len(rows)
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -8,6 +9,25 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Valores aceptados por los validadores; frozenset para lookup O(1) sin
+# reconstruir la colección en cada instanciación de Settings
+_INSECURE_SECRET_KEYS = frozenset({
+    "your-super-secret-jwt-key-change-in-production",
+    "your-secret-key-here-replace-with-secure-random-value-min-64-chars",
+    "secret", "test", "dev", "key",
+})
+_SUPPORTED_DB_SCHEMES = frozenset({"sqlite", "postgresql", "mysql"})
+_VALID_FASTAPI_ENVS = frozenset({"development", "testing", "production"})
+_VALID_HTTPS_ENVS = frozenset({"development", "production"})
+
+
+@lru_cache(maxsize=8)
+def _split_origins(allowed_origins: str) -> tuple[str, ...]:
+    """Separa ALLOWED_ORIGINS por comas una sola vez por valor distinto."""
+    return tuple(
+        origin.strip() for origin in allowed_origins.split(",") if origin.strip()
+    )
+
 
 class Settings(BaseSettings):
     """
@@ -17,11 +37,13 @@ class Settings(BaseSettings):
     Story 5.3: Soporte para cifrado SQLCipher y configuración HTTPS
     """
 
+    # Inmutable tras el arranque: sin revalidación por asignación. Para variar
+    # un valor (p. ej. en tests) usar model_copy(update={...})
     model_config = ConfigDict(
         env_file=".env",
         case_sensitive=False,
         extra="ignore",
-        validate_assignment=True
+        frozen=True
     )
 
     # Database Configuration
@@ -30,6 +52,25 @@ class Settings(BaseSettings):
         description="URL de conexión a la base de datos"
     )
 
+    # Connection pool (solo PostgreSQL/MySQL; SQLite usa el pool por defecto)
+    db_pool_size: int = Field(
+        default=20,
+        ge=1,
+        le=200,
+        description="Conexiones persistentes del pool de base de datos"
+    )
+    db_max_overflow: int = Field(
+        default=10,
+        ge=0,
+        le=200,
+        description="Conexiones extra permitidas sobre db_pool_size en picos de carga"
+    )
+    db_pool_recycle_seconds: int = Field(
+        default=1800,
+        ge=60,
+        description="Segundos tras los cuales se recicla una conexión del pool"
+    )
+
     # Encryption Configuration (Story 5.3)
     db_encryption_key: Optional[str] = Field(
         default=None,
@@ -132,6 +173,10 @@ class Settings(BaseSettings):
         description="Entorno de ejecución (development/production)"
     )
     debug: bool = Field(default=True, description="Modo debug")
+    sql_trace: bool = Field(
+        default=False,
+        description="Registra cada sentencia SQL vía logging (SQL_TRACE=1, solo diagnóstico)"
+    )
     log_level: str = Field(
         default="info",
         description="Nivel de logging (debug/info/warning/error)"
@@ -143,6 +188,11 @@ class Settings(BaseSettings):
         description="Orígenes permitidos para CORS (separados por comas)"
     )
 
+    @property
+    def allowed_origins_list(self) -> tuple[str, ...]:
+        """allowed_origins separado y normalizado (split cacheado por valor)"""
+        return _split_origins(self.allowed_origins)
+
     # Validators
     @field_validator('secret_key')
     @classmethod
@@ -158,13 +208,7 @@ class Settings(BaseSettings):
             )
 
         # Verificar que no sea el valor por defecto inseguro (solo valores completos, no subcadenas)
-        insecure_defaults = [
-            "your-super-secret-jwt-key-change-in-production",
-            "your-secret-key-here-replace-with-secure-random-value-min-64-chars",
-            "secret", "test", "dev", "key"
-        ]
-
-        if v.lower() in insecure_defaults:
+        if v.lower() in _INSECURE_SECRET_KEYS:
             raise ValueError(
                 'SECRET_KEY parece ser un valor inseguro. '
                 'Genera una clave segura con: python -c "import secrets; print(secrets.token_hex(32))"'
@@ -180,12 +224,11 @@ class Settings(BaseSettings):
             raise ValueError('DATABASE_URL es requerido')
 
         # Validar formatos soportados
-        supported_schemes = ['sqlite', 'postgresql', 'mysql']
         scheme = v.split('://')[0] if '://' in v else None
 
-        if not scheme or scheme not in supported_schemes:
+        if not scheme or scheme not in _SUPPORTED_DB_SCHEMES:
             raise ValueError(
-                f'DATABASE_URL debe usar un esquema soportado: {", ".join(supported_schemes)}. '
+                'DATABASE_URL debe usar un esquema soportado: sqlite, postgresql, mysql. '
                 f'Valor actual: {v[:50]}...'
             )
 
@@ -211,10 +254,9 @@ class Settings(BaseSettings):
     @classmethod
     def validate_environment(cls, v):
         """Validador para entorno de ejecución"""
-        valid_envs = ['development', 'testing', 'production']
-        if v.lower() not in valid_envs:
+        if v.lower() not in _VALID_FASTAPI_ENVS:
             raise ValueError(
-                f'FASTAPI_ENV debe ser uno de: {", ".join(valid_envs)}. Valor actual: {v}'
+                f'FASTAPI_ENV debe ser uno de: development, testing, production. Valor actual: {v}'
             )
         return v.lower()
 
@@ -222,10 +264,9 @@ class Settings(BaseSettings):
     @classmethod
     def validate_https_environment(cls, v):
         """Validador para entorno HTTPS (Story 5.3)"""
-        valid_envs = ['development', 'production']
-        if v.lower() not in valid_envs:
+        if v.lower() not in _VALID_HTTPS_ENVS:
             raise ValueError(
-                f'ENVIRONMENT debe ser uno de: {", ".join(valid_envs)}. Valor actual: {v}'
+                f'ENVIRONMENT debe ser uno de: development, production. Valor actual: {v}'
             )
         return v.lower()
 
@@ -298,15 +339,23 @@ class Settings(BaseSettings):
         return settings
 
 
-# Singleton instance para uso en la aplicación (carga lazy)
-settings = None
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Obtiene instancia singleton de Settings.
-    Crea la instancia solo en la primera llamada.
+    Crea y valida la instancia solo en la primera llamada; las siguientes
+    llamadas retornan el valor cacheado sin volver a leer el entorno.
+    Usar get_settings.cache_clear() para forzar una recarga.
+    """
+    return Settings.create_with_validation()
+
+
+def __getattr__(name: str):
+    """
+    Acceso lazy a `settings` para módulos que hacen
+    `from app.core.config import settings` (carga en el primer acceso,
+    sin depender de que otro módulo haya llamado antes a get_settings()).
     """
-    global settings
-    if settings is None:
-        settings = Settings.create_with_validation()
-    return settings
\ No newline at end of file
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
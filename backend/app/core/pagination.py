@@ -0,0 +1,26 @@
+"""
+Cursor de paginación por keyset compartido por los listados.
+
+Un cursor codifica la posición (timestamp, id) de la última fila de una
+página. Solo es válido cuando el listado se ordena por ese timestamp con id
+como desempate; los endpoints rechazan un cursor con cualquier otro orden.
+"""
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Codifica la posición (timestamp, id) de la última fila de una página"""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodifica un cursor de listado; lanza ValueError si es inválido"""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise ValueError("Cursor de paginación inválido")
@@ -0,0 +1,245 @@
+"""
+Particionado por rango de tablas append-only en PostgreSQL.
+
+Definición única usada por las migraciones partition_time_series_tables y
+partition_auditlog_weekly: tablas y periodos particionados, funciones
+PL/pgSQL de mantenimiento y reconstrucción de una tabla como particionada o
+plana. Las dos migraciones instalan exactamente las mismas funciones.
+
+Mantenimiento requerido: al migrar solo se pre-crean los próximos periodos
+(PERIODS_AHEAD / AUDIT_WEEKS_AHEAD). maintain_time_partitions() debe
+ejecutarse a diario para crear los siguientes y aplicar la retención de
+auditlog. Con pg_cron se programa automáticamente; sin pg_cron hay que
+programarlo fuera de la base de datos, por ejemplo:
+
+    0 3 * * *  psql "$DATABASE_URL" -c 'SELECT maintain_time_partitions()'
+
+Si el job se atrasa, las filas nuevas caen en la partición DEFAULT;
+create_time_partitions() las mueve a su partición al crearla, así que la
+siguiente ejecución recupera el estado normal.
+"""
+
+import logging
+from typing import Optional
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger(__name__)
+
+# (tabla, periodo de partición) particionadas sobre created_at.
+# generated_content no se particiona: learning_path_progress.path_id la
+# referencia y una tabla particionada no puede ser destino de esa FK.
+TIME_SERIES_TABLES = [
+    ('queries', 'month'),
+    ('performance_metrics', 'day'),
+]
+TIME_SERIES_COLUMN = 'created_at'
+
+# Periodos pre-creados al migrar y por cada ejecución del mantenimiento
+PERIODS_AHEAD = 12
+
+# auditlog: particiones semanales sobre timestamp con retención de ~90 días
+AUDIT_TABLE = 'auditlog'
+AUDIT_COLUMN = 'timestamp'
+AUDIT_WEEKS_AHEAD = 8
+AUDIT_RETENTION_WEEKS = 13
+
+MAINTENANCE_JOB = 'maintain_time_partitions'
+
+
+def create_partition_functions() -> None:
+    """Funciones PL/pgSQL para crear y desacoplar particiones por periodo."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_time_partitions(
+            parent text, period text, periods_ahead int, part_column text
+        ) RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            fmt text := CASE period WHEN 'month' THEN 'YYYYMM' ELSE 'YYYYMMDD' END;
+            step interval := ('1 ' || period)::interval;
+            start_ts timestamp := date_trunc(period, now() AT TIME ZONE 'UTC');
+            from_ts timestamp;
+            child text;
+        BEGIN
+            FOR i IN 0..periods_ahead - 1 LOOP
+                from_ts := start_ts + step * i;
+                child := parent || '_p' || to_char(from_ts, fmt);
+                CONTINUE WHEN to_regclass(quote_ident(child)) IS NOT NULL;
+
+                -- Si el mantenimiento se atrasó, DEFAULT ya tiene filas de este
+                -- rango y ATTACH fallaría: se mueven a la partición nueva antes
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    child, parent
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    parent || '_default', part_column, from_ts, part_column, from_ts + step, child
+                );
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent, child, from_ts, from_ts + step
+                );
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION detach_old_partitions(
+            parent text, period text, keep_periods int
+        ) RETURNS SETOF text LANGUAGE plpgsql AS $$
+        DECLARE
+            fmt text := CASE period WHEN 'month' THEN 'YYYYMM' ELSE 'YYYYMMDD' END;
+            cutoff timestamp := date_trunc(period, now() AT TIME ZONE 'UTC')
+                                - ('1 ' || period)::interval * keep_periods;
+            child text;
+        BEGIN
+            FOR child IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = parent
+                  AND c.relname ~ ('^' || parent || '_p[0-9]+$')
+            LOOP
+                IF to_timestamp(substring(child from '_p([0-9]+)$'), fmt) < cutoff THEN
+                    EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, child);
+                    RETURN NEXT child;
+                END IF;
+            END LOOP;
+        END $$
+    """)
+
+
+def drop_partition_functions() -> None:
+    op.execute("DROP FUNCTION IF EXISTS maintain_time_partitions()")
+    op.execute("DROP FUNCTION IF EXISTS detach_old_partitions(text, text, int)")
+    op.execute("DROP FUNCTION IF EXISTS create_time_partitions(text, text, int, text)")
+
+
+def maintenance_function_sql(with_auditlog: bool) -> str:
+    """SQL de maintain_time_partitions(), opcionalmente con auditlog y su retención."""
+    calls = "; ".join(
+        f"PERFORM create_time_partitions('{table}', '{period}', {PERIODS_AHEAD}, "
+        f"'{TIME_SERIES_COLUMN}')"
+        for table, period in TIME_SERIES_TABLES
+    )
+    audit_block = ""
+    if with_auditlog:
+        audit_block = f"""
+            PERFORM create_time_partitions(
+                '{AUDIT_TABLE}', 'week', {AUDIT_WEEKS_AHEAD}, '{AUDIT_COLUMN}'
+            );
+            FOR child IN
+                SELECT * FROM detach_old_partitions('{AUDIT_TABLE}', 'week', {AUDIT_RETENTION_WEEKS})
+            LOOP
+                EXECUTE format('DROP TABLE %I', child);
+            END LOOP;"""
+
+    return f"""
+        CREATE OR REPLACE FUNCTION maintain_time_partitions() RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            child text;
+        BEGIN
+            {calls};{audit_block}
+        END $$
+    """
+
+
+def _has_pg_cron(bind) -> bool:
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_cron'")
+    ).first() is not None
+
+
+def schedule_maintenance(bind) -> None:
+    """
+    Programa maintain_time_partitions() a diario con pg_cron.
+
+    Sin pg_cron no hay nada que vuelva a crear particiones: se registra una
+    advertencia con el job que hay que programar fuera de la base de datos.
+    """
+    if not _has_pg_cron(bind):
+        logger.warning(
+            "pg_cron no está instalado: programar 'SELECT maintain_time_partitions()' "
+            "a diario (ver app/core/partitioning.py). Sin ese job las particiones se "
+            "agotan en %d días y la retención de auditlog se detiene.",
+            PERIODS_AHEAD
+        )
+        return
+
+    scheduled = bind.execute(
+        sa.text("SELECT 1 FROM cron.job WHERE jobname = :name"), {"name": MAINTENANCE_JOB}
+    ).first()
+    if scheduled is None:
+        op.execute(
+            f"SELECT cron.schedule('{MAINTENANCE_JOB}', '0 3 * * *', "
+            "'SELECT maintain_time_partitions()')"
+        )
+
+
+def unschedule_maintenance(bind) -> None:
+    if _has_pg_cron(bind):
+        op.execute(
+            f"SELECT cron.unschedule(jobid) FROM cron.job WHERE jobname = '{MAINTENANCE_JOB}'"
+        )
+
+
+def rebuild_table(
+    bind,
+    table: str,
+    partition_column: str,
+    partition_period: Optional[str],
+    periods_ahead: int
+) -> None:
+    """
+    Reconstruye `table` copiando sus datos a una tabla nueva con el mismo
+    esquema, particionada por rango sobre partition_column
+    (partition_period) o plana (None).
+
+    Índices y FKs salientes se leen de la tabla original y se recrean con
+    los mismos nombres sobre la tabla nueva.
+    """
+    inspector = sa.inspect(bind)
+    indexes = inspector.get_indexes(table)
+    foreign_keys = inspector.get_foreign_keys(table)
+    old_table = f'{table}_old'
+
+    op.rename_table(table, old_table)
+
+    partition_clause = (
+        f' PARTITION BY RANGE ("{partition_column}")' if partition_period else ''
+    )
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        f'{partition_clause}'
+    )
+
+    if partition_period:
+        # La PK de una tabla particionada debe incluir la columna de partición
+        op.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, "{partition_column}")')
+        op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+        op.execute(
+            f"SELECT create_time_partitions('{table}', '{partition_period}', "
+            f"{periods_ahead}, '{partition_column}')"
+        )
+    else:
+        op.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id)')
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old_table}"')
+
+    # La secuencia del SERIAL pertenece a la tabla original: transferirla antes del DROP
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    op.drop_table(old_table)
+
+    for index in indexes:
+        op.create_index(
+            index['name'], table, index['column_names'], unique=index.get('unique', False)
+        )
+    for fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns']
+        )
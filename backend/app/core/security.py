@@ -1,48 +1,162 @@
+import hashlib
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
 from app.core.config import get_settings
 from app.models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from jose.backends.base import Key
+    from passlib.context import CryptContext
+
+# passlib y jose se importan al primer uso: CryptContext inspecciona los
+# backends e importa bcrypt, costo innecesario para scripts y workers que
+# importan este módulo de forma transitiva sin hashear ni firmar nada
+
+# Tokens ya verificados: digest BLAKE2b-128 del token -> (payload, expira_en).
+# Cada entrada vive como máximo _TOKEN_CACHE_TTL_SECONDS y nunca más allá del
+# exp del token; al llenarse se descarta la entrada más antigua
+_TOKEN_CACHE_MAX_SIZE = 50_000
+_TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+# Token ya verificado en el request actual (token, payload). El primer
+# componente que lo verifica (RateLimitMiddleware o la dependencia de auth)
+# lo deja en el contexto y los siguientes lo reutilizan sin volver a
+# verificar; cada request corre en su propia task/contexto
+_request_token: ContextVar[Optional[Tuple[str, Dict[str, Any]]]] = ContextVar(
+    "request_token", default=None
+)
+
+
+@lru_cache(maxsize=1)
+def _pwd_ctx() -> "CryptContext":
+    """CryptContext de bcrypt, construido una sola vez al primer hash/verify."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@lru_cache(maxsize=1)
+def _jwt_config() -> Tuple["Key", str, int]:
+    """
+    (clave de firma, jwt_algorithm, jwt_expiration_hours) construidos una sola vez.
+
+    La clave se construye con jwk.construct al primer uso: jose no vuelve a
+    envolver el secreto en cada encode/decode cuando recibe un Key.
+    """
+    from jose import jwk
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     settings = get_settings()
+    signing_key = jwk.construct(settings.secret_key, algorithm=settings.jwt_algorithm)
+    return signing_key, settings.jwt_algorithm, settings.jwt_expiration_hours
+
+
+def invalidate_key_cache() -> None:
+    """Descarta la clave JWT y los tokens decodificados en caché (rotación de secreto o tests)."""
+    _jwt_config.cache_clear()
+    _token_cache.clear()
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
+    signing_key, algorithm, expiration_hours = _jwt_config()
     to_encode = data.copy()
-    now_utc = datetime.now(timezone.utc)
+    # exp/iat como segundos enteros (NumericDate, RFC 7519): jose convertiría
+    # los datetime al mismo valor con calendar.timegm
+    now = int(time.time())
     if expires_delta:
-        expire = now_utc + expires_delta
+        expire = now + int(expires_delta.total_seconds())
     else:
-        expire = now_utc + timedelta(hours=settings.jwt_expiration_hours)
+        expire = now + expiration_hours * 3600
 
     to_encode.update({
         "exp": expire,
-        "iat": now_utc,
+        "iat": now,
         "type": "access"
     })
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.jwt_algorithm)
+    encoded_jwt = jwt.encode(to_encode, signing_key, algorithm=algorithm)
     return encoded_jwt
 
+def _decode_cached(token: str, now: float) -> Dict[str, Any]:
+    """
+    Verifica firma y decodifica el token, reutilizando el payload de una
+    verificación reciente. Solo se cachean decodificaciones exitosas.
+    """
+    from jose import jwt
+
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    entry = _token_cache.get(key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    signing_key, algorithm, _ = _jwt_config()
+    payload = jwt.decode(token, signing_key, algorithms=[algorithm])
+
+    exp = payload.get("exp")
+    ttl = _TOKEN_CACHE_TTL_SECONDS if exp is None else min(_TOKEN_CACHE_TTL_SECONDS, exp - now)
+    if ttl > 0:
+        _token_cache[key] = (payload, now + ttl)
+        if len(_token_cache) > _TOKEN_CACHE_MAX_SIZE:
+            try:
+                _token_cache.popitem(last=False)
+            except KeyError:  # vaciada por otro thread
+                pass
+    return payload
+
+
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    settings = get_settings()
+    from jose import JWTError
+
+    now = datetime.now(timezone.utc).timestamp()
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
+        payload = _decode_cached(token, now)
     except JWTError:
         return None
 
+    # exp se revisa fuera de la caché: un token cacheado puede haber expirado
+    exp = payload.get("exp")
+    if exp is not None and exp < now:
+        return None
+    return dict(payload)
+
+
+def verify_request_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    verify_token una sola vez por request: reutiliza el payload si este
+    mismo token ya fue verificado antes en el contexto actual.
+    """
+    verified = _request_token.get()
+    if verified is not None and verified[0] == token:
+        exp = verified[1].get("exp")
+        if exp is None or exp >= time.time():
+            return verified[1]
+
+    payload = verify_token(token)
+    if payload is not None:
+        _request_token.set((token, payload))
+    return payload
+
+def _truncate_password(password: str) -> bytes:
+    # bcrypt has a 72 byte limit: encode once and pass bytes to passlib.
+    # The cut never splits a multi-byte character (same bytes as the previous
+    # decode(errors='ignore') truncation, so existing hashes keep verifying)
+    encoded = password.encode('utf-8')
+    if len(encoded) <= 72:
+        return encoded
+    cut = 72
+    while cut > 0 and (encoded[cut] & 0xC0) == 0x80:  # UTF-8 continuation byte
+        cut -= 1
+    return encoded[:cut]
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # bcrypt has a 72 byte limit, so we truncate passwords if needed
-    if len(plain_password.encode('utf-8')) > 72:
-        plain_password = plain_password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_ctx().verify(_truncate_password(plain_password), hashed_password)
 
 def get_password_hash(password: str) -> str:
-    # bcrypt has a 72 byte limit, so we truncate passwords if needed
-    if len(password.encode('utf-8')) > 72:
-        password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.hash(password)
+    return _pwd_ctx().hash(_truncate_password(password))
 
 def check_account_locked(user: User) -> bool:
     """
@@ -57,18 +171,16 @@ def check_account_locked(user: User) -> bool:
     Returns:
         bool: True si la cuenta está actualmente bloqueada, False en caso contrario
     """
-    if user.locked_until is None:
-        return False
-
-    # Obtener timestamp actual - compatible con datetimes offset-naive y offset-aware
-    now_utc = datetime.now(timezone.utc)
     locked_until = user.locked_until
+    if locked_until is None:
+        return False
 
-    # Si locked_until es offset-naive, convertir now_utc a offset-naive para comparación
+    # Leído de BD siempre es aware (User.locked_until usa _UTCDateTime); solo
+    # un valor naive asignado en memoria llega aquí sin zona: se asume UTC
     if locked_until.tzinfo is None:
-        now_utc = now_utc.replace(tzinfo=None)
+        locked_until = locked_until.replace(tzinfo=timezone.utc)
 
-    if locked_until > now_utc:
+    if locked_until > datetime.now(timezone.utc):
         # Cuenta aún está bloqueada
         return True
     else:
@@ -11,8 +11,13 @@ import asyncio
 import logging
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Generator, Optional, Any, Callable
+import orjson
 from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
 from sqlmodel import create_engine, Session, SQLModel
 from app.core.config import get_settings
 
@@ -24,6 +29,14 @@ settings = get_settings()
 DATABASE_URL = settings.database_url
 DB_ENCRYPTION_KEY = os.getenv("DB_ENCRYPTION_KEY")
 
+# Timeout por defecto precalculado: execute_with_timeout está en cada
+# operación de BD con timeout y así evita leer settings en cada llamada
+_DEFAULT_TIMEOUT_MS = settings.retrieval_timeout_ms
+_DEFAULT_TIMEOUT_S = _DEFAULT_TIMEOUT_MS / 1000.0
+
+# Validación de cifrado ya realizada en este proceso (ver _configure_sqlite_encryption)
+_encryption_validated = False
+
 
 def _configure_sqlite_encryption(dbapi_conn: Any, connection_record: Any) -> None:
     """
@@ -34,23 +47,35 @@ def _configure_sqlite_encryption(dbapi_conn: Any, connection_record: Any) -> Non
         dbapi_conn: Conexión SQLite/SQLCipher
         connection_record: Registro de conexión (no usado en esta función)
     """
+    global _encryption_validated
     if DB_ENCRYPTION_KEY:
         try:
             # Ejecutar PRAGMA key para habilitar cifrado
-            # SQLCipher interpreta esto como la clave de cifrado
-            dbapi_conn.execute(f"PRAGMA key = '{DB_ENCRYPTION_KEY}'")
-
-            # Validar que la BD está cifrada
-            cursor = dbapi_conn.execute("PRAGMA database_list;")
-            databases = cursor.fetchall()
-
-            logger.info(
-                json.dumps({
-                    "event": "database_encryption_enabled",
-                    "cipher": "SQLCipher (AES-256)",
-                    "key_loaded": True
-                })
-            )
+            # SQLCipher interpreta esto como la clave de cifrado.
+            # PRAGMA no admite parámetros enlazados (?): la clave se escapa
+            # como literal SQL para que una comilla no rompa la sentencia
+            key_literal = DB_ENCRYPTION_KEY.replace("'", "''")
+            dbapi_conn.execute(f"PRAGMA key = '{key_literal}'")
+
+            # Sin mlock/borrado de memoria por página (host de confianza)
+            dbapi_conn.execute("PRAGMA cipher_memory_security = OFF")
+
+            # Validar que la BD está cifrada: una vez por proceso, el resultado
+            # no cambia entre conexiones del pool (una carrera solo repite
+            # la validación, sin efecto)
+            if not _encryption_validated:
+                cursor = dbapi_conn.execute("PRAGMA database_list;")
+                cursor.fetchall()
+                _encryption_validated = True
+
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        json.dumps({
+                            "event": "database_encryption_enabled",
+                            "cipher": "SQLCipher (AES-256)",
+                            "key_loaded": True
+                        })
+                    )
         except Exception as e:
             logger.error(
                 json.dumps({
@@ -62,29 +87,120 @@ def _configure_sqlite_encryption(dbapi_conn: Any, connection_record: Any) -> Non
             raise
 
 
+def _configure_sqlite_pragmas(dbapi_conn: Any, connection_record: Any) -> None:
+    """
+    Ajusta PRAGMAs de rendimiento de SQLite en cada conexión nueva.
+
+    - journal_mode=WAL: lectores no bloquean al escritor (logins + auditoría concurrentes)
+    - synchronous=NORMAL: en WAL evita un fsync por commit sin riesgo de corrupción
+    - mmap_size / cache_size / temp_store: lecturas y temporales en memoria
+
+    Debe registrarse después de _configure_sqlite_encryption: PRAGMA key
+    tiene que ser la primera sentencia sobre una BD SQLCipher.
+
+    Args:
+        dbapi_conn: Conexión SQLite/SQLCipher
+        connection_record: Registro de conexión (no usado en esta función)
+    """
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+    finally:
+        cursor.close()
+
+
+def _engine_options(database_url: str) -> dict:
+    """
+    Opciones de pool según el motor de base de datos.
+
+    - SQLite: una conexión por thread (pool por defecto) con
+      check_same_thread=False. No se comparte una única conexión entre
+      sesiones: sus transacciones se mezclarían.
+    - PostgreSQL/MySQL: pool dimensionado desde settings, con pre-ping y
+      reciclado para descartar conexiones cerradas por el servidor.
+    """
+    if "sqlite" in database_url.lower():
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+
+
+def _json_serializer(value: Any) -> str:
+    """
+    Serializa columnas JSON/JSONB con orjson en lugar de json.dumps.
+
+    Los tipos JSON de SQLAlchemy delegan en el serializador del dialecto, así
+    que se configura una vez en el motor y aplica a todas las columnas JSON
+    (content_json, options_json, answers_json, sources_json). Los drivers
+    esperan str, por eso se decodifica el bytes de orjson.
+    """
+    return orjson.dumps(value).decode()
+
+
+# Opciones de serialización JSON para create_engine (también en tests/conftest.py)
+JSON_ENGINE_OPTIONS = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+
+
+def _trace_sql(conn: Any, cursor: Any, statement: str, parameters: Any,
+               context: Any, executemany: bool) -> None:
+    """
+    Registra la sentencia SQL vía logging (habilitado con SQL_TRACE=1).
+    Los parámetros no se registran: pueden contener hashes o datos personales.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug(
+        json.dumps({
+            "event": "sql_statement",
+            "statement": statement,
+            "executemany": executemany
+        })
+    )
+
+
 # Crear motor de base de datos
 # Para SQLCipher: necesita conectar_args con check_same_thread=False
-# echo=True muestra las queries SQL en consola (útil para desarrollo)
+# echo=False siempre: echo escribe cada sentencia a stdout de forma síncrona.
+# Para diagnóstico usar SQL_TRACE=1 (ver _trace_sql)
 engine = create_engine(
     DATABASE_URL,
-    echo=settings.debug,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL.lower() else {}
+    echo=False,
+    **JSON_ENGINE_OPTIONS,
+    **_engine_options(DATABASE_URL)
 )
 
+if settings.sql_trace:
+    event.listen(engine, "before_cursor_execute", _trace_sql)
+
 # Registrar evento de conexión para SQLCipher (solo si hay clave disponible)
 if DB_ENCRYPTION_KEY and "sqlite" in DATABASE_URL.lower():
     event.listen(engine, "connect", _configure_sqlite_encryption)
 
+# PRAGMAs de rendimiento (WAL, synchronous=NORMAL, mmap) para SQLite
+if "sqlite" in DATABASE_URL.lower():
+    event.listen(engine, "connect", _configure_sqlite_pragmas)
+
 
 def create_db_and_tables() -> None:
     """
     Crea todas las tablas definidas en los modelos SQLModel
     Esta función debe llamarse durante la inicialización de la aplicación
 
-    Nota: Usa 'engine' global para permitir monkey-patching en tests
+    Nota: 'engine' se resuelve como global del módulo en cada llamada,
+    por lo que `app.database.engine = ...` en tests se respeta
     """
-    import app.database as db_module
-    SQLModel.metadata.create_all(db_module.engine)
+    SQLModel.metadata.create_all(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -104,10 +220,11 @@ def get_session() -> Generator[Session, None, None]:
             return session.exec(select(User)).all()
         ```
 
-    Nota: Usa db_module.engine para permitir monkey-patching en tests
+    Nota: 'engine' se resuelve como global del módulo en cada request
+    (sin import dentro de la función), por lo que el monkey-patching de
+    `app.database.engine` en tests sigue funcionando
     """
-    import app.database as db_module
-    with Session(db_module.engine) as session:
+    with Session(engine) as session:
         yield session
 
 
@@ -120,21 +237,119 @@ class DatabaseTimeoutError(Exception):
     pass
 
 
+# Pool dedicado para operaciones de BD con timeout: no compite con el
+# threadpool por defecto que FastAPI usa para endpoints sync
+DB_EXECUTOR_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Retorna el executor de BD, creándolo en el primer uso
+    (y de nuevo tras shutdown_db_executor, p.ej. si el lifespan se reinicia).
+    """
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=DB_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="db-op"
+        )
+    return _db_executor
+
+
+def shutdown_db_executor() -> None:
+    """Detiene el executor de BD (shutdown del lifespan de FastAPI)."""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=False)
+        _db_executor = None
+
+
+# SQLSTATE de PostgreSQL para "canceling statement due to statement timeout"
+_PG_QUERY_CANCELED = "57014"
+
+
+def run_with_statement_timeout(
+    session: Session,
+    operation: Callable[[], Any],
+    timeout_ms: int
+) -> Any:
+    """
+    Ejecuta una operación síncrona de BD con el timeout aplicado en el motor.
+
+    asyncio.wait_for solo deja de esperar: la consulta sigue ocupando un
+    worker y una conexión hasta terminar. Aquí es la BD quien la cancela:
+    - PostgreSQL: SET LOCAL statement_timeout (alcance de la transacción)
+    - SQLite: threading.Timer que llama a interrupt() sobre la conexión
+
+    La operación debe consumir el resultado (fetchall) dentro del callable:
+    en SQLite las filas se recorren al hacer fetch.
+
+    Args:
+        session: Sesión sobre la que corre la operación
+        operation: Función síncrona que ejecuta la consulta
+        timeout_ms: Timeout en milisegundos
+
+    Raises:
+        TimeoutError: Si la BD canceló la consulta por timeout
+    """
+    connection = session.connection()
+    dialect_name = connection.dialect.name
+
+    if dialect_name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        try:
+            result = operation()
+        except OperationalError as e:
+            if getattr(e.orig, "pgcode", None) == _PG_QUERY_CANCELED:
+                raise TimeoutError(f"Statement timeout after {timeout_ms}ms") from e
+            raise
+        connection.exec_driver_sql("SET LOCAL statement_timeout = DEFAULT")
+        return result
+
+    if dialect_name == "sqlite":
+        dbapi_conn = connection.connection.dbapi_connection
+        fired = threading.Event()
+
+        def _interrupt() -> None:
+            fired.set()
+            dbapi_conn.interrupt()
+
+        timer = threading.Timer(timeout_ms / 1000.0, _interrupt)
+        timer.daemon = True
+        timer.start()
+        try:
+            return operation()
+        except OperationalError as e:
+            if fired.is_set():
+                raise TimeoutError(f"Statement interrupted after {timeout_ms}ms") from e
+            raise
+        finally:
+            timer.cancel()
+
+    return operation()
+
+
 async def execute_with_timeout(
     operation: Callable[[], Any],
     timeout_ms: Optional[int] = None,
-    operation_name: str = "database_operation"
+    operation_name: str = "database_operation",
+    session: Optional[Session] = None
 ) -> Any:
     """
     Ejecuta una operación de BD con timeout.
 
     Envuelve operaciones síncronas de BD en asyncio.wait_for para
     aplicar timeout. Si se excede, lanza DatabaseTimeoutError.
+    La operación corre en el executor dedicado de BD (get_db_executor).
+    Con session, el timeout se aplica también en el motor
+    (run_with_statement_timeout) para liberar worker y conexión.
 
     Args:
         operation: Función que ejecuta la operación de BD (debe ser sincrónica)
         timeout_ms: Timeout en milisegundos. Si es None, usa retrieval_timeout_ms
         operation_name: Nombre de la operación para logging
+        session: Sesión de la operación (opcional) para timeout en el motor
 
     Returns:
         Resultado de la operación
@@ -153,14 +368,18 @@ async def execute_with_timeout(
         ...     return result
     """
     if timeout_ms is None:
-        timeout_ms = settings.retrieval_timeout_ms
+        timeout_ms = _DEFAULT_TIMEOUT_MS
+        timeout_s = _DEFAULT_TIMEOUT_S
+    else:
+        timeout_s = timeout_ms / 1000.0
 
-    timeout_s = timeout_ms / 1000.0
+    if session is not None:
+        operation = partial(run_with_statement_timeout, session, operation, timeout_ms)
 
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await asyncio.wait_for(
-            loop.run_in_executor(None, operation),
+            loop.run_in_executor(get_db_executor(), operation),
             timeout=timeout_s
         )
         return result
@@ -8,11 +8,12 @@ AC#11: Error Handling and Validation
 - LLMGenerationError: LLM generation failure (timeout, error)
 - DatabaseError: Database operation failure
 
-All exceptions are handled in main.py exception handlers
-to return appropriate HTTP responses.
+All exceptions are handled by the single IAServiceException handler in
+main.py; each subclass declares its response label and log level.
 """
 
-from typing import Optional
+import logging
+from typing import ClassVar, Optional
 
 
 class IAServiceException(Exception):
@@ -20,19 +21,39 @@ class IAServiceException(Exception):
     Base exception for IA service errors.
 
     AC#10: Service gracefully handles errors and logs appropriately.
-    """
+
+    Class attributes read by the exception handler:
+    - error_code / http_status_code: fixed per subclass; only message and
+      detail are set per instance
+    - error_label: value of the "error" field in the response body
+    - log_level: level used to log the exception
+    - default_detail: user-facing detail when none is given (None means the
+      message itself is used). Responses with the default detail are
+      identical across requests, so the handler serializes them once.
+    """
+    error_code: ClassVar[str] = "IA_SERVICE_ERROR"
+    http_status_code: ClassVar[int] = 500
+    error_label: ClassVar[str] = "Service error"
+    log_level: ClassVar[int] = logging.ERROR
+    default_detail: ClassVar[Optional[str]] = None
+
     def __init__(
         self,
         message: str,
-        error_code: str,
-        http_status_code: int = 500,
+        error_code: Optional[str] = None,
+        http_status_code: Optional[int] = None,
         detail: Optional[str] = None
     ):
         self.message = message
-        self.error_code = error_code
-        self.http_status_code = http_status_code
-        self.detail = detail or message
-        super().__init__(self.message)
+        if error_code is not None:
+            self.error_code = error_code
+        if http_status_code is not None:
+            self.http_status_code = http_status_code
+        if detail is not None:
+            self.detail = detail
+        else:
+            self.detail = self.default_detail if self.default_detail is not None else message
+        super().__init__(message)
 
 
 class QueryValidationError(IAServiceException):
@@ -45,13 +66,13 @@ class QueryValidationError(IAServiceException):
     - Query is longer than 500 characters
     - context_mode is not "general" or "specific"
     """
+    error_label = "Invalid request"
+    log_level = logging.WARNING
+    error_code = "QUERY_VALIDATION_ERROR"
+    http_status_code = 400
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="QUERY_VALIDATION_ERROR",
-            http_status_code=400,
-            detail=detail or message
-        )
+        super().__init__(message, detail=detail)
 
 
 class OllamaUnavailableError(IAServiceException):
@@ -64,13 +85,13 @@ class OllamaUnavailableError(IAServiceException):
     - Model is not available
     - Connection timeout to Ollama
     """
+    error_label = "Service unavailable"
+    default_detail = "AI service is currently unavailable. Please try again later."
+    error_code = "OLLAMA_UNAVAILABLE"
+    http_status_code = 503
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="OLLAMA_UNAVAILABLE",
-            http_status_code=503,
-            detail=detail or "AI service is currently unavailable. Please try again later."
-        )
+        super().__init__(message, detail=detail)
 
 
 class RateLimitError(IAServiceException):
@@ -80,13 +101,14 @@ class RateLimitError(IAServiceException):
     Raised when:
     - User exceeds rate limit
     """
+    error_label = "Too many requests"
+    log_level = logging.WARNING
+    default_detail = "Rate limit exceeded: 10 queries per 60 seconds per user"
+    error_code = "RATE_LIMIT_EXCEEDED"
+    http_status_code = 429
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="RATE_LIMIT_EXCEEDED",
-            http_status_code=429,
-            detail=detail or "Rate limit exceeded: 10 queries per 60 seconds per user"
-        )
+        super().__init__(message, detail=detail)
 
 
 class LLMGenerationError(IAServiceException):
@@ -99,13 +121,13 @@ class LLMGenerationError(IAServiceException):
     - LLM returns invalid/empty response
     - LLM internal error
     """
+    error_label = "Generation failed"
+    default_detail = "AI response generation failed. Please try again later."
+    error_code = "LLM_GENERATION_FAILED"
+    http_status_code = 503
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="LLM_GENERATION_FAILED",
-            http_status_code=503,
-            detail=detail or "AI response generation failed. Please try again later."
-        )
+        super().__init__(message, detail=detail)
 
 
 class DatabaseError(IAServiceException):
@@ -117,13 +139,13 @@ class DatabaseError(IAServiceException):
     - Audit logging fails
     - Metrics calculation fails
     """
+    error_label = "Database error"
+    default_detail = "An error occurred while processing your request"
+    error_code = "DATABASE_ERROR"
+    http_status_code = 500
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="DATABASE_ERROR",
-            http_status_code=500,
-            detail=detail or "An error occurred while processing your request"
-        )
+        super().__init__(message, detail=detail)
 
 
 class RetrievalServiceError(IAServiceException):
@@ -135,13 +157,13 @@ class RetrievalServiceError(IAServiceException):
     - FTS5 query fails
     - No documents found (gracefully handled)
     """
+    error_label = "Retrieval failed"
+    default_detail = "Failed to retrieve documents"
+    error_code = "RETRIEVAL_FAILED"
+    http_status_code = 500
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="RETRIEVAL_FAILED",
-            http_status_code=500,
-            detail=detail or "Failed to retrieve documents"
-        )
+        super().__init__(message, detail=detail)
 
 
 class RetrievalTimeoutError(IAServiceException):
@@ -152,13 +174,12 @@ class RetrievalTimeoutError(IAServiceException):
     - Document search exceeds timeout threshold
     - FTS5 query execution timeout
     """
+    default_detail = "Document search timed out. Please try a simpler query."
+    error_code = "RETRIEVAL_TIMEOUT"
+    http_status_code = 503
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="RETRIEVAL_TIMEOUT",
-            http_status_code=503,
-            detail=detail or "Document search timed out. Please try a simpler query."
-        )
+        super().__init__(message, detail=detail)
 
 
 class DatabaseTimeoutError(IAServiceException):
@@ -169,10 +190,9 @@ class DatabaseTimeoutError(IAServiceException):
     - Database query exceeds timeout threshold
     - Database operation takes too long
     """
+    default_detail = "Database operation timed out. Please try again later."
+    error_code = "DATABASE_TIMEOUT"
+    http_status_code = 503
+
     def __init__(self, message: str, detail: Optional[str] = None):
-        super().__init__(
-            message=message,
-            error_code="DATABASE_TIMEOUT",
-            http_status_code=503,
-            detail=detail or "Database operation timed out. Please try again later."
-        )
+        super().__init__(message, detail=detail)
@@ -1,10 +1,15 @@
+import asyncio
 from contextlib import asynccontextmanager
+import json
 import logging
+import time
+from typing import Dict, Type
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import create_db_and_tables
+from app.database import create_db_and_tables, shutdown_db_executor
 from app.auth.routes import router as auth_router
 from app.routes.knowledge import router as knowledge_router
 from app.routes.ia import router as ia_router
@@ -13,18 +18,11 @@ from app.routes.users import router as users_router
 from app.auth.models import HealthResponse
 from app.core.config import get_settings
 from app.services.llm_service import get_llm_service
+from app.services.audit_service import audit_log_writer, query_log_writer
 from app.middleware.https_redirect import HTTPSRedirectMiddleware
 # Ensure models are imported so SQLModel creates the tables
 from app.models.query import Query, PerformanceMetric  # noqa: F401
-from app.exceptions import (
-    IAServiceException,
-    QueryValidationError,
-    OllamaUnavailableError,
-    RateLimitError,
-    LLMGenerationError,
-    DatabaseError,
-    RetrievalServiceError
-)
+from app.exceptions import IAServiceException
 
 logger = logging.getLogger(__name__)
 
@@ -33,59 +31,124 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup: Validar configuración y crear base de datos
     settings = get_settings()
-    print(f"Iniciando Asistente de Conocimiento API en modo: {settings.fastapi_env}")
-    print(f"Base de datos: {settings.database_url}")
-    print(f"Servidor Ollama: {settings.ollama_host}")
+    logger.info(
+        json.dumps({
+            "event": "startup",
+            "environment": settings.fastapi_env,
+            "database_url": settings.database_url,
+            "ollama_host": settings.ollama_host
+        })
+    )
 
     # Validación completa de la configuración ya se ejecuta al importar settings
     # pero podemos agregar mensajes específicos aquí
-    create_db_and_tables()
-    print("Base de datos inicializada correctamente")
-
-    # Validar Ollama (no bloqueante)
-    try:
-        llm_svc = get_llm_service()
-        ollama_available = await llm_svc.health_check_async()
-        if ollama_available:
-            print(f"Ollama service disponible - Modelo: {llm_svc.model}")
-        else:
-            print("Ollama service no disponible - Las funciones de IA estarán deshabilitadas")
-    except Exception as e:
-        print(f"Error verificando Ollama: {e} - Las funciones de IA podrían no estar disponibles")
+    async def init_database() -> float:
+        # DDL síncrono en un thread: no bloquea el event loop
+        start = time.perf_counter()
+        await asyncio.to_thread(create_db_and_tables)
+        logger.info(json.dumps({"event": "startup_stage", "stage": "db_init", "status": "ok"}))
+        return (time.perf_counter() - start) * 1000
+
+    async def check_ollama() -> float:
+        # Validar Ollama (no bloqueante)
+        start = time.perf_counter()
+        try:
+            llm_svc = get_llm_service()
+            ollama_available = await llm_svc.health_check_async()
+            if ollama_available:
+                logger.info(
+                    json.dumps({
+                        "event": "startup_stage",
+                        "stage": "ollama_check",
+                        "status": "available",
+                        "model": llm_svc.model
+                    })
+                )
+            else:
+                # Las funciones de IA quedan deshabilitadas
+                logger.warning(
+                    json.dumps({"event": "startup_stage", "stage": "ollama_check", "status": "unavailable"})
+                )
+        except Exception as e:
+            logger.warning(
+                json.dumps({
+                    "event": "startup_stage",
+                    "stage": "ollama_check",
+                    "status": "error",
+                    "error": str(e)
+                })
+            )
+        return (time.perf_counter() - start) * 1000
+
+    # Creación de tablas y health check de Ollama en paralelo
+    startup_start = time.perf_counter()
+    db_init_ms, ollama_check_ms = await asyncio.gather(init_database(), check_ollama())
+    logger.info(
+        json.dumps({
+            "event": "startup_timing",
+            "db_init_ms": round(db_init_ms, 2),
+            "ollama_check_ms": round(ollama_check_ms, 2),
+            "total_ms": round((time.perf_counter() - startup_start) * 1000, 2)
+        })
+    )
+
+    # Auditoría y log de queries RAG en lotes fuera del camino del request
+    audit_log_writer.start()
+    query_log_writer.start()
 
     yield
 
-    # Shutdown (if needed)
-    print("Aplicación detenida")
+    # Shutdown: escribir la auditoría pendiente y liberar el pool de threads
+    # de operaciones de BD
+    await audit_log_writer.stop()
+    await query_log_writer.stop()
+    shutdown_db_executor()
+    logger.info(json.dumps({"event": "shutdown"}))
 
 
 app = FastAPI(
     title="Asistente de Conocimiento API",
     description="API para el Sistema de IA Generativa para Capacitación Corporativa",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson: serialización más rápida que json estándar en todas las respuestas
+    default_response_class=ORJSONResponse
 )
 
 # Obtener configuración
 settings = get_settings()
 
-# HTTPS Redirect Middleware (Story 5.3)
-# Agregar ANTES de CORS para que funcione correctamente con redirects
-app.add_middleware(
-    HTTPSRedirectMiddleware,
-    environment=settings.environment,
-    https_enabled=True
+# Logging de la aplicación: sin un handler en root, los logger.info de app.*
+# no se emiten (uvicorn solo configura sus propios loggers). No-op si el
+# proceso ya configuró logging.
+logging.basicConfig(
+    level=getattr(logging, settings.log_level.upper(), logging.INFO),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
 )
 
-# CORS middleware configurado desde settings
-allowed_origins_list = [origin.strip() for origin in settings.allowed_origins.split(",")]
+# HTTPS Redirect Middleware (Story 5.3)
+# Agregar ANTES de CORS para que funcione correctamente con redirects.
+# Solo en producción: en desarrollo no redirige y la app se sirve por HTTP,
+# así dev y tests no pagan un middleware extra por request
+if settings.environment == "production":
+    app.add_middleware(
+        HTTPSRedirectMiddleware,
+        environment=settings.environment,
+        https_enabled=True
+    )
 
+# CORS middleware configurado desde settings
+# frozenset: CORSMiddleware valida el Origin con `origin in allow_origins`,
+# O(1) en vez de recorrer la lista en cada request. Los navegadores envían
+# el Origin con esquema y host en minúsculas, así que se normaliza igual.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allowed_origins_list,
+    allow_origins=frozenset(origin.lower() for origin in settings.allowed_origins_list),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor de paginación keyset del listado de documentos
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -103,8 +166,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     Convert Pydantic validation errors (422) to 400 Bad Request for consistency.
     AC#2: Returns 400 for invalid query parameters.
     """
-    logger.warning(f"Validation error on {request.url.path}: {exc.errors()}")
-    return JSONResponse(
+    logger.warning("Validation error on %s: %s", request.url.path, exc.errors())
+    return ORJSONResponse(
         status_code=400,
         content={
             "error": "Invalid request",
@@ -113,123 +176,57 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-# Exception handlers for IA service (Task 11: Error Handling)
-@app.exception_handler(QueryValidationError)
-async def query_validation_error_handler(request: Request, exc: QueryValidationError):
-    """
-    AC#10: Malformed requests return clear error messages.
-    AC#2: Returns 400 for invalid query.
-    """
-    logger.warning(f"Query validation error: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Invalid request",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
-
-
-@app.exception_handler(OllamaUnavailableError)
-async def ollama_unavailable_handler(request: Request, exc: OllamaUnavailableError):
-    """
-    AC#10: Service gracefully handles Ollama unavailability.
-    AC#1: Returns 503 when Ollama unavailable.
-    """
-    logger.error(f"Ollama service unavailable: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Service unavailable",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
-
-
-@app.exception_handler(RateLimitError)
-async def rate_limit_error_handler(request: Request, exc: RateLimitError):
-    """
-    AC#6: Rate limiting returns 429 with error message.
-    """
-    logger.warning(f"Rate limit exceeded: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Too many requests",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
-
-
-@app.exception_handler(LLMGenerationError)
-async def llm_generation_error_handler(request: Request, exc: LLMGenerationError):
-    """
-    AC#10: Network timeouts from Ollama handled with 503.
-    Returns generic error message without exposing internal details.
-    """
-    logger.error(f"LLM generation error: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Generation failed",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
-
-
-@app.exception_handler(DatabaseError)
-async def database_error_handler(request: Request, exc: DatabaseError):
-    """
-    AC#10: Database errors logged and user receives generic error message.
-    No stack traces or internal details exposed.
-    """
-    logger.error(f"Database error: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Database error",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
-
-
-@app.exception_handler(RetrievalServiceError)
-async def retrieval_service_error_handler(request: Request, exc: RetrievalServiceError):
-    """
-    AC#3: Retrieval service error handling.
-    """
-    logger.error(f"Retrieval service error: {exc.message}")
-    return JSONResponse(
-        status_code=exc.http_status_code,
-        content={
-            "error": "Retrieval failed",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
-    )
+# Exception handler for IA service (Task 11: Error Handling)
+# Starlette resolves handlers by walking the exception MRO, so this single
+# handler serves every IAServiceException subclass. Each subclass carries
+# its status code, error code, response label and log level.
+# Serialized bodies for exceptions raised with their class default detail:
+# identical on every request (e.g. a burst of 503s while Ollama is down).
+# Keyed by class: subclasses with a default_detail use fixed codes.
+_DEFAULT_ERROR_BODIES: Dict[Type[IAServiceException], bytes] = {}
+
+
+def _ia_error_body(exc: IAServiceException) -> bytes:
+    """JSON body for an IA service error, cached when the detail is the default."""
+    exc_type = type(exc)
+    # Identidad, no igualdad: un detail omitido es el mismo objeto que
+    # default_detail, así que no hace falta comparar strings
+    is_default = exc_type.default_detail is not None and exc.detail is exc_type.default_detail
+    if is_default:
+        body = _DEFAULT_ERROR_BODIES.get(exc_type)
+        if body is not None:
+            return body
+
+    body = orjson.dumps({
+        "error": exc.error_label,
+        "detail": exc.detail,
+        "code": exc.error_code
+    })
+    if is_default:
+        _DEFAULT_ERROR_BODIES[exc_type] = body
+    return body
 
 
 @app.exception_handler(IAServiceException)
 async def ia_service_exception_handler(request: Request, exc: IAServiceException):
     """
-    Catch-all handler for any other IA service exceptions.
+    AC#10: Errors are logged and the user receives a clear, generic message
+    without stack traces or internal details.
+    AC#1/#2/#6: 503 when Ollama is unavailable, 400 for invalid queries,
+    429 when the rate limit is exceeded.
     """
-    logger.error(f"IA service error: {exc.message}")
-    return JSONResponse(
+    logger.log(exc.log_level, "%s: %s", exc.error_code, exc.message)
+    return Response(
+        content=_ia_error_body(exc),
         status_code=exc.http_status_code,
-        content={
-            "error": "Service error",
-            "detail": exc.detail,
-            "code": exc.error_code
-        }
+        media_type="application/json"
     )
 
 
-@app.get("/api/health", response_model=HealthResponse)
+# Respuesta de liveness/readiness: siempre idéntica, se serializa una sola vez
+_HEALTH_BODY = orjson.dumps(HealthResponse(status="ok", version="1.0.0").model_dump())
+
+
+@app.get("/api/health", responses={200: {"model": HealthResponse}})
 async def health_check():
-    return HealthResponse(status="ok", version="1.0.0")
\ No newline at end of file
+    return Response(content=_HEALTH_BODY, media_type="application/json")
\ No newline at end of file
@@ -1,18 +1,74 @@
-from typing import Optional
+from itertools import chain
+from typing import NamedTuple, Optional
 from functools import wraps
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session
-from app.core.security import verify_token
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession, make_transient_to_detached
+from sqlmodel import Session, select
+from app.core.security import verify_request_token
 from app.database import get_session
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.services.cache_service import CacheService
 
 security = HTTPBearer(auto_error=False)
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_session)
-) -> User:
+# Usuarios autenticados recientes: evita el SELECT de User en cada request.
+# Se guarda una copia desacoplada (detached) de la fila; cada request obtiene
+# su propia instancia vía Session.merge(load=False), sin SQL.
+# Por proceso: con varios workers, un cambio de rol/estado hecho en otro
+# worker se ve como máximo USER_CACHE_TTL_SECONDS después.
+USER_CACHE_TTL_SECONDS = 30
+_user_cache = CacheService(max_size=10_000)
+
+
+def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+    """Descarta el usuario cacheado (o todos si user_id es None)."""
+    _user_cache.invalidate(None if user_id is None else str(user_id))
+
+
+# Clave en Session.info con los ids de usuarios modificados aún sin commit
+_CHANGED_USER_IDS = "changed_user_ids"
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _collect_changed_users(session, flush_context) -> None:
+    # Solo se anotan: invalidar en el flush dejaría que otro request volviera
+    # a cachear la fila previa antes del commit
+    user_ids = {
+        obj.id for obj in chain(session.dirty, session.deleted) if isinstance(obj, User)
+    }
+    if user_ids:
+        session.info.setdefault(_CHANGED_USER_IDS, set()).update(user_ids)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _invalidate_changed_users(session) -> None:
+    # Cualquier UPDATE/DELETE ORM de un usuario (rol, is_active, password...)
+    for user_id in session.info.pop(_CHANGED_USER_IDS, ()):
+        invalidate_user_cache(user_id)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_changed_users(session) -> None:
+    session.info.pop(_CHANGED_USER_IDS, None)
+
+
+def _detached_copy(user: User) -> User:
+    """Copia de las columnas de user, desacoplada de cualquier sesión."""
+    snapshot = User(**user.model_dump())
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+class CurrentUser(NamedTuple):
+    """Datos mínimos del usuario autenticado para chequeos de identidad y rol."""
+    id: int
+    is_active: bool
+    role: UserRole
+
+
+def _user_id_from_credentials(credentials: Optional[HTTPAuthorizationCredentials]) -> int:
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,7 +79,7 @@ def get_current_user(
         )
 
     token = credentials.credentials
-    payload = verify_token(token)
+    payload = verify_request_token(token)
 
     if payload is None:
         raise HTTPException(
@@ -44,10 +100,10 @@ def get_current_user(
             }
         )
 
-    from sqlmodel import select
-    statement = select(User).where(User.id == user_id)
-    user = db.exec(statement).first()
+    return user_id
 
+
+def _check_active(user) -> None:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -66,8 +122,49 @@ def get_current_user(
             }
         )
 
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_session)
+) -> User:
+    user_id = _user_id_from_credentials(credentials)
+
+    cache_key = str(user_id)
+    snapshot = _user_cache.get(cache_key)
+    if snapshot is not None and Session.identity_key(User, user_id) not in db.identity_map:
+        user = db.merge(snapshot, load=False)
+    else:
+        # Session.get consulta primero el identity map; SELECT solo si no está
+        user = db.get(User, user_id)
+        if snapshot is None and user is not None and user.is_active:
+            _user_cache.set(cache_key, _detached_copy(user), USER_CACHE_TTL_SECONDS)
+
+    _check_active(user)
     return user
 
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_session)
+) -> CurrentUser:
+    """
+    Variante liviana de get_current_user para endpoints que solo usan id y rol.
+
+    Lee únicamente (id, is_active, role) en vez de la fila completa de User.
+    Los handlers que necesitan más campos deben depender de get_current_user.
+    """
+    user_id = _user_id_from_credentials(credentials)
+
+    snapshot = _user_cache.get(str(user_id))
+    if snapshot is not None:
+        principal = CurrentUser(snapshot.id, snapshot.is_active, snapshot.role)
+    else:
+        stmt = select(User.id, User.is_active, User.role).where(User.id == user_id).limit(1)
+        row = db.exec(stmt).first()
+        principal = CurrentUser(*row) if row is not None else None
+
+    _check_active(principal)
+    return principal
+
 def check_user_role(user: User, required_role: str) -> User:
     if user.role.value != required_role:
         raise HTTPException(
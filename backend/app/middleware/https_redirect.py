@@ -9,14 +9,46 @@ Story 5.3: Cifrado de datos en tránsito y en reposo
 
 import logging
 import json
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
+# max-age: 1 año (31536000 segundos); includeSubDomains: aplica a subdominios
+HSTS_MAX_AGE_SECONDS = 31536000
+_HSTS_HEADER = (
+    b"strict-transport-security",
+    f"max-age={HSTS_MAX_AGE_SECONDS}; includeSubDomains".encode("latin-1"),
+)
 
-class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
+
+def _https_location(scope: Scope) -> str:
+    """
+    URL https:// equivalente a la del request, armada directo desde el scope
+    (host header, raw_path y query_string) sin construir ni parsear un URL.
+    """
+    host = None
+    for key, value in scope["headers"]:
+        if key == b"host":
+            host = value.decode("latin-1")
+            break
+    if host is None:
+        server = scope.get("server")
+        if server is None:
+            host = ""
+        else:
+            server_host, port = server
+            host = server_host if port in (None, 80) else f"{server_host}:{port}"
+
+    raw_path = scope.get("raw_path")
+    path = raw_path.decode("latin-1") if raw_path else scope["path"]
+    query = scope.get("query_string", b"")
+    if query:
+        return f"https://{host}{path}?{query.decode('latin-1')}"
+    return f"https://{host}{path}"
+
+
+class HTTPSRedirectMiddleware:
     """
     Middleware que redirige HTTP → HTTPS en producción.
     Agrega header HSTS para fortalecer seguridad en tránsito.
@@ -26,24 +58,31 @@ class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
     - En producción: HTTP → HTTPS (status 308)
     - Siempre: Agrega HSTS header en respuestas HTTPS
 
+    Implementado como middleware ASGI puro (no BaseHTTPMiddleware): solo lee
+    el scheme del scope y agrega un header al mensaje http.response.start,
+    sin task groups ni streams intermedios por request.
+
     AC#1.2: Redirección automática HTTP → HTTPS (status 308)
     AC#1.3: HSTS header habilitado
     """
 
-    def __init__(self, app, environment: str = "development", https_enabled: bool = True):
+    def __init__(self, app: ASGIApp, environment: str = "development", https_enabled: bool = True):
         """
         Args:
-            app: Aplicación FastAPI
+            app: Aplicación ASGI envuelta
             environment: 'development' o 'production'
             https_enabled: Si False, desactiva redirección (útil para testing)
         """
-        super().__init__(app)
+        self.app = app
         self.environment = environment.lower()
         self.https_enabled = https_enabled
+        # Fijo por instancia: en producción con HTTPS se redirige todo HTTP
+        # y toda respuesta lleva HSTS; no se reevalúa en cada request
+        self._enforce_https = self.environment == "production" and self.https_enabled
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Procesa cada request.
+        Procesa cada request HTTP.
 
         En producción:
         - Si scheme == 'http' → redirecciona a 'https://host/path' (308)
@@ -51,52 +90,54 @@ class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
         En todas las respuestas HTTPS:
         - Agrega header: Strict-Transport-Security
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scheme = scope.get("scheme", "http")
+        path = scope.get("path", "")
+
         # Validar si es HTTP en producción
-        if (
-            self.environment == "production"
-            and self.https_enabled
-            and request.url.scheme == "http"
-        ):
-            # Construir URL HTTPS
-            https_url = request.url.replace(scheme="https")
-
-            logger.info(
-                json.dumps({
-                    "event": "https_redirect",
-                    "client_ip": request.client.host if request.client else "unknown",
-                    "method": request.method,
-                    "path": request.url.path,
-                    "from": "http",
-                    "to": "https",
-                    "status_code": 308
-                })
-            )
+        if self._enforce_https and scheme == "http":
+            if logger.isEnabledFor(logging.INFO):
+                client = scope.get("client")
+                logger.info(
+                    json.dumps({
+                        "event": "https_redirect",
+                        "client_ip": client[0] if client else "unknown",
+                        "method": scope.get("method"),
+                        "path": path,
+                        "from": "http",
+                        "to": "https",
+                        "status_code": 308
+                    })
+                )
 
             # Retornar redirección con status 308 (Permanent Redirect)
-            return RedirectResponse(
-                url=https_url,
+            response = RedirectResponse(
+                url=_https_location(scope),
                 status_code=308  # 308 Permanent Redirect (mantiene método HTTP)
             )
-
-        # Procesar request normalmente
-        response = await call_next(request)
+            await response(scope, receive, send)
+            return
 
         # Agregar HSTS header en respuestas HTTPS
-        # max-age: 1 año (31536000 segundos)
-        # includeSubDomains: aplica a todos los subdominios
-        if request.url.scheme == "https" or (
-            self.environment == "production" and self.https_enabled
-        ):
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
-
-            logger.debug(
-                json.dumps({
-                    "event": "hsts_header_added",
-                    "path": request.url.path,
-                    "max_age_seconds": 31536000
-                })
-            )
-
-        return response
+        if not (self._enforce_https or scheme == "https"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_hsts(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), _HSTS_HEADER]
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        json.dumps({
+                            "event": "hsts_header_added",
+                            "path": path,
+                            "max_age_seconds": HSTS_MAX_AGE_SECONDS
+                        })
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_hsts)
@@ -10,28 +10,84 @@ Usage:
 
 import time
 import logging
-from typing import Dict, Tuple
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.security import verify_request_token
 
 logger = logging.getLogger(__name__)
 
 
+# Bucket state packed into one int per key: upper bits = tokens in
+# millitokens, lower 32 bits = last refill in ms of the monotonic clock
+# (wraps every ~49 days; elapsed times are computed modulo 2**32)
+_MS_MASK = 0xFFFFFFFF
+
+
+def _now_ms() -> int:
+    """Monotonic clock in ms, truncated to the 32-bit packed field."""
+    return (time.monotonic_ns() // 1_000_000) & _MS_MASK
+
+
+def _pack(tokens_milli: int, last_ms: int) -> int:
+    return (tokens_milli << 32) | last_ms
+
+
+# X-RateLimit-Reset has one-second resolution: keep the last encoded header
+# and rebuild it only when the value changes. Concurrent callers may both
+# rebuild it; either result is correct
+_reset_cache: Tuple[int, Tuple[bytes, bytes]] = (-1, (b"x-ratelimit-reset", b""))
+
+
+def _reset_header(reset_ms: int) -> Tuple[bytes, bytes]:
+    """Encoded X-RateLimit-Reset header: epoch second of now + reset_ms."""
+    global _reset_cache
+    reset_at = int(time.time()) + -(-reset_ms // 1000)
+    cached_at, header = _reset_cache
+    if cached_at != reset_at:
+        header = (b"x-ratelimit-reset", str(reset_at).encode("latin-1"))
+        _reset_cache = (reset_at, header)
+    return header
+
+
+# Amortized cleanup: every _SWEEP_EVERY checks, drop up to _SWEEP_BATCH
+# buckets idle for longer than the store's max age
+_SWEEP_EVERY = 1024
+_SWEEP_BATCH = 64
+
+
 class RateLimitStore:
     """
     In-memory rate limit store using token bucket algorithm.
 
     Thread-safe storage for rate limit buckets per user/endpoint combination.
+    Each bucket is a single packed int (see _pack): a check is one dict read
+    and one dict write with integer arithmetic, no per-bucket dict.
+
+    Buckets are re-inserted on every check, so dict order is least recently
+    used first; idle buckets are swept from the front in small batches
+    instead of growing the map forever.
     """
 
-    def __init__(self):
-        """Initialize rate limit storage."""
-        # Format: {key: {"tokens": float, "last_refill": float}}
-        self._buckets: Dict[str, Dict[str, float]] = {}
-        self._lock = __import__('threading').Lock()
+    def __init__(self, max_age_seconds: int = 3600):
+        """
+        Initialize rate limit storage.
 
-    def get_bucket(self, key: str, capacity: int, refill_rate: float) -> Tuple[bool, float]:
+        Args:
+            max_age_seconds: Idle time after which a bucket is dropped by the
+                periodic sweep (a bucket idle this long has refilled anyway)
+        """
+        # Format: {key: packed (tokens_milli, last_refill_ms)}; keys are any
+        # hashable (the middleware uses (kind, identity, path) tuples)
+        self._buckets: Dict[Hashable, int] = {}
+        self._max_age_ms = max_age_seconds * 1000
+        self._ops_since_sweep = 0
+        # CPython has no compare-and-swap: the read-modify-write below must
+        # hold the lock or concurrent threadpool callers lose updates
+        self._lock = threading.Lock()
+
+    def get_bucket(self, key: Hashable, capacity: int, refill_rate: float) -> Tuple[bool, float, int]:
         """
         Check and update token bucket for rate limiting.
 
@@ -41,32 +97,62 @@ class RateLimitStore:
             refill_rate: Tokens per second to add
 
         Returns:
-            Tuple of (allowed: bool, remaining_tokens: float)
+            Tuple of (allowed: bool, remaining_tokens: float, reset_ms: int),
+            reset_ms being the time until the next whole token is available
+            (0 if one is available now or the bucket never refills)
         """
+        capacity_milli = capacity * 1000
         with self._lock:
-            now = time.time()
-
-            # Initialize bucket if not exists
-            if key not in self._buckets:
-                self._buckets[key] = {
-                    "tokens": float(capacity),
-                    "last_refill": now
-                }
-
-            bucket = self._buckets[key]
+            now_ms = _now_ms()
+            # pop + re-insert below keeps the dict in last-touched order
+            state = self._buckets.pop(key, None)
 
-            # Calculate tokens to add based on time elapsed
-            time_elapsed = now - bucket["last_refill"]
-            tokens_to_add = time_elapsed * refill_rate
-            bucket["tokens"] = min(capacity, bucket["tokens"] + tokens_to_add)
-            bucket["last_refill"] = now
+            if state is None:
+                # New bucket starts full
+                tokens_milli, last_ms = capacity_milli, now_ms
+            else:
+                tokens_milli, last_ms = state >> 32, state & _MS_MASK
+                # tokens/s == millitokens/ms
+                tokens_to_add = int(((now_ms - last_ms) & _MS_MASK) * refill_rate)
+                if tokens_to_add > 0 or tokens_milli >= capacity_milli:
+                    tokens_milli = min(capacity_milli, tokens_milli + tokens_to_add)
+                    last_ms = now_ms
+                # else: less than one millitoken accrued; keep last_ms so
+                # frequent calls do not discard the fractional refill
 
             # Check if request allowed
-            if bucket["tokens"] >= 1:
-                bucket["tokens"] -= 1
-                return True, bucket["tokens"]
-            else:
-                return False, bucket["tokens"]
+            allowed = tokens_milli >= 1000
+            if allowed:
+                tokens_milli -= 1000
+            self._buckets[key] = _pack(tokens_milli, last_ms)
+
+            self._ops_since_sweep += 1
+            if self._ops_since_sweep >= _SWEEP_EVERY:
+                self._ops_since_sweep = 0
+                self._sweep(now_ms, self._max_age_ms, _SWEEP_BATCH)
+
+        reset_ms = 0
+        if tokens_milli < 1000 and refill_rate > 0:
+            # millitokens / (millitokens/ms), rounded up
+            reset_ms = -int((tokens_milli - 1000) // refill_rate)
+        return allowed, tokens_milli / 1000, reset_ms
+
+    def _sweep(self, now_ms: int, max_age_ms: int, limit: Optional[int] = None) -> int:
+        """
+        Drop buckets idle for more than max_age_ms, oldest first; stops at the
+        first recent bucket or after `limit` removals. Caller holds the lock.
+        """
+        to_remove = []
+        for key, state in self._buckets.items():
+            if ((now_ms - (state & _MS_MASK)) & _MS_MASK) <= max_age_ms:
+                break
+            to_remove.append(key)
+            if limit is not None and len(to_remove) >= limit:
+                break
+
+        for key in to_remove:
+            del self._buckets[key]
+        return len(to_remove)
 
     def cleanup_old_buckets(self, max_age_seconds: int = 3600):
         """
@@ -76,25 +162,77 @@ class RateLimitStore:
             max_age_seconds: Remove buckets older than this (default 1 hour)
         """
         with self._lock:
-            now = time.time()
-            to_remove = []
-
-            for key, bucket in self._buckets.items():
-                if now - bucket["last_refill"] > max_age_seconds:
-                    to_remove.append(key)
-
-            for key in to_remove:
-                del self._buckets[key]
+            removed = self._sweep(_now_ms(), max_age_seconds * 1000)
 
-            if to_remove:
-                logger.debug(f"Cleaned up {len(to_remove)} old rate limit buckets")
+        if removed:
+            logger.debug("Cleaned up %s old rate limit buckets", removed)
 
 
 # Global rate limit store
 _rate_limit_store = RateLimitStore()
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+def _bucket_key(scope: Scope, endpoint_path: str, key_type: str) -> Tuple[str, object, str]:
+    """
+    Bucket key ("user", user_id, path) for 'user' limits with a valid
+    token, ("ip", client_ip, path) otherwise. Tuples avoid building and
+    hashing a formatted string per request.
+    """
+    if key_type == "user":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value.startswith(b"Bearer "):
+                    # Verified once per request: the auth dependency
+                    # reuses this payload from the request context, and
+                    # repeat requests hit the verified-token cache.
+                    # Unverified claims are never trusted (no spending
+                    # another user's bucket with a forged token)
+                    payload = verify_request_token(value[7:].decode("latin-1"))
+                    if payload is not None and payload.get("user_id") is not None:
+                        return ("user", payload["user_id"], endpoint_path)
+                break
+
+    client = scope.get("client")
+    client_ip = client[0] if client else "unknown"
+    return ("ip", client_ip, endpoint_path)
+
+
+def consume(
+    scope: Scope,
+    endpoint_path: str,
+    capacity: int,
+    refill_rate: float,
+    key_type: str = "user",
+    store: Optional[RateLimitStore] = None
+) -> Tuple[Hashable, bool, float, int]:
+    """
+    Derive the bucket key from the request and take one token.
+
+    The Authorization header is read once, here; callers do not build the
+    key separately.
+
+    Args:
+        scope: ASGI scope (a Request works too: it is a mapping over its scope)
+        endpoint_path: Path the bucket is scoped to
+        capacity: Maximum tokens in bucket
+        refill_rate: Tokens per second to add
+        key_type: "user" (verified token user_id, IP fallback) or "ip"
+        store: Bucket storage (defaults to the process-wide store)
+
+    Returns:
+        Tuple of (key, allowed, remaining_tokens, reset_ms), as in
+        RateLimitStore.get_bucket plus the key used
+    """
+    key = _bucket_key(scope, endpoint_path, key_type)
+    allowed, remaining, reset_ms = (store or _rate_limit_store).get_bucket(
+        key=key,
+        capacity=capacity,
+        refill_rate=refill_rate
+    )
+    return key, allowed, remaining, reset_ms
+
+
+class RateLimitMiddleware:
     """
     Rate limiting middleware for FastAPI applications.
 
@@ -104,6 +242,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     - IA endpoints: 10 requests per 60 seconds per user
     - Health check: 20 requests per 60 seconds per IP
     - Retrieve endpoint: 15 requests per 60 seconds per user
+
+    Pure ASGI middleware (not BaseHTTPMiddleware): the bucket check runs on
+    the raw scope before routing, dependency resolution or body parsing, and
+    over-limit requests are answered with a pre-serialized 429 body.
     """
 
     # Endpoint-specific rate limits (requests per 60 seconds)
@@ -117,107 +259,114 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     # Default rate limit window (seconds)
     RATE_LIMIT_WINDOW = 60
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp, store: Optional[RateLimitStore] = None):
         """
-        Process request with rate limiting.
-
         Args:
-            request: HTTP request
-            call_next: Next middleware/handler
+            app: Wrapped ASGI application
+            store: Bucket storage (defaults to the process-wide store)
+        """
+        self.app = app
+        self.store = store or _rate_limit_store
+        # Endpoint classification: exact path lookup first (the common case,
+        # e.g. /api/ia/query); prefixes longest-first for the fallback.
+        # str.startswith(tuple) rejects unlimited paths in a single call
+        # Values carry the configured path itself: buckets are keyed by this
+        # long-lived str (hash cached, identity hit on dict compare) instead
+        # of the per-request scope path. Sub-paths share their prefix's
+        # bucket, so varying the suffix does not open a fresh bucket. The
+        # refill rate (tokens/s) and the encoded
+        # X-RateLimit-Limit header are also fixed per endpoint, so the hot
+        # path only unpacks them
+        window = self.RATE_LIMIT_WINDOW
+        self._limit_by_prefix = {
+            prefix: (
+                limit,
+                key_type,
+                prefix,
+                limit / window,
+                (b"x-ratelimit-limit", str(limit).encode("latin-1"))
+            )
+            for prefix, (limit, key_type) in self.ENDPOINT_LIMITS.items()
+        }
+        self._prefixes = tuple(sorted(self._limit_by_prefix, key=len, reverse=True))
+        # 429 responses only depend on the limit: serialize the body and
+        # encode the fixed headers once; X-RateLimit-Reset is appended per
+        # request
+        self._reject_responses = {}
+        for limit, _ in self.ENDPOINT_LIMITS.values():
+            body = orjson.dumps({
+                "detail": f"Rate limit exceeded: {limit} requests per {window} seconds",
+                "retry_after": window
+            })
+            headers = (
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(window).encode("latin-1")),
+                (b"x-ratelimit-limit", str(limit).encode("latin-1")),
+                (b"x-ratelimit-remaining", b"0"),
+            )
+            self._reject_responses[limit] = (body, headers)
 
-        Returns:
-            HTTP response with rate limit headers
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
+        Process request with rate limiting.
+
+        Adds X-RateLimit-* headers to limited endpoints and answers 429
+        without calling the application when the bucket is empty.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Check if endpoint has rate limiting enabled
-        endpoint_path = request.url.path
-        limit_found = None
-        key_type = None
-
-        # Match endpoint pattern
-        for pattern, (limit, key_type_val) in self.ENDPOINT_LIMITS.items():
-            if endpoint_path.startswith(pattern):
-                limit_found = limit
-                key_type = key_type_val
-                break
+        endpoint_path = scope["path"]
+        if not endpoint_path.startswith(self._prefixes):
+            # If no limit configured, allow request
+            await self.app(scope, receive, send)
+            return
+
+        matched = self._limit_by_prefix.get(endpoint_path)
+        if matched is None:
+            matched = next(
+                self._limit_by_prefix[prefix]
+                for prefix in self._prefixes
+                if endpoint_path.startswith(prefix)
+            )
+        limit, key_type, endpoint_path, refill_rate, limit_header = matched
 
-        # If no limit configured, allow request
-        if limit_found is None:
-            response = await call_next(request)
-            return response
-
-        # Build rate limit key
-        if key_type == "user":
-            # Extract user ID from token or session
-            # For now, use a simple approach
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.startswith("Bearer "):
-                # In real implementation, decode JWT to get user_id
-                user_id = auth_header.split()[-1][:10]  # Simplified
-                key = f"rate_limit:user:{user_id}:{endpoint_path}"
-            else:
-                # Unauthenticated request - use IP
-                key = f"rate_limit:ip:{request.client.host}:{endpoint_path}"
-        else:  # ip-based
-            key = f"rate_limit:ip:{request.client.host}:{endpoint_path}"
-
-        # Convert limit per 60s to tokens per second
-        refill_rate = limit_found / self.RATE_LIMIT_WINDOW
-
-        # Check rate limit
-        allowed, remaining = _rate_limit_store.get_bucket(
-            key=key,
-            capacity=limit_found,
-            refill_rate=refill_rate
+        key, allowed, remaining, reset_ms = consume(
+            scope, endpoint_path, limit, refill_rate, key_type, self.store
         )
+        # Reset: when the next request will be allowed (now if a token is left)
+        reset_header = _reset_header(reset_ms)
 
         if not allowed:
             logger.warning(
-                f"Rate limit exceeded for {key}: "
-                f"limit={limit_found}/{self.RATE_LIMIT_WINDOW}s"
+                "Rate limit exceeded for %s: limit=%s/%ss",
+                key, limit, self.RATE_LIMIT_WINDOW
             )
-
-            response = JSONResponse(
-                status_code=429,
-                content={
-                    "detail": f"Rate limit exceeded: "
-                              f"{limit_found} requests per {self.RATE_LIMIT_WINDOW} seconds",
-                    "retry_after": self.RATE_LIMIT_WINDOW
-                }
-            )
-            response.headers["Retry-After"] = str(self.RATE_LIMIT_WINDOW)
-            response.headers["X-RateLimit-Limit"] = str(limit_found)
-            response.headers["X-RateLimit-Remaining"] = "0"
-            response.headers["X-RateLimit-Reset"] = str(int(time.time()) + self.RATE_LIMIT_WINDOW)
-            return response
-
-        # Process request
-        response = await call_next(request)
+            body, headers = self._reject_responses[limit]
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [*headers, reset_header],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
 
         # Add rate limit headers to response
-        response.headers["X-RateLimit-Limit"] = str(limit_found)
-        response.headers["X-RateLimit-Remaining"] = str(int(remaining))
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + self.RATE_LIMIT_WINDOW)
-
-        return response
-
-
-def get_rate_limit_key(request: Request, endpoint: str = None) -> str:
-    """
-    Get rate limit key for request.
+        rate_headers = (
+            limit_header,
+            (b"x-ratelimit-remaining", str(int(remaining)).encode("latin-1")),
+            reset_header,
+        )
 
-    Args:
-        request: HTTP request
-        endpoint: Optional endpoint identifier
+        async def send_with_rate_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *rate_headers]
+            await send(message)
 
-    Returns:
-        Rate limit key string
-    """
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        user_id = auth_header.split()[-1][:10]
-        return f"user:{user_id}"
-    else:
-        return f"ip:{request.client.host}"
+        await self.app(scope, receive, send_with_rate_headers)
 
 
 def check_rate_limit(
@@ -228,6 +377,9 @@ def check_rate_limit(
     """
     Check if request is within rate limit.
 
+    Deprecated: use consume(), which derives the key from the request and
+    returns the remaining tokens and reset time in the same call.
+
     Args:
         key: Rate limit key
         limit: Number of requests allowed
@@ -237,7 +389,7 @@ def check_rate_limit(
         True if request allowed, False otherwise
     """
     refill_rate = limit / window
-    allowed, _ = _rate_limit_store.get_bucket(
+    allowed, _, _ = _rate_limit_store.get_bucket(
         key=key,
         capacity=limit,
         refill_rate=refill_rate
@@ -6,6 +6,9 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
+from pydantic import BaseModel, ConfigDict
+from pydantic import Field as PydanticField
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -39,7 +42,7 @@ class DocumentBase(SQLModel):
     """Base model para Document con campos comunes"""
     title: str = Field(max_length=200, index=True)
     description: str | None = Field(default=None)
-    category: str = Field(max_length=100, index=True)
+    category: str = Field(max_length=100)
     file_type: str = Field(max_length=10)  # 'pdf' o 'txt'
     file_size_bytes: int
 
@@ -47,6 +50,18 @@ class DocumentBase(SQLModel):
 class Document(DocumentBase, table=True):
     """Modelo de documento persistente en base de datos"""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Listado por categoría: WHERE category = :c ORDER BY upload_date DESC,
+        # id DESC (también paginado por keyset) se resuelve con un range scan
+        # sin ordenamiento adicional. La columna inicial también sirve los
+        # filtros sólo por categoría.
+        Index(
+            "ix_documents_category_upload_date_id",
+            "category",
+            text("upload_date DESC"),
+            text("id DESC")
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     file_path: str = Field(max_length=500, unique=True)
@@ -112,7 +127,10 @@ class DocumentCategoryUpdate(SQLModel):
     description: str | None = Field(default=None)
 
 
-class DocumentStatusResponse(SQLModel):
+# Schemas solo de respuesta: BaseModel de pydantic en vez de SQLModel. No
+# se persisten ni necesitan la maquinaria de SQLModel, y se construyen
+# varias veces más rápido (un SearchResult/DocumentResponse por fila)
+class DocumentStatusResponse(BaseModel):
     """Schema para respuesta de estado de indexación de documento"""
     document_id: int
     title: str
@@ -129,17 +147,17 @@ class SearchRequest(SQLModel):
     offset: int = Field(default=0, ge=0, description="Offset para paginación")
 
 
-class SearchResult(SQLModel):
+class SearchResult(BaseModel):
     """Schema para un resultado individual de búsqueda"""
     document_id: int
     title: str
     category: str
-    relevance_score: float = Field(ge=0.0, le=1.0, description="Score de relevancia normalizado")
-    snippet: str | None = Field(default=None, description="Fragmento de contexto con la coincidencia")
+    relevance_score: float = PydanticField(ge=0.0, le=1.0, description="Score de relevancia normalizado")
+    snippet: str | None = PydanticField(default=None, description="Fragmento de contexto con la coincidencia")
     upload_date: datetime
 
 
-class SearchResponse(SQLModel):
+class SearchResponse(BaseModel):
     """Schema para respuesta completa de búsqueda"""
     query: str
     total_results: int
@@ -147,7 +165,7 @@ class SearchResponse(SQLModel):
 
 
 # Schemas para listado y consulta de documentos (Story 2.5)
-class DocumentResponse(SQLModel):
+class DocumentResponse(BaseModel):
     """Schema para respuesta de documento con uploaded_by como username"""
     id: int
     title: str
@@ -160,14 +178,23 @@ class DocumentResponse(SQLModel):
     is_indexed: bool
     indexed_at: datetime | None
 
-    model_config = {"from_attributes": True}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentListRequest(SQLModel):
-    """Schema para query params de listado de documentos"""
+    """
+    Schema para query params de listado de documentos.
+
+    Paginación por keyset (solo sort_by=upload_date): cursor es el valor
+    opaco recibido en el header X-Next-Cursor de la página anterior
+    (base64 de "upload_date_iso|id" del último documento). Con cursor se
+    ignora offset. offset se mantiene para compatibilidad; su costo crece
+    con la profundidad de la página.
+    """
     category: str | None = Field(default=None, description="Filtrar por categoría")
     limit: int = Field(default=20, ge=1, le=100, description="Límite de resultados")
-    offset: int = Field(default=0, ge=0, description="Offset para paginación")
+    offset: int = Field(default=0, ge=0, description="Offset para paginación (obsoleto, usar cursor)")
+    cursor: str | None = Field(default=None, description="Cursor keyset de la página anterior")
     sort_by: SortByEnum = Field(
         default=SortByEnum.UPLOAD_DATE,
         description="Campo de ordenamiento permitido"
@@ -178,10 +205,10 @@ class DocumentListRequest(SQLModel):
     )
 
 
-class CategoryResponse(SQLModel):
+class CategoryResponse(BaseModel):
     """Schema para respuesta de categoría con contador de documentos"""
     name: str
     description: str | None
     document_count: int
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -6,7 +6,8 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -23,21 +24,47 @@ class ContentType(str, Enum):
 
 class GeneratedContentBase(SQLModel):
     """Base model para GeneratedContent con campos comunes"""
-    document_id: int = Field(foreign_key="documents.id", index=True)
+    document_id: int = Field(foreign_key="documents.id")
     user_id: int = Field(foreign_key="user.id", index=True)
     content_type: ContentType = Field(index=True)
-    content_json: dict[str, Any] = Field(sa_type=JSON)
+    # JSONB en PostgreSQL: formato binario ya parseado, indexable con GIN
+    content_json: dict[str, Any] = Field(
+        sa_type=JSON().with_variant(JSONB(), "postgresql")
+    )
 
 
 class GeneratedContent(GeneratedContentBase, table=True):
     """Modelo de contenido generado persistente en base de datos"""
     __tablename__ = "generated_content"
+    __table_args__ = (
+        # Listado admin paginado por keyset: WHERE (created_at, id) < (...)
+        # ORDER BY created_at DESC, id DESC es un range scan sobre este índice
+        Index(
+            "ix_generated_content_created_id",
+            text("created_at DESC"),
+            text("id DESC")
+        ),
+        # Búsqueda de caché: WHERE document_id = :d AND content_type = :t
+        # AND deleted_at IS NULL. Reemplaza al índice sobre document_id, que
+        # es prefijo de éste.
+        Index(
+            "ix_generated_content_doc_type_deleted",
+            "document_id",
+            "content_type",
+            "deleted_at"
+        ),
+        # Consultas de contención (@>) sobre content_json. Solo PostgreSQL:
+        # en SQLite content_json es texto y un B-tree sobre él no sirve
+        Index(
+            "ix_generated_content_content_json",
+            "content_json",
+            postgresql_using="gin",
+            postgresql_ops={"content_json": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    created_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        index=True
-    )
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     # Admin validation fields (Story 4.5)
     is_validated: bool = Field(default=False, index=True)
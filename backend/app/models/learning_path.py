@@ -7,6 +7,7 @@ from enum import Enum
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import JSON, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
 if TYPE_CHECKING:
@@ -25,7 +26,10 @@ class LearningPathBase(SQLModel):
     user_id: int = Field(foreign_key="user.id", index=True)
     topic: str = Field(index=True)
     user_level: UserLevel = Field(index=True)
-    content_json: dict[str, Any] = Field(sa_type=JSON)
+    # JSONB en PostgreSQL: se lee sin re-parsear el texto en cada consulta
+    content_json: dict[str, Any] = Field(
+        sa_type=JSON().with_variant(JSONB(), "postgresql")
+    )
 
 
 class LearningPath(LearningPathBase, table=True):
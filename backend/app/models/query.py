@@ -14,8 +14,10 @@ AC#8: Logging metrics for RAG responses including:
 """
 
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
+from sqlalchemy import JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -27,9 +29,12 @@ class QueryBase(SQLModel):
 
     Task 6: Added cache_hit field to track caching performance (AC#2)
     """
-    query_text: str = Field(max_length=500, index=True)
+    query_text: str = Field(max_length=500)
     answer_text: str
-    sources_json: str  # JSON array of {document_id, title, relevance_score}
+    # List of {document_id, title, relevance_score}; the column type serializes it
+    sources_json: list[dict[str, Any]] = Field(
+        sa_type=JSON().with_variant(JSONB(), "postgresql")
+    )
     response_time_ms: float = Field(ge=0)
     sources_count: int = Field(default=0, ge=0)  # Number of documents retrieved
     cache_hit: bool = Field(default=False, description="Whether response was served from cache (Task 6: AC#2)")
@@ -38,13 +43,34 @@ class QueryBase(SQLModel):
 class Query(QueryBase, table=True):
     """RAG Query persistent database model"""
     __tablename__ = "queries"
+    __table_args__ = (
+        # "Latest N queries for user": one range scan instead of two indexes + sort
+        Index(
+            "ix_queries_user_created",
+            "user_id",
+            text("created_at DESC"),
+            postgresql_include=["cache_hit", "response_time_ms"]
+        ),
+        # Append-only: BRIN en PostgreSQL (B-tree en SQLite)
+        Index(
+            "ix_queries_created_at",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32}
+        ),
+        # Analítica por documento fuente (sources_json @> '[{"document_id": 3}]').
+        # Solo PostgreSQL: en SQLite sources_json es texto
+        Index(
+            "ix_queries_sources_json",
+            "sources_json",
+            postgresql_using="gin",
+            postgresql_ops={"sources_json": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id", index=True)
-    created_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        index=True
-    )
+    user_id: int = Field(foreign_key="user.id")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     # NOTE: Relationship with user intentionally omitted to avoid circular imports
     # Query is referenced primarily for audit logging, not relational queries
@@ -81,13 +107,24 @@ class PerformanceMetric(PerformanceMetricBase, table=True):
     - query_id: Foreign key to the Query record
     """
     __tablename__ = "performance_metrics"
+    __table_args__ = (
+        Index(
+            "ix_performance_metrics_query_created",
+            "query_id",
+            text("created_at DESC"),
+            postgresql_include=["cache_hit", "total_time_ms"]
+        ),
+        Index(
+            "ix_performance_metrics_created_at",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32}
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    query_id: int = Field(foreign_key="queries.id", index=True)
-    created_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        index=True
-    )
+    query_id: int = Field(foreign_key="queries.id")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class PerformanceMetricCreate(PerformanceMetricBase):
@@ -6,6 +6,8 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, List
 
+from sqlalchemy import Column, DateTime, Index, text
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -14,6 +16,23 @@ if TYPE_CHECKING:
     from .query import Query
 
 
+class _UTCDateTime(TypeDecorator):
+    """
+    DateTime que siempre se lee como datetime UTC offset-aware.
+
+    SQLite no guarda zona horaria y devuelve valores naive aunque se hayan
+    escrito aware; se asume UTC al cargar para que las comparaciones con
+    datetime.now(timezone.utc) no necesiten normalizar en cada request.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
 class UserRole(str, Enum):
     """Enum para roles de usuario"""
     admin = "admin"
@@ -31,13 +50,26 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     """Modelo de usuario persistente en base de datos"""
+    __table_args__ = (
+        # Índice parcial: solo usuarios con bloqueo registrado
+        Index(
+            "ix_user_locked_until",
+            "locked_until",
+            postgresql_where=text("locked_until IS NOT NULL"),
+            sqlite_where=text("locked_until IS NOT NULL")
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     hashed_password: str = Field(max_length=255)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_login: datetime | None = Field(default=None)
     failed_login_attempts: int = Field(default=0, ge=0)
-    locked_until: datetime | None = Field(default=None)
+    locked_until: datetime | None = Field(
+        default=None,
+        sa_column=Column(_UTCDateTime(), nullable=True)
+    )
 
     # Relaciones
     documents: List["Document"] = Relationship(back_populates="user")
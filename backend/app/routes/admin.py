@@ -9,13 +9,14 @@ import json
 import logging
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 from io import BytesIO, StringIO
 import csv
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select, func, or_, and_
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, tuple_
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
@@ -23,7 +24,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
 from app.database import get_session
-from app.middleware.auth import get_current_user
+from app.middleware.auth import get_current_user, invalidate_user_cache
 from app.models import (
     User,
     GeneratedContent,
@@ -35,6 +36,7 @@ from app.models import (
 from app.models.generated_content import ContentType, GeneratedContentRead
 from app.models.quiz import QuizAttempt
 from app.schemas.admin import GeneratedContentValidateRequest
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.security import get_password_hash, verify_password
 from app.utils.validators import validate_password
 
@@ -60,6 +62,23 @@ class GeneratedContentListResponse:
     items: list[GeneratedContentResponse]
     limit: int
     offset: int
+    next_cursor: Optional[str]
+
+
+def _decode_keyset_cursor(cursor: str, keyset: bool) -> Tuple[datetime, int]:
+    """Decode a (created_at, id) cursor; raises 400 INVALID_CURSOR if malformed or not sorting by created_at"""
+    if not keyset:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_CURSOR", "message": "cursor requires sort_by=created_at"}
+        )
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_CURSOR", "message": "Invalid pagination cursor"}
+        )
 
 
 # Helper function to check admin role
@@ -89,12 +108,16 @@ async def list_generated_content(
     search: Optional[str] = Query(None, description="Search in ID, document name, user username"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of previous page), sort_by=created_at only"),
     sort_by: str = Query("created_at", description="Sort field: id, created_at, content_type"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order")
 ):
     """
     List all generated content with advanced filtering, sorting, and pagination.
 
+    When sorted by created_at, pages can be fetched with `cursor` (keyset
+    pagination over the (created_at, id) index) instead of `offset`.
+
     Only accessible to admin users.
     """
     try:
@@ -163,11 +186,15 @@ async def list_generated_content(
             "created_at": GeneratedContent.created_at,
             "content_type": GeneratedContent.content_type
         }.get(sort_by, GeneratedContent.created_at)
+        direction = desc if sort_order == "desc" else asc
 
-        if sort_order == "desc":
-            query = query.order_by(desc(sort_column))
+        # created_at ordering uses id as tie-breaker so it matches the
+        # (created_at, id) index and supports keyset pagination
+        keyset = sort_column is GeneratedContent.created_at
+        if keyset:
+            query = query.order_by(direction(GeneratedContent.created_at), direction(GeneratedContent.id))
         else:
-            query = query.order_by(asc(sort_column))
+            query = query.order_by(direction(sort_column))
 
         # Get total count before pagination
         count_query = select(func.count()).select_from(GeneratedContent).where(GeneratedContent.deleted_at.is_(None))
@@ -194,12 +221,25 @@ async def list_generated_content(
 
         total = db.exec(count_query).one()
 
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
+        # Apply pagination: keyset when a cursor is given, offset otherwise
+        if cursor:
+            cursor_created_at, cursor_id = _decode_keyset_cursor(cursor, keyset)
+            position = tuple_(GeneratedContent.created_at, GeneratedContent.id)
+            if sort_order == "desc":
+                query = query.where(position < tuple_(cursor_created_at, cursor_id))
+            else:
+                query = query.where(position > tuple_(cursor_created_at, cursor_id))
+            query = query.limit(limit)
+        else:
+            query = query.offset(offset).limit(limit)
 
         # Execute query
         results = db.exec(query).all()
 
+        next_cursor = None
+        if keyset and len(results) == limit:
+            next_cursor = encode_cursor(results[-1].created_at, results[-1].id)
+
         # Format response
         items = [
             {
@@ -231,12 +271,15 @@ async def list_generated_content(
             "admin_id": admin_user.id
         }))
 
-        return {
+        # Items are already plain dicts built from trusted rows: returning the
+        # response directly skips response_model validation and jsonable_encoder
+        return ORJSONResponse({
             "total": total,
             "items": items,
             "limit": limit,
-            "offset": offset
-        }
+            "offset": offset,
+            "next_cursor": next_cursor
+        })
 
     except HTTPException:
         raise
@@ -883,8 +926,18 @@ async def list_users(
         # Get total count
         total = db.exec(select(func.count()).select_from(User)).one()
 
-        # Get paginated results
-        query = select(User).offset(offset).limit(limit)
+        # Get paginated results: only the listed columns (no password hash,
+        # no ORM instances)
+        query = select(
+            User.id,
+            User.username,
+            User.full_name,
+            User.email,
+            User.role,
+            User.is_active,
+            User.created_at,
+            User.last_login
+        ).offset(offset).limit(limit)
         users = db.exec(query).all()
 
         logger.info(json.dumps({
@@ -894,7 +947,7 @@ async def list_users(
             "admin_id": admin_user.id
         }))
 
-        return {
+        return ORJSONResponse({
             "total": total,
             "users": [
                 {
@@ -911,7 +964,7 @@ async def list_users(
             ],
             "limit": limit,
             "offset": offset
-        }
+        })
 
     except Exception as e:
         logger.error(json.dumps({
@@ -1002,6 +1055,8 @@ async def update_user(
 
         db.add(user)
         db.commit()
+        # Rol e is_active se leen del caché de autenticación
+        invalidate_user_cache(user_id)
         db.refresh(user)
 
         # Create audit log
@@ -1079,6 +1134,7 @@ async def deactivate_user(
 
         db.add(user)
         db.commit()
+        invalidate_user_cache(user_id)
 
         # Create audit log
         audit_log = AuditLog(
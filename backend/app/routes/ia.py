@@ -12,11 +12,12 @@ import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.services.llm_service import get_llm_service, OllamaLLMService
 from app.services.retrieval_service import RetrievalService
 from app.services.learning_path_service import LearningPathService
+from app.services.audit_service import query_log_writer
 from app.database import get_session
 from app.models import LearningPath
 from sqlmodel import select
@@ -44,9 +45,9 @@ from app.schemas.ia import (
 
 # Import admin dependency for endpoint protection
 try:
-    from app.middleware.auth import get_current_user, require_role
+    from app.middleware.auth import get_current_principal, get_current_user, require_role
 
-    def get_current_admin_user(current_user = Depends(get_current_user)):
+    def get_current_admin_user(current_user = Depends(get_current_principal)):
         """Require admin role for endpoint access."""
         return require_role("admin")(current_user)
 except ImportError:
@@ -243,7 +244,7 @@ async def health_check(
                 f"response_time: {response_time_ms:.2f}ms"
             )
 
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=503,
                 content=response.model_dump(mode='json')
             )
@@ -261,7 +262,7 @@ async def health_check(
             response_time_ms=response_time_ms
         )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content=response.model_dump(mode='json')
         )
@@ -633,12 +634,10 @@ async def query_ai(
     Task 6 Implementation:
     - Uses RAGService.rag_query() which includes cache_hit flag
     - Extracts timing metrics: retrieval_time_ms, llm_time_ms
-    - Records both Query and PerformanceMetric records atomically
+    - Records both Query and PerformanceMetric records atomically (batched
+      off the request path by query_log_writer)
     """
-    from app.models.query import Query, PerformanceMetric
     from app.services.rag_service import RAGService
-    from sqlmodel import Session
-    import json
 
     start_time = time.time()
 
@@ -717,45 +716,40 @@ async def query_ai(
 
         # Task 6: Store query and metrics in database (AC#8)
         try:
-            # Convert sources to JSON
-            sources_json = json.dumps([
+            # sources_json is a JSON column: pass the list, not a JSON string
+            sources_json = [
                 {
                     "document_id": s.get("document_id"),
                     "title": s.get("title"),
                     "relevance_score": s.get("relevance_score")
                 }
                 for s in sources
-            ])
-
-            # Create Query record
-            query_record = Query(
-                user_id=current_user.id,
-                query_text=query_request.query,
-                answer_text=rag_response["answer"],
-                sources_json=sources_json,
-                response_time_ms=response_time_ms,
-                sources_count=len(sources),
-                cache_hit=cache_hit  # Task 6: Track cache hit in Query record
-            )
-            db.add(query_record)
-            db.commit()
-            db.refresh(query_record)
-
-            # Create PerformanceMetric record (Task 6: AC#8 detailed metrics)
-            metric = PerformanceMetric(
-                query_id=query_record.id,
-                retrieval_time_ms=retrieval_time_ms,
-                llm_time_ms=llm_time_ms,
-                total_time_ms=response_time_ms,
-                cache_hit=cache_hit  # Task 6: Record actual cache_hit flag
+            ]
+
+            # Query + PerformanceMetric (Task 6: AC#8 detailed metrics) are
+            # written in batches by the query log writer, off the request path
+            query_log_writer.submit(
+                {
+                    "user_id": current_user.id,
+                    "query_text": query_request.query,
+                    "answer_text": rag_response["answer"],
+                    "sources_json": sources_json,
+                    "response_time_ms": response_time_ms,
+                    "sources_count": len(sources),
+                    "cache_hit": cache_hit  # Task 6: Track cache hit in Query record
+                },
+                {
+                    "retrieval_time_ms": retrieval_time_ms,
+                    "llm_time_ms": llm_time_ms,
+                    "total_time_ms": response_time_ms,
+                    "cache_hit": cache_hit  # Task 6: Record actual cache_hit flag
+                },
+                db
             )
-            db.add(metric)
-            db.commit()
 
             logger.info(
-                f"Query {query_record.id} stored successfully - "
-                f"user: {current_user.id}, response_time: {response_time_ms:.2f}ms, "
-                f"cache_hit: {cache_hit}"
+                f"Query logged - user: {current_user.id}, "
+                f"response_time: {response_time_ms:.2f}ms, cache_hit: {cache_hit}"
             )
         except Exception as e:
             logger.error(f"Failed to store query metrics: {str(e)}")
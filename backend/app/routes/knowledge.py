@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Request, Response
 from fastapi.responses import FileResponse
+from pydantic import TypeAdapter
 from sqlmodel import Session, select
-from typing import Optional
+from typing import Any, Optional
 import os
 import re
 import logging
@@ -10,8 +11,10 @@ from app.database import get_session
 from app.middleware.auth import get_current_user
 from app.models.user import User, UserRole
 from app.models.document import Document, DocumentCategory, DocumentStatusResponse, SearchResponse, DocumentResponse, DocumentListRequest, CategoryResponse
-from app.models.audit import AuditLog, AuditLogCreate, AuditAction
+from app.models.audit import AuditLogCreate, AuditAction
+from app.core.pagination import encode_cursor
 from app.services.document_service import DocumentService
+from app.services.audit_service import audit_log_writer
 from app.services.search_service import SearchService
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge management"])
@@ -24,6 +27,17 @@ ALLOWED_EXTENSIONS = {'.pdf', '.txt'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 UPLOAD_DIR = "/uploads"
 
+# Respuestas de listado: los servicios ya entregan modelos validados, así que
+# pydantic-core los serializa a JSON directamente (sin la re-validación de
+# response_model ni el paso por dicts). response_model se mantiene para OpenAPI
+_DOCUMENT_LIST_ADAPTER = TypeAdapter(list[DocumentResponse])
+_CATEGORY_LIST_ADAPTER = TypeAdapter(list[CategoryResponse])
+
+
+def _json_response(adapter: TypeAdapter, content: Any) -> Response:
+    """Response JSON serializada por pydantic-core desde modelos ya validados"""
+    return Response(content=adapter.dump_json(content), media_type="application/json")
+
 def sanitize_filename(title: str) -> str:
     """Sanitiza título para usar como nombre de archivo"""
     # Remover caracteres especiales, reemplazar espacios con guiones bajos
@@ -183,9 +197,7 @@ async def upload_document(
             details=f"Document '{title}' uploaded to category '{category}'"
         )
 
-        audit_entry = AuditLog.model_validate(audit_log)
-        db.add(audit_entry)
-        db.commit()
+        audit_log_writer.submit(audit_log.model_dump(), db)
 
     except Exception as e:
         # No fallar el endpoint si auditoría falla, pero loggear error
@@ -312,7 +324,7 @@ async def search_documents(
             db=db
         )
 
-        return results
+        return Response(content=results.model_dump_json(), media_type="application/json")
 
     except ValueError as e:
         # AC7: Manejo de errores de validación (query muy corta/larga)
@@ -341,6 +353,7 @@ async def list_documents(
     offset: int = 0,
     sort_by: str = "upload_date",
     order: str = "desc",
+    cursor: Optional[str] = None,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ) -> list[DocumentResponse]:
@@ -356,6 +369,8 @@ async def list_documents(
     - limit, offset: paginación
     - sort_by: campo de ordenamiento (upload_date, title, file_size_bytes)
     - order: dirección de ordenamiento (asc, desc)
+    - cursor: paginación por keyset (solo sort_by=upload_date); cuando la
+      página está completa, el header X-Next-Cursor trae el cursor siguiente
 
     AC3: Validación de Sort Field
     - Valida que sort_by sea uno de: [upload_date, title, file_size_bytes]
@@ -368,6 +383,7 @@ async def list_documents(
         offset: Offset para paginación (default: 0)
         sort_by: Campo de ordenamiento - valores válidos: [upload_date, title, file_size_bytes] (default: upload_date)
         order: Dirección de ordenamiento - valores válidos: [asc, desc] (default: desc)
+        cursor: Cursor keyset (X-Next-Cursor de la página anterior); reemplaza a offset
         db: Sesión de base de datos
         current_user: Usuario autenticado (admin o user)
 
@@ -400,6 +416,7 @@ async def list_documents(
             category=category,
             limit=limit,
             offset=offset,
+            cursor=cursor,
             sort_by=sort_by,
             order=order
         )
@@ -410,10 +427,16 @@ async def list_documents(
             limit=document_list_request.limit,
             offset=document_list_request.offset,
             sort_by=document_list_request.sort_by.value,
-            order=document_list_request.order.value
+            order=document_list_request.order.value,
+            cursor=document_list_request.cursor
         )
 
-        return documents
+        response = _json_response(_DOCUMENT_LIST_ADAPTER, documents)
+        if sort_by == "upload_date" and len(documents) == document_list_request.limit:
+            last = documents[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.upload_date, last.id)
+
+        return response
 
     except ValueError as e:
         # Error de validación de parámetros
@@ -511,7 +534,7 @@ async def list_categories(
     """
     try:
         categories = await DocumentService.get_categories(db)
-        return categories
+        return _json_response(_CATEGORY_LIST_ADAPTER, categories)
 
     except Exception as e:
         # Error genérico del servidor
@@ -595,9 +618,7 @@ async def download_document(
                 details=f"Document '{safe_filename}' downloaded by user {current_user.username}"
             )
 
-            audit_entry = AuditLog.model_validate(audit_log)
-            db.add(audit_entry)
-            db.commit()
+            audit_log_writer.submit(audit_log.model_dump(), db)
 
         except Exception as e:
             # No fallar el endpoint si auditoría falla, pero loggear error
@@ -733,9 +754,7 @@ async def delete_document(
             )
 
             try:
-                audit_entry = AuditLog.model_validate(audit_log)
-                db.add(audit_entry)
-                db.commit()
+                audit_log_writer.submit(audit_log.model_dump(), db)
             except Exception as e:
                 # No fallar el endpoint si auditoría falla, pero loggear error
                 logger.error(f"Error creating audit log for delete attempt: {e}")
@@ -759,9 +778,7 @@ async def delete_document(
         )
 
         try:
-            audit_entry = AuditLog.model_validate(audit_log)
-            db.add(audit_entry)
-            db.commit()
+            audit_log_writer.submit(audit_log.model_dump(), db)
         except Exception as e:
             # No fallar el endpoint si auditoría falla, pero loggear error
             logger.error(f"Error creating audit log for document deletion: {e}")
@@ -15,10 +15,16 @@ Usage:
 import logging
 import json
 import asyncio
-from datetime import datetime
-from typing import Optional, Dict, Any
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Optional, Dict, Any, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
 from sqlmodel import Session
 
+from app.core.bulk import bulk_insert
+
 logger = logging.getLogger(__name__)
 
 
@@ -145,6 +151,285 @@ class AuditService:
             logger.error(f"Failed to persist audit log to database: {str(e)}")
 
 
+def write_audit_log(audit_data: Dict[str, Any]) -> None:
+    """
+    Persist a single AuditLog row using its own session.
+
+    Synchronous fallback of AuditLogWriter.submit() when the writer is not
+    running and the caller has no session.
+
+    Args:
+        audit_data: AuditLog field values (user_id, action, resource_type, ...)
+    """
+    # Import here to avoid circular imports; db_module allows monkey-patching in tests
+    import app.database as db_module
+    from app.models.audit import AuditLog
+
+    try:
+        with Session(db_module.engine) as session:
+            session.add(AuditLog(**audit_data))
+            session.commit()
+    except Exception as e:
+        # Audit failures shouldn't break requests
+        logger.error(
+            f"Failed to write audit log '{audit_data.get('action')}' "
+            f"user_id={audit_data.get('user_id')}: {str(e)}"
+        )
+
+
+def write_audit_log_batch(batch: List[Dict[str, Any]]) -> None:
+    """
+    Persist a batch of AuditLog rows with one executemany INSERT.
+
+    Args:
+        batch: List of AuditLog field values, as passed to write_audit_log
+    """
+    import app.database as db_module
+    from app.models.audit import AuditLog
+
+    try:
+        # Every row needs the same columns for a single executemany
+        rows = []
+        for audit_data in batch:
+            try:
+                rows.append(AuditLog.model_validate(audit_data).model_dump(exclude={"id"}))
+            except ValidationError as e:
+                logger.error(
+                    f"Dropped invalid audit log '{audit_data.get('action')}' "
+                    f"user_id={audit_data.get('user_id')}: {str(e)}"
+                )
+        if not rows:
+            return
+        with Session(db_module.engine) as session:
+            bulk_insert(session, AuditLog, rows)
+    except Exception as e:
+        logger.error(f"Failed to write {len(batch)} audit logs: {str(e)}")
+
+
+class BatchWriter(ABC):
+    """
+    Buffers append-only rows and writes them in batches off the request path.
+
+    Entries go into an in-memory deque (thread-safe append/popleft, so sync
+    endpoints running in the threadpool can submit too); a background task
+    started in the app lifespan flushes it every flush_interval seconds in
+    batches of up to batch_size entries. Subclasses implement submit() and
+    _write_batch().
+
+    When the buffer holds max_pending entries, new ones are dropped and
+    counted in `dropped` instead of blocking the request.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.1
+    ):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pending: Deque[Any] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _enqueue(self, entry: Any) -> bool:
+        """Buffer one entry; returns False (and counts it) when the buffer is full."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append(entry)
+        return True
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Any]) -> None:
+        """Persist one batch of entries; runs in a worker thread."""
+
+    async def flush(self) -> None:
+        """Write every buffered entry, batch_size entries per batch."""
+        while self._pending:
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.batch_size, len(self._pending)))
+            ]
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                # A failed batch is lost, but the flush task keeps running
+                logger.error(
+                    f"{type(self).__name__} failed to write {len(batch)} entries: {str(e)}"
+                )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop (app startup)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write what is still buffered (app shutdown)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Shutdown must go on (other writers, DB executor) even if the task died
+            logger.error(f"{type(self).__name__} flush task had failed: {str(e)}")
+        self._task = None
+        await self.flush()
+
+
+class AuditLogWriter(BatchWriter):
+    """
+    Batches AuditLog inserts off the request path, so requests never wait on
+    the audit INSERT.
+
+    When the writer is not running (scripts, tests without lifespan) submit()
+    writes synchronously, through the caller's session if one is given.
+    """
+
+    def submit(self, audit_data: Dict[str, Any], db: Optional[Session] = None) -> None:
+        """
+        Queue one AuditLog row for the next flush.
+
+        Args:
+            audit_data: AuditLog field values (user_id, action, resource_type, ...)
+            db: Request session, used only for the synchronous fallback
+        """
+        # Event time, not flush time
+        audit_data.setdefault("timestamp", datetime.now(timezone.utc))
+
+        if not self.running:
+            if db is None:
+                write_audit_log(audit_data)
+                return
+            from app.models.audit import AuditLog
+            db.add(AuditLog(**audit_data))
+            db.commit()
+            return
+
+        if not self._enqueue(audit_data):
+            logger.warning(
+                f"Audit buffer full ({self.max_pending}), dropped '{audit_data.get('action')}' "
+                f"user_id={audit_data.get('user_id')} (total dropped: {self.dropped})"
+            )
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        write_audit_log_batch(batch)
+
+
+audit_log_writer = AuditLogWriter()
+
+
+def write_query_log_batch(batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    """
+    Persist a batch of (Query, PerformanceMetric) rows in one transaction.
+
+    Queries go in with one multi-row INSERT ... RETURNING id (ordered like
+    the batch), so each metric gets its query_id without a round-trip per
+    row; metrics then go in with one executemany.
+
+    Args:
+        batch: (query_data, metric_data) pairs; metric_data has no query_id
+    """
+    import app.database as db_module
+    from app.models.query import Query, PerformanceMetric
+
+    query_table = Query.__table__
+    try:
+        # Validate both rows of a pair up front so a query never lands without its metric
+        query_rows, metric_rows = [], []
+        for query_data, metric_data in batch:
+            try:
+                query_row = Query.model_validate(query_data).model_dump(exclude={"id"})
+                metric_row = PerformanceMetric.model_validate(
+                    {**metric_data, "query_id": 0}
+                ).model_dump(exclude={"id"})
+            except ValidationError as e:
+                logger.error(
+                    f"Dropped invalid query log user_id={query_data.get('user_id')}: {str(e)}"
+                )
+                continue
+            query_rows.append(query_row)
+            metric_rows.append(metric_row)
+        if not query_rows:
+            return
+        with Session(db_module.engine) as session:
+            query_ids = session.scalars(
+                insert(query_table).returning(query_table.c.id, sort_by_parameter_order=True),
+                query_rows
+            ).all()
+            for metric_row, query_id in zip(metric_rows, query_ids):
+                metric_row["query_id"] = query_id
+            bulk_insert(session, PerformanceMetric, metric_rows)
+    except Exception as e:
+        logger.error(f"Failed to write {len(batch)} query logs: {str(e)}")
+
+
+class QueryLogWriter(BatchWriter):
+    """
+    Batches the Query + PerformanceMetric rows of RAG queries (AC#8) off the
+    request path. Both tables are append-only logs that grow with traffic.
+
+    When the writer is not running (scripts, tests without lifespan) submit()
+    writes synchronously through the caller's session.
+    """
+
+    def submit(
+        self,
+        query_data: Dict[str, Any],
+        metric_data: Dict[str, Any],
+        db: Optional[Session] = None
+    ) -> None:
+        """
+        Queue one query and its performance metric for the next flush.
+
+        Args:
+            query_data: Query field values (user_id, query_text, answer_text, ...)
+            metric_data: PerformanceMetric field values, without query_id
+            db: Request session, used only for the synchronous fallback
+        """
+        # Event time, not flush time
+        created_at = datetime.now(timezone.utc)
+        query_data.setdefault("created_at", created_at)
+        metric_data.setdefault("created_at", created_at)
+
+        if not self.running:
+            if db is None:
+                write_query_log_batch([(query_data, metric_data)])
+                return
+            from app.models.query import Query, PerformanceMetric
+            query_record = Query(**query_data)
+            db.add(query_record)
+            db.flush()  # Get query_record.id
+            db.add(PerformanceMetric(query_id=query_record.id, **metric_data))
+            db.commit()
+            return
+
+        if not self._enqueue((query_data, metric_data)):
+            logger.warning(
+                f"Query log buffer full ({self.max_pending}), dropped query "
+                f"user_id={query_data.get('user_id')} (total dropped: {self.dropped})"
+            )
+
+    def _write_batch(self, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        write_query_log_batch(batch)
+
+
+query_log_writer = QueryLogWriter()
+
+
 # Convenience function for quick audit logging
 async def log_ai_query(
     user_id: int,
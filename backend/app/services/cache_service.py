@@ -60,22 +60,28 @@ class CacheService:
         - TTL validation: checks if (current_time - timestamp) > ttl_seconds
         - LRU update: moves accessed item to end of OrderedDict for recent-use tracking
         """
-        if key not in self.cache:
+        # Single lookup + pop/try: entries may be removed concurrently by
+        # other threadpool workers between steps
+        entry = self.cache.get(key)
+        if entry is None:
             self.misses += 1
             return None
 
-        value, timestamp, ttl_seconds = self.cache[key]
+        value, timestamp, ttl_seconds = entry
         elapsed = time.time() - timestamp
 
         # Check TTL expiration
         if elapsed > ttl_seconds:
             logger.debug(f"Cache entry expired: key={key}, ttl={ttl_seconds}s, elapsed={elapsed:.2f}s")
-            del self.cache[key]
+            self.cache.pop(key, None)
             self.misses += 1
             return None
 
         # Update LRU ordering: move to end (most recently used)
-        self.cache.move_to_end(key)
+        try:
+            self.cache.move_to_end(key)
+        except KeyError:
+            pass
         self.hits += 1
 
         logger.debug(f"Cache hit: key={key}, elapsed={elapsed:.2f}s, ttl_remaining={ttl_seconds - elapsed:.2f}s")
@@ -98,8 +104,7 @@ class CacheService:
         current_time = time.time()
 
         # If key exists, remove it first (will be re-added at end of OrderedDict)
-        if key in self.cache:
-            del self.cache[key]
+        self.cache.pop(key, None)
 
         # Add to cache
         self.cache[key] = (value, current_time, ttl_seconds)
@@ -130,8 +135,7 @@ class CacheService:
             logger.info(f"Cache cleared: {cleared_size} entries removed")
         else:
             # Remove specific key
-            if key in self.cache:
-                del self.cache[key]
+            if self.cache.pop(key, None) is not None:
                 logger.debug(f"Cache entry invalidated: key={key}")
 
     def get_stats(self) -> Dict[str, Any]:
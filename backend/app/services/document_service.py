@@ -9,8 +9,10 @@ import logging
 import json
 from datetime import datetime, timezone
 from typing import List, Optional
+from sqlalchemy import tuple_
 from sqlmodel import Session, select, func
 
+from app.core.pagination import decode_cursor
 from app.models.document import Document, DocumentCategory, DocumentResponse, CategoryResponse
 from app.models.user import User
 from app.utils.pdf_extractor import extract_text_from_pdf, extract_text_from_txt
@@ -225,11 +227,17 @@ class DocumentService:
         limit: int = 20,
         offset: int = 0,
         sort_by: str = "upload_date",
-        order: str = "desc"
+        order: str = "desc",
+        cursor: Optional[str] = None
     ) -> List[DocumentResponse]:
         """
         Obtiene lista de documentos con filtros, paginación y ordenamiento.
 
+        Con sort_by=upload_date el orden usa id como desempate y admite
+        paginación por keyset: cursor (ver app.core.pagination) reemplaza
+        a offset y la consulta lee solo limit filas sin importar la
+        profundidad de la página.
+
         Args:
             db: Sesión de base de datos SQLModel
             category: Filtro opcional por categoría
@@ -237,6 +245,7 @@ class DocumentService:
             offset: Offset para paginación (default: 0)
             sort_by: Campo de ordenamiento (upload_date, title, file_size_bytes)
             order: Dirección de ordenamiento (asc, desc)
+            cursor: Cursor keyset de la página anterior (solo sort_by=upload_date)
 
         Returns:
             List[DocumentResponse]: Lista de documentos con uploaded_by como username
@@ -258,9 +267,22 @@ class DocumentService:
             if order not in {"asc", "desc"}:
                 raise ValueError(f"Dirección de ordenamiento no permitida: {order}")
 
-            # Construir query base con JOIN para obtener username
+            # Construir query base con JOIN para obtener username. Se proyectan
+            # solo las columnas de DocumentResponse: content_text (texto
+            # completo del documento) no se lee en el listado
             query = (
-                select(Document, User.username)
+                select(
+                    Document.id,
+                    Document.title,
+                    Document.description,
+                    Document.category,
+                    Document.file_type,
+                    Document.file_size_bytes,
+                    Document.upload_date,
+                    User.username.label("uploaded_by"),  # Username en lugar de user_id
+                    Document.is_indexed,
+                    Document.indexed_at
+                )
                 .join(User, Document.uploaded_by == User.id)
                 .where(User.is_active == True)  # Solo usuarios activos
             )
@@ -269,35 +291,36 @@ class DocumentService:
             if category:
                 query = query.where(Document.category == category)
 
-            # Aplicar ordenamiento
-            sort_column = getattr(Document, sort_by)
+            # Aplicar ordenamiento. upload_date usa id como desempate para que
+            # el orden sea total y coincida con el índice (category, upload_date, id)
+            keyset = sort_by == "upload_date"
+            sort_columns = [getattr(Document, sort_by)]
+            if keyset:
+                sort_columns.append(Document.id)
             if order == "desc":
-                query = query.order_by(sort_column.desc())
+                query = query.order_by(*(column.desc() for column in sort_columns))
             else:
-                query = query.order_by(sort_column.asc())
-
-            # Aplicar paginación
-            query = query.offset(offset).limit(limit)
+                query = query.order_by(*(column.asc() for column in sort_columns))
+
+            # Aplicar paginación: keyset si hay cursor, offset en otro caso
+            if cursor:
+                if not keyset:
+                    raise ValueError("cursor solo se admite con sort_by=upload_date")
+                cursor_date, cursor_id = decode_cursor(cursor)
+                position = tuple_(Document.upload_date, Document.id)
+                if order == "desc":
+                    query = query.where(position < tuple_(cursor_date, cursor_id))
+                else:
+                    query = query.where(position > tuple_(cursor_date, cursor_id))
+                query = query.limit(limit)
+            else:
+                query = query.offset(offset).limit(limit)
 
             # Ejecutar query
             results = db.exec(query).all()
 
             # Convertir resultados a DocumentResponse
-            documents = []
-            for document, username in results:
-                doc_response = DocumentResponse(
-                    id=document.id,
-                    title=document.title,
-                    description=document.description,
-                    category=document.category,
-                    file_type=document.file_type,
-                    file_size_bytes=document.file_size_bytes,
-                    upload_date=document.upload_date,
-                    uploaded_by=username,  # Username en lugar de user_id
-                    is_indexed=document.is_indexed,
-                    indexed_at=document.indexed_at
-                )
-                documents.append(doc_response)
+            documents = [DocumentResponse(**row._mapping) for row in results]
 
             # Logging estructurado
             query_time_ms = (datetime.now() - start_time).total_seconds() * 1000
@@ -307,6 +330,7 @@ class DocumentService:
                 "category": category,
                 "limit": limit,
                 "offset": offset,
+                "cursor": cursor is not None,
                 "sort_by": sort_by,
                 "order": order,
                 "results_count": len(documents),
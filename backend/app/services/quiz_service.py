@@ -13,6 +13,7 @@ from typing import Optional, Dict, Any, List
 
 from sqlmodel import Session, select, func
 from app.models import Quiz, QuizQuestion, GeneratedContent, ContentType, Document, User
+from app.core.bulk import bulk_insert
 from app.services.llm_service import OllamaLLMService
 
 logger = logging.getLogger(__name__)
@@ -346,8 +347,13 @@ Responde EXACTAMENTE en este formato JSON:
         questions: List[Dict[str, Any]]
     ) -> Quiz:
         """Save quiz and questions to database (AC12, AC13)."""
+        # One timestamp for the quiz and all its questions (same transaction),
+        # instead of one default_factory call per row
+        created_at = datetime.now(timezone.utc)
+
         # Create quiz record
         quiz = Quiz(
+            created_at=created_at,
             document_id=document_id,
             user_id=user_id,
             title=f"Quiz - {num_questions} preguntas ({difficulty})",
@@ -358,20 +364,20 @@ Responde EXACTAMENTE en este formato JSON:
         self.session.add(quiz)
         self.session.flush()  # Get quiz.id
 
-        # Create question records
-        for q_data in questions:
-            question = QuizQuestion(
-                quiz_id=quiz.id,
-                question=q_data["question"],
-                options_json=q_data["options"],
-                correct_answer=q_data["correct_answer"],
-                explanation=q_data["explanation"],
-                difficulty=q_data.get("difficulty", difficulty),
-                topic=q_data.get("topic")
-            )
-            self.session.add(question)
-
-        self.session.commit()
+        # Create question records (single executemany + commit)
+        bulk_insert(self.session, QuizQuestion, [
+            {
+                "quiz_id": quiz.id,
+                "created_at": created_at,
+                "question": q_data["question"],
+                "options_json": q_data["options"],
+                "correct_answer": q_data["correct_answer"],
+                "explanation": q_data["explanation"],
+                "difficulty": q_data.get("difficulty", difficulty),
+                "topic": q_data.get("topic")
+            }
+            for q_data in questions
+        ])
         return quiz
 
     async def _cache_quiz(
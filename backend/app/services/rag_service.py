@@ -110,9 +110,13 @@ class RAGService:
             }))
 
             # Return cached response with current timing
-            # Create a new dict to avoid modifying the cached version
+            # Create a new dict to avoid modifying the cached version.
+            # No retrieval or LLM ran for this request: the PerformanceMetric
+            # of a hit must not repeat the timings of the original miss
             response_with_current_timing = dict(cached_response)
             response_with_current_timing["response_time_ms"] = round(cache_hit_time, 2)
+            response_with_current_timing["retrieval_time_ms"] = 0.0
+            response_with_current_timing["llm_time_ms"] = 0.0
             response_with_current_timing["cache_hit"] = True
             return response_with_current_timing
         metrics = {
@@ -19,10 +19,15 @@ from sqlmodel import Session, text
 from app.models.document import SearchResult
 from app.services.cache_service import CacheService
 from app.core.config import settings
+from app.database import get_db_executor, run_with_statement_timeout
 
 # Configurar logging estructurado
 logger = logging.getLogger(__name__)
 
+# Timeout de retrieval (AC#11) leído una vez al importar, no en cada búsqueda
+_RETRIEVAL_TIMEOUT_MS = settings.retrieval_timeout_ms
+_RETRIEVAL_TIMEOUT_S = _RETRIEVAL_TIMEOUT_MS / 1000.0
+
 # Stopwords en español para optimización de búsqueda
 SPANISH_STOPWORDS = {
     'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'de', 'del', 'en', 'con', 'por',
@@ -157,45 +162,47 @@ class RetrievalService:
             # Query FTS5 optimizada con ranking BM25
             sql_query = text("""
                 SELECT
-                    fts.document_id,
+                    fts.rowid AS document_id,
                     fts.title,
                     fts.category,
                     d.upload_date,
-                    snippet(documents_fts, 2, '<mark>', '</mark>', '...', 64) as snippet,
+                    snippet(documents_fts, 1, '<mark>', '</mark>', '...', 64) as snippet,
                     bm25(documents_fts) as relevance_score
                 FROM documents_fts fts
-                INNER JOIN documents d ON fts.document_id = d.id
+                INNER JOIN documents d ON fts.rowid = d.id
                 WHERE documents_fts MATCH :query
                 ORDER BY bm25(documents_fts)
                 LIMIT :limit
             """)
 
-            # Ejecutar query con timeout (AC#11)
-            retrieval_timeout_ms = settings.retrieval_timeout_ms
-            retrieval_timeout_s = retrieval_timeout_ms / 1000.0
-
+            # Ejecutar query con timeout (AC#11): el motor cancela la consulta
+            # y asyncio.wait_for acota la espera como respaldo
             try:
-                # Envolver la operación de BD en asyncio.wait_for para timeout
-                loop = asyncio.get_event_loop()
-                result = await asyncio.wait_for(
+                loop = asyncio.get_running_loop()
+                rows = await asyncio.wait_for(
                     loop.run_in_executor(
-                        None,
-                        lambda: db.exec(sql_query.bindparams(query=optimized_query, limit=top_k))
+                        get_db_executor(),
+                        lambda: run_with_statement_timeout(
+                            db,
+                            lambda: db.exec(
+                                sql_query.bindparams(query=optimized_query, limit=top_k)
+                            ).fetchall(),
+                            _RETRIEVAL_TIMEOUT_MS
+                        )
                     ),
-                    timeout=retrieval_timeout_s
+                    timeout=_RETRIEVAL_TIMEOUT_S
                 )
-                rows = result.fetchall()
             except asyncio.TimeoutError:
                 logger.error(
                     json.dumps({
                         "event": "retrieval_timeout",
                         "query": query,
                         "optimized_query": optimized_query,
-                        "timeout_ms": retrieval_timeout_ms,
+                        "timeout_ms": _RETRIEVAL_TIMEOUT_MS,
                         "top_k": top_k
                     })
                 )
-                raise TimeoutError(f"Retrieval timeout after {retrieval_timeout_ms}ms")
+                raise TimeoutError(f"Retrieval timeout after {_RETRIEVAL_TIMEOUT_MS}ms")
 
             # Normalizar scores y filtrar por umbral mínimo
             results = []
@@ -91,14 +91,14 @@ class SearchService:
             # JOIN con tabla documents para obtener upload_date
             sql_query = text("""
                 SELECT
-                    fts.document_id,
+                    fts.rowid AS document_id,
                     fts.title,
                     fts.category,
                     d.upload_date,
-                    snippet(documents_fts, 2, '<mark>', '</mark>', '...', 64) as snippet,
+                    snippet(documents_fts, 1, '<mark>', '</mark>', '...', 64) as snippet,
                     bm25(documents_fts) as relevance_score
                 FROM documents_fts fts
-                INNER JOIN documents d ON fts.document_id = d.id
+                INNER JOIN documents d ON fts.rowid = d.id
                 WHERE documents_fts MATCH :query
                 ORDER BY bm25(documents_fts)
                 LIMIT :limit OFFSET :offset
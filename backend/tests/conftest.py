@@ -28,6 +28,7 @@ from app.models.document import Document, DocumentCategory
 from app.models.audit import AuditLog
 from app.models.query import Query  # Query model for IA endpoints
 from app.core.security import get_password_hash
+from app.database import JSON_ENGINE_OPTIONS
 
 from app.main import app
 from app.database import get_session
@@ -81,7 +82,8 @@ def test_engine():
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
-        echo=False
+        echo=False,
+        **JSON_ENGINE_OPTIONS
     )
 
     # CRITICAL: Monkey-patch PRIMERO el engine global en database.py
@@ -89,6 +91,10 @@ def test_engine():
     old_engine = database.engine
     database.engine = test_db_engine
 
+    # Cada test usa una BD nueva con ids repetidos: descartar usuarios cacheados
+    from app.middleware.auth import invalidate_user_cache
+    invalidate_user_cache()
+
     # DESPUÉS de parchear, crear las tablas
     SQLModel.metadata.create_all(test_db_engine)
 
@@ -110,60 +116,61 @@ def _setup_fts5_table(engine):
     garantizando que FTS5 esté disponible para pruebas de búsqueda y eliminación.
 
     Configuración:
-    - Tabla virtual: documents_fts con columnas (document_id, title, content_text, category)
+    - Tabla virtual external-content: documents_fts(title, content_text, category)
+      con content='documents' y rowid = documents.id
     - Tokenizer: unicode61 remove_diacritics 2 para soporte español completo
-    - Triggers: INSERT, UPDATE, DELETE para mantener FTS5 sincronizado con documents table
-    - Restricción: INSERT solo cuando new.content_text IS NOT NULL (evita indexar documentos sin contenido)
+    - Triggers: INSERT, UPDATE, DELETE usando el comando 'delete' de FTS5
+    - Restricción: solo se indexan documentos con content_text IS NOT NULL
 
     Referencias:
-    - Producción: backend/alembic/versions/f24f93ff1ff8_add_fts5_full_text_search_index.py
+    - Producción: backend/alembic/versions/fts5_external_content_triggers.py
     - Tests: Fixture centralizada que todos los tests pueden usar sin duplicación
-
-    Nota: External content table (content='documents', content_rowid='id') NO se usa en tests
-    porque SQLite in-memory tiene limitaciones. Mantenemos sincronización manual via triggers.
     """
     with Session(engine) as session:
-        # Crear tabla virtual FTS5 para búsqueda full-text de documentos
-        # document_id UNINDEXED: No indexar ID, solo búsqueda por contenido
+        # Tabla external-content: FTS5 no guarda copia del texto, lo lee de documents
         # tokenize: unicode61 remove_diacritics 2 para español (ñ, á, é, etc.)
         session.exec(text("""
             CREATE VIRTUAL TABLE documents_fts USING fts5(
-                document_id UNINDEXED,
                 title,
                 content_text,
                 category,
+                content='documents',
+                content_rowid='id',
                 tokenize='unicode61 remove_diacritics 2'
             )
         """))
 
         # Trigger INSERT: Agregar documento nuevo al índice FTS5 (solo si tiene content_text)
-        # WHEN new.content_text IS NOT NULL: evita indexar documentos sin contenido extraído
         session.exec(text("""
             CREATE TRIGGER documents_ai AFTER INSERT ON documents
             WHEN new.content_text IS NOT NULL
             BEGIN
-                INSERT INTO documents_fts(document_id, title, content_text, category)
+                INSERT INTO documents_fts(rowid, title, content_text, category)
                 VALUES (new.id, new.title, new.content_text, new.category);
             END
         """))
 
-        # Trigger UPDATE: Actualizar documento en índice FTS5
-        # Se ejecuta cuando título, contenido o categoría cambian
+        # Trigger UPDATE: quitar valores antiguos (si estaban indexados) y agregar nuevos
         session.exec(text("""
-            CREATE TRIGGER documents_au AFTER UPDATE ON documents BEGIN
-                UPDATE documents_fts
-                SET title = new.title,
-                    content_text = new.content_text,
-                    category = new.category
-                WHERE document_id = old.id;
+            CREATE TRIGGER documents_au AFTER UPDATE OF title, content_text, category ON documents
+            BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, content_text, category)
+                SELECT 'delete', old.id, old.title, old.content_text, old.category
+                WHERE old.content_text IS NOT NULL;
+                INSERT INTO documents_fts(rowid, title, content_text, category)
+                SELECT new.id, new.title, new.content_text, new.category
+                WHERE new.content_text IS NOT NULL;
             END
         """))
 
         # Trigger DELETE: Eliminar documento del índice FTS5
         # Garantiza que documentos eliminados no aparezcan en búsquedas
         session.exec(text("""
-            CREATE TRIGGER documents_ad AFTER DELETE ON documents BEGIN
-                DELETE FROM documents_fts WHERE document_id = old.id;
+            CREATE TRIGGER documents_ad AFTER DELETE ON documents
+            WHEN old.content_text IS NOT NULL
+            BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, content_text, category)
+                VALUES ('delete', old.id, old.title, old.content_text, old.category);
             END
         """))
 
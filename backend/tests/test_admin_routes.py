@@ -212,6 +212,45 @@ class TestAdminListContent:
         assert len(data["items"]) <= 2
 
 
+
+
+class TestKeysetCursor:
+    """Tests for the keyset pagination cursor of GET /api/admin/generated-content"""
+
+    def test_cursor_round_trip(self):
+        """Encoded cursor decodes back to the same (created_at, id)"""
+        from datetime import datetime
+        from app.core.pagination import encode_cursor, decode_cursor
+
+        created_at = datetime(2025, 11, 15, 10, 30, 0, 123456)
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    def test_invalid_cursor_returns_400(self):
+        """Malformed cursor raises INVALID_CURSOR"""
+        from fastapi import HTTPException
+        from app.routes.admin import _decode_keyset_cursor
+
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_keyset_cursor("not-a-cursor", keyset=True)
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail["code"] == "INVALID_CURSOR"
+
+    def test_cursor_requires_created_at_sort(self):
+        """A cursor with another sort_by is rejected instead of falling back to offset"""
+        from datetime import datetime
+        from fastapi import HTTPException
+        from app.core.pagination import encode_cursor
+        from app.routes.admin import _decode_keyset_cursor
+
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_keyset_cursor(encode_cursor(datetime(2025, 11, 15), 1), keyset=False)
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail["code"] == "INVALID_CURSOR"
+
 class TestAdminValidateContent:
     """Tests for PUT /api/admin/generated-content/{id}/validate"""
 
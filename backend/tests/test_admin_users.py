@@ -243,6 +243,34 @@ class TestListUsers:
             assert "hashed_password" not in user
             assert "password" not in user
 
+    def test_list_users_selects_only_listed_columns(self, client: TestClient, admin_token: str, session: Session):
+        """Test that the list query does not load password hashes or full rows"""
+        from sqlalchemy import event
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get(
+                "/api/admin/users",
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        user = response.json()["users"][0]
+        assert user["username"] == "admin"
+        assert user["role"] == "admin"
+        assert user["last_login"] is None
+        list_statements = [s for s in statements if "LIMIT" in s and "FROM user" in s]
+        assert list_statements
+        assert all("hashed_password" not in s for s in list_statements)
+
     def test_list_users_requires_admin(self, client: TestClient, regular_token: str):
         """Test that non-admin cannot list users"""
         response = client.get(
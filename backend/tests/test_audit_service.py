@@ -285,3 +285,215 @@ class TestAuditLoggingAC7:
 
         # Verify it was still logged
         assert "AI_QUERY" in caplog.text
+
+
+class TestAuditLogWriter:
+    """Batched AuditLog writes off the request path."""
+
+    @staticmethod
+    def _audit_data(user_id: int, action: str = "LOGIN") -> dict:
+        return {"user_id": user_id, "action": action, "resource_type": "session"}
+
+    @pytest.mark.asyncio
+    async def test_submit_buffers_until_flush(self, test_engine, normal_user):
+        """Rows are written in one batch on flush, not on submit."""
+        from sqlmodel import Session, select
+        from app.models.audit import AuditLog
+        from app.services import audit_service
+        from app.services.audit_service import AuditLogWriter
+
+        writer = AuditLogWriter(flush_interval=3600)
+        writer.start()
+        try:
+            for _ in range(3):
+                writer.submit(self._audit_data(normal_user.id))
+
+            with Session(test_engine) as session:
+                assert session.exec(select(AuditLog)).all() == []
+
+            with patch(
+                "app.services.audit_service.write_audit_log_batch",
+                wraps=audit_service.write_audit_log_batch
+            ) as batch_write:
+                await writer.flush()
+            assert batch_write.call_count == 1
+        finally:
+            await writer.stop()
+
+        with Session(test_engine) as session:
+            rows = session.exec(select(AuditLog)).all()
+        assert len(rows) == 3
+        assert all(row.timestamp is not None for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_rows(self, test_engine, normal_user):
+        """Shutdown writes whatever is still buffered."""
+        from sqlmodel import Session, select
+        from app.models.audit import AuditLog
+        from app.services.audit_service import AuditLogWriter
+
+        writer = AuditLogWriter(flush_interval=3600)
+        writer.start()
+        writer.submit(self._audit_data(normal_user.id, action="LOGOUT"))
+        await writer.stop()
+
+        assert not writer.running
+        with Session(test_engine) as session:
+            actions = [row.action for row in session.exec(select(AuditLog)).all()]
+        assert actions == ["LOGOUT"]
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_drops_instead_of_blocking(self, test_engine, normal_user):
+        """Past max_pending, entries are dropped and counted."""
+        from app.services.audit_service import AuditLogWriter
+
+        writer = AuditLogWriter(max_pending=2, flush_interval=3600)
+        writer.start()
+        try:
+            for _ in range(5):
+                writer.submit(self._audit_data(normal_user.id))
+            assert writer.dropped == 3
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_invalid_row_does_not_stop_writer(self, test_engine, normal_user):
+        """An invalid row is dropped; the rest of the batch and later ones are written."""
+        import asyncio
+        from sqlmodel import Session, select
+        from app.models.audit import AuditLog
+        from app.services.audit_service import AuditLogWriter
+
+        writer = AuditLogWriter(flush_interval=0.01)
+        writer.start()
+        try:
+            invalid = self._audit_data(normal_user.id, action="INVALID")
+            invalid["details"] = "x" * 1001
+            writer.submit(invalid)
+            writer.submit(self._audit_data(normal_user.id, action="LOGIN"))
+            await asyncio.sleep(0.1)
+            writer.submit(self._audit_data(normal_user.id, action="LOGOUT"))
+            await asyncio.sleep(0.1)
+
+            assert writer.running
+            assert not writer._pending
+        finally:
+            await writer.stop()
+
+        with Session(test_engine) as session:
+            actions = [row.action for row in session.exec(select(AuditLog)).all()]
+        assert actions == ["LOGIN", "LOGOUT"]
+
+    def test_submit_without_running_writer_writes_synchronously(self, test_engine, normal_user):
+        """Without the lifespan task (scripts, tests) submit writes immediately."""
+        from sqlmodel import Session, select
+        from app.models.audit import AuditLog
+        from app.services.audit_service import AuditLogWriter
+
+        AuditLogWriter().submit(self._audit_data(normal_user.id))
+
+        with Session(test_engine) as session:
+            assert len(session.exec(select(AuditLog)).all()) == 1
+
+
+class TestBatchWriter:
+    """BatchWriter is abstract over how a batch is persisted."""
+
+    def test_subclass_without_write_batch_cannot_be_instantiated(self):
+        from app.services.audit_service import BatchWriter
+
+        class IncompleteWriter(BatchWriter):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteWriter()
+
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_stop_flush_task(self):
+        """A batch that raises is logged and the next batch is still written."""
+        import asyncio
+        from app.services.audit_service import BatchWriter
+
+        class FlakyWriter(BatchWriter):
+            def __init__(self):
+                super().__init__(flush_interval=0.01)
+                self.written = []
+
+            def _write_batch(self, batch):
+                if "bad" in batch:
+                    raise RuntimeError("write failed")
+                self.written.extend(batch)
+
+        writer = FlakyWriter()
+        writer.start()
+        try:
+            writer._enqueue("bad")
+            await asyncio.sleep(0.1)
+            writer._enqueue("good")
+            await asyncio.sleep(0.1)
+
+            assert writer.running
+            assert writer.written == ["good"]
+        finally:
+            await writer.stop()
+        assert not writer.running
+
+
+class TestQueryLogWriter:
+    """Batched Query + PerformanceMetric writes off the request path (AC#8)."""
+
+    @staticmethod
+    def _log_data(user_id: int, query_text: str) -> tuple:
+        query_data = {
+            "user_id": user_id,
+            "query_text": query_text,
+            "answer_text": "Respuesta",
+            "sources_json": [{"document_id": 1, "title": "Política", "relevance_score": 0.9}],
+            "response_time_ms": 120.0,
+            "sources_count": 1
+        }
+        metric_data = {"retrieval_time_ms": 20.0, "llm_time_ms": 100.0, "total_time_ms": 120.0}
+        return query_data, metric_data
+
+    @pytest.mark.asyncio
+    async def test_flush_links_metrics_to_their_queries(self, test_engine, normal_user):
+        """One flush writes every query and attaches each metric to its own query."""
+        from sqlmodel import Session, select
+        from app.models.query import Query, PerformanceMetric
+        from app.services.audit_service import QueryLogWriter
+
+        writer = QueryLogWriter(flush_interval=3600)
+        writer.start()
+        try:
+            for i in range(3):
+                query_data, metric_data = self._log_data(normal_user.id, f"pregunta {i}")
+                metric_data["llm_time_ms"] = float(i)
+                writer.submit(query_data, metric_data)
+
+            with Session(test_engine) as session:
+                assert session.exec(select(Query)).all() == []
+        finally:
+            await writer.stop()
+
+        with Session(test_engine) as session:
+            queries = {q.id: q for q in session.exec(select(Query)).all()}
+            metrics = session.exec(select(PerformanceMetric)).all()
+
+        assert len(queries) == 3
+        assert len(metrics) == 3
+        for metric in metrics:
+            assert queries[metric.query_id].query_text == f"pregunta {int(metric.llm_time_ms)}"
+        assert all(q.sources_json[0]["document_id"] == 1 for q in queries.values())
+
+    def test_submit_without_running_writer_writes_through_session(self, test_db_session, normal_user):
+        """Without the lifespan task submit writes immediately with the request session."""
+        from sqlmodel import select
+        from app.models.query import Query, PerformanceMetric
+        from app.services.audit_service import QueryLogWriter
+
+        QueryLogWriter().submit(*self._log_data(normal_user.id, "pregunta"), db=test_db_session)
+
+        query = test_db_session.exec(select(Query)).one()
+        metric = test_db_session.exec(select(PerformanceMetric)).one()
+        assert metric.query_id == query.id
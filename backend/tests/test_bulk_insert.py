@@ -0,0 +1,62 @@
+"""
+Tests para el helper de inserción masiva (app/core/bulk.py).
+"""
+
+from sqlmodel import select
+
+from app.core.bulk import bulk_insert
+from app.models.audit import AuditLog
+
+
+class TestBulkInsert:
+    """Tests de bulk_insert con SQLAlchemy Core executemany."""
+
+    def test_bulk_insert_persists_all_rows(self, test_db_session, admin_user):
+        """Inserta todas las filas en una sola llamada y aplica defaults de columna"""
+        rows = [
+            {
+                "user_id": admin_user.id,
+                "action": "LOGIN",
+                "resource_type": "user",
+                "resource_id": admin_user.id,
+                "details": f'{{"n": {i}}}'
+            }
+            for i in range(5)
+        ]
+
+        inserted = bulk_insert(test_db_session, AuditLog, rows)
+
+        assert inserted == 5
+        logs = test_db_session.exec(
+            select(AuditLog).where(AuditLog.user_id == admin_user.id)
+        ).all()
+        assert len(logs) == 5
+        # created via column default (default_factory)
+        assert all(log.timestamp is not None for log in logs)
+
+    def test_bulk_insert_empty_rows_is_noop(self, test_db_session):
+        """Lista vacía no ejecuta INSERT"""
+        assert bulk_insert(test_db_session, AuditLog, []) == 0
+        assert test_db_session.exec(select(AuditLog)).all() == []
+
+    async def test_save_quiz_stamps_questions_once(self, test_db_session, normal_user):
+        """Quiz y preguntas comparten un único created_at (sin default por fila)"""
+        from app.models.quiz import Quiz, QuizQuestion
+        from app.services.quiz_service import QuizService
+
+        questions = [
+            {
+                "question": f"Pregunta {i}?",
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": "A",
+                "explanation": "Porque sí"
+            }
+            for i in range(3)
+        ]
+
+        quiz = await QuizService(test_db_session)._save_quiz(1, normal_user.id, "basic", 3, questions)
+
+        saved = test_db_session.exec(select(QuizQuestion).where(QuizQuestion.quiz_id == quiz.id)).all()
+        assert len(saved) == 3
+        quiz_created_at = test_db_session.get(Quiz, quiz.id).created_at
+        assert {question.created_at for question in saved} == {quiz_created_at}
@@ -17,13 +17,18 @@ from app.core.config import Settings, get_settings
 def reset_settings_singleton():
     """Fixture que resetea el singleton de settings cuando se necesita"""
     import app.core.config
-    # Guardar estado original
-    original_settings = app.core.config.settings
-    # Resetear singleton
-    app.core.config.settings = None
+    # `settings` normalmente no es atributo del módulo: lo resuelve __getattr__
+    # desde get_settings(). Solo se restaura si alguien lo había fijado.
+    module_vars = vars(app.core.config)
+    had_settings = "settings" in module_vars
+    original_settings = module_vars.get("settings")
+    get_settings.cache_clear()
     yield
-    # Restaurar estado original
-    app.core.config.settings = original_settings
+    get_settings.cache_clear()
+    if had_settings:
+        app.core.config.settings = original_settings
+    else:
+        module_vars.pop("settings", None)
 
 
 class TestConfiguracionBasica:
@@ -294,6 +299,36 @@ class TestIntegracionServicios:
         assert hasattr(settings1, 'database_url')
         assert hasattr(settings1, 'ollama_host')
 
+    def test_settings_de_modulo_es_el_singleton(self):
+        """`from app.core.config import settings` resuelve al singleton cacheado"""
+        import app.core.config
+
+        assert "settings" not in vars(app.core.config)
+        assert app.core.config.settings is get_settings()
+
+    def test_settings_es_inmutable(self):
+        """Settings es frozen: se modifica solo con model_copy"""
+        from pydantic import ValidationError
+
+        settings = get_settings()
+        with pytest.raises(ValidationError):
+            settings.debug = not settings.debug
+
+        updated = settings.model_copy(update={"debug": not settings.debug})
+        assert updated.debug is not settings.debug
+        assert get_settings() is settings
+
+    def test_allowed_origins_list_separado_una_vez(self):
+        """allowed_origins_list separa, limpia y cachea los orígenes CORS"""
+        base = get_settings()
+        _ = base.allowed_origins_list
+        settings = base.model_copy(
+            update={"allowed_origins": "http://a.test, http://b.test,,"}
+        )
+
+        assert settings.allowed_origins_list == ("http://a.test", "http://b.test")
+        assert settings.allowed_origins_list is settings.allowed_origins_list
+
 
 class TestValidacionCompleta:
     """Tests para método de validación completa"""
@@ -337,7 +372,7 @@ FASTAPI_ENV=development
             # porque significa que la validación está funcionando
             assert "SECRET_KEY debe tener al menos 32 caracteres" in str(e)
 
-    def test_create_with_validation_funciona_correctamente(self):
+    def test_create_with_validation_funciona_correctamente(self, reset_settings_singleton):
         """Factory method create_with_validation funciona correctamente"""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.env', delete=False, encoding='utf-8') as f:
             f.write("""
@@ -349,16 +384,9 @@ FASTAPI_ENV=development
             env_path = f.name
 
         try:
-            # Limpiar singleton para test
-            import app.core.config
-            original_settings = app.core.config.settings
-            app.core.config.settings = None
-
             # No debe lanzar excepción (usa configuración del entorno)
             settings = Settings.create_with_validation()
             assert isinstance(settings, Settings)
 
         finally:
-            os.unlink(env_path)
-            # Restaurar singleton
-            app.core.config.settings = original_settings
\ No newline at end of file
+            os.unlink(env_path)
\ No newline at end of file
@@ -274,6 +274,57 @@ class TestDocumentService:
         # Verificar que no es el ID numérico
         assert all(doc.uploaded_by != str(admin_user.id) for doc in documents)
 
+    @pytest.mark.asyncio
+    async def test_get_documents_single_query_without_content_text(self, db_session: Session, sample_documents):
+        """El listado es una sola consulta y no lee content_text"""
+        from sqlalchemy import event
+
+        engine = db_session.get_bind()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            documents = await DocumentService.get_documents(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(documents) == 3
+        assert len(statements) == 1
+        assert "content_text" not in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_get_documents_keyset_cursor_matches_offset(self, db_session: Session, sample_documents):
+        """Paginación por cursor recorre las mismas filas que offset"""
+        from app.core.pagination import encode_cursor
+
+        all_documents = await DocumentService.get_documents(db_session)
+
+        first_page = await DocumentService.get_documents(db_session, limit=2)
+        last = first_page[-1]
+        second_page = await DocumentService.get_documents(
+            db_session, limit=2, cursor=encode_cursor(last.upload_date, last.id)
+        )
+
+        assert [doc.id for doc in first_page + second_page] == [doc.id for doc in all_documents]
+
+    @pytest.mark.asyncio
+    async def test_get_documents_cursor_requires_upload_date_sort(self, db_session: Session, sample_documents):
+        """cursor con sort_by distinto de upload_date es inválido"""
+        from app.core.pagination import encode_cursor
+
+        cursor = encode_cursor(datetime.now(timezone.utc), 1)
+        with pytest.raises(ValueError):
+            await DocumentService.get_documents(db_session, sort_by="title", cursor=cursor)
+
+    @pytest.mark.asyncio
+    async def test_get_documents_malformed_cursor(self, db_session: Session, sample_documents):
+        """Cursor malformado lanza ValueError"""
+        with pytest.raises(ValueError, match="Cursor"):
+            await DocumentService.get_documents(db_session, cursor="not-a-cursor")
+
 
 class TestDocumentEndpoints:
     """Tests de integración para endpoints"""
@@ -315,6 +366,51 @@ class TestDocumentEndpoints:
         assert len(data) == 1
         assert data[0]["category"] == "manual"
 
+    def test_list_documents_next_cursor_header(self, auth_headers_admin, sample_documents):
+        """Página completa trae X-Next-Cursor; la siguiente página continúa desde ahí"""
+        response = client.get("/api/knowledge/documents?limit=2", headers=auth_headers_admin)
+        assert response.status_code == 200
+        first_ids = [doc["id"] for doc in response.json()]
+        next_cursor = response.headers["X-Next-Cursor"]
+
+        response = client.get(
+            f"/api/knowledge/documents?limit=2&cursor={next_cursor}",
+            headers=auth_headers_admin
+        )
+        assert response.status_code == 200
+        second_ids = [doc["id"] for doc in response.json()]
+        assert len(second_ids) == 1
+        assert not set(first_ids) & set(second_ids)
+        # Última página incompleta: no hay cursor siguiente
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_list_documents_serialized_like_response_model(self, db_session, auth_headers_admin, sample_documents):
+        """JSON pre-serializado coincide con la serialización de DocumentResponse"""
+        from pydantic import TypeAdapter
+
+        response = client.get("/api/knowledge/documents", headers=auth_headers_admin)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+
+        documents = await DocumentService.get_documents(db_session)
+        expected = TypeAdapter(list[DocumentResponse]).dump_python(documents, mode="json")
+        assert response.json() == expected
+
+        # response_model sigue documentado en OpenAPI
+        schema = client.get("/openapi.json").json()
+        items = schema["paths"]["/api/knowledge/documents"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+        assert items["$ref"].endswith("/DocumentResponse")
+
+    def test_list_documents_invalid_cursor(self, auth_headers_admin, sample_documents):
+        """Cursor inválido retorna 400"""
+        response = client.get(
+            "/api/knowledge/documents?cursor=not-a-cursor",
+            headers=auth_headers_admin
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "INVALID_PARAMETERS"
+
     def test_list_documents_invalid_sort_field(self, auth_headers_admin):
         """AC5: Test ordenamiento con campo inválido retorna 400"""
         response = client.get(
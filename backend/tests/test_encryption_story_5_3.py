@@ -14,6 +14,7 @@ import tempfile
 from pathlib import Path
 
 import pytest
+from unittest.mock import MagicMock
 from sqlmodel import Session, create_engine, select
 from fastapi.testclient import TestClient
 
@@ -117,6 +118,39 @@ class TestSQLCipherConfiguration:
 
             db_engine.dispose()
 
+    def test_pragma_key_escapes_quotes(self, monkeypatch):
+        """
+        PRAGMA key no admite parámetros enlazados: una comilla en la clave
+        se escapa como literal SQL y PRAGMA key es la primera sentencia
+        """
+        import app.database as db_module
+
+        monkeypatch.setattr(db_module, "DB_ENCRYPTION_KEY", "abc'def")
+        dbapi_conn = MagicMock()
+
+        _configure_sqlite_encryption(dbapi_conn, None)
+
+        statements = [c.args[0] for c in dbapi_conn.execute.call_args_list]
+        assert statements[0] == "PRAGMA key = 'abc''def'"
+        assert "PRAGMA cipher_memory_security = OFF" in statements
+
+    def test_encryption_validated_once_per_process(self, monkeypatch):
+        """PRAGMA key en cada conexión; PRAGMA database_list solo en la primera"""
+        import app.database as db_module
+
+        monkeypatch.setattr(db_module, "DB_ENCRYPTION_KEY", "test-key")
+        monkeypatch.setattr(db_module, "_encryption_validated", False)
+
+        first_conn, second_conn = MagicMock(), MagicMock()
+        _configure_sqlite_encryption(first_conn, None)
+        _configure_sqlite_encryption(second_conn, None)
+
+        first = [c.args[0] for c in first_conn.execute.call_args_list]
+        second = [c.args[0] for c in second_conn.execute.call_args_list]
+        assert "PRAGMA database_list;" in first
+        assert "PRAGMA database_list;" not in second
+        assert second[0] == "PRAGMA key = 'test-key'"
+
     def test_encrypted_db_file_not_readable_without_key(self):
         """
         Test AC#6: BD cifrada funciona correctamente con clave
@@ -336,6 +370,25 @@ class TestHTTPSRedirect:
         assert response.status_code == 308
         assert "https://" in response.headers.get("location", "")
 
+    def test_https_redirect_keeps_host_path_and_query(self):
+        """La redirección conserva host, path (tal como llegó) y query string"""
+        from app.middleware.https_redirect import _https_location
+
+        scope = {
+            "type": "http",
+            "scheme": "http",
+            "path": "/api/docs/a b",
+            "raw_path": b"/api/docs/a%20b",
+            "query_string": b"page=2&q=x",
+            "headers": [(b"host", b"example.com:8080")],
+            "server": ("10.0.0.1", 8080),
+        }
+        assert _https_location(scope) == "https://example.com:8080/api/docs/a%20b?page=2&q=x"
+
+        scope["headers"] = []
+        scope["query_string"] = b""
+        assert _https_location(scope) == "https://10.0.0.1:8080/api/docs/a%20b"
+
     def test_https_redirect_disabled_in_development(self):
         """
         Test AC#1: En desarrollo, HTTP se permite sin redirección
@@ -393,6 +446,45 @@ class TestHTTPSRedirect:
         assert "max-age=31536000" in hsts_header
         assert "includeSubDomains" in hsts_header
 
+    def test_https_middleware_is_pure_asgi(self):
+        """
+        El middleware no usa BaseHTTPMiddleware y agrega HSTS a respuestas
+        HTTPS sin alterar el body
+        """
+        from fastapi import FastAPI
+        from starlette.middleware.base import BaseHTTPMiddleware
+        from starlette.testclient import TestClient
+
+        assert not issubclass(HTTPSRedirectMiddleware, BaseHTTPMiddleware)
+
+        app = FastAPI()
+        app.add_middleware(
+            HTTPSRedirectMiddleware,
+            environment="development",
+            https_enabled=True
+        )
+
+        @app.get("/api/health")
+        async def health():
+            return {"status": "ok"}
+
+        https_client = TestClient(app, base_url="https://testserver")
+        response = https_client.get("/api/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+        assert response.headers["Strict-Transport-Security"] == "max-age=31536000; includeSubDomains"
+
+        # HTTP en desarrollo: sin HSTS
+        assert "Strict-Transport-Security" not in TestClient(app).get("/api/health").headers
+
+    def test_https_middleware_registered_only_in_production(self):
+        """Fuera de producción la app no registra HTTPSRedirectMiddleware"""
+        from app.core.config import get_settings
+        from app.main import app
+
+        registered = any(m.cls is HTTPSRedirectMiddleware for m in app.user_middleware)
+        assert registered == (get_settings().environment == "production")
+
     def test_hsts_header_values(self):
         """
         Test AC#1.3: HSTS header contiene valores correctos
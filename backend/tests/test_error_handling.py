@@ -182,6 +182,19 @@ class TestExceptionHierarchy:
         assert hasattr(error, 'http_status_code')
         assert hasattr(error, 'detail')
 
+    def test_codes_are_class_attributes(self):
+        """Only message and detail are stored per instance."""
+        error = RateLimitError("Too many")
+
+        assert vars(error) == {"message": "Too many", "detail": RateLimitError.default_detail}
+        assert error.error_code == RateLimitError.error_code == "RATE_LIMIT_EXCEEDED"
+        assert error.http_status_code == 429
+
+    def test_explicit_empty_detail_is_kept(self):
+        """Only a missing detail (None) falls back to the default."""
+        assert OllamaUnavailableError("down", detail="").detail == ""
+        assert QueryValidationError("too short").detail == "too short"
+
 
 class TestExceptionErrorCodes:
     """Test exception error codes for programmatic handling."""
@@ -284,3 +297,104 @@ class TestExceptionDetailMessages:
             assert len(exc.detail) > 0
             # Should be a string
             assert isinstance(exc.detail, str)
+
+
+class TestIAServiceExceptionHandler:
+    """Test the single IAServiceException handler registered in main.py."""
+
+    @pytest.fixture
+    def handler_client(self):
+        """App with routes raising each exception, using main.py's handler."""
+        from fastapi import FastAPI
+        from app.exceptions import IAServiceException, RetrievalTimeoutError
+        from app.main import ia_service_exception_handler
+
+        test_app = FastAPI()
+        test_app.add_exception_handler(IAServiceException, ia_service_exception_handler)
+
+        raisers = {
+            "validation": QueryValidationError("too short"),
+            "ollama": OllamaUnavailableError("connection refused"),
+            "rate": RateLimitError("user 1 exceeded"),
+            "timeout": RetrievalTimeoutError("fts timeout"),
+        }
+
+        @test_app.get("/raise/{name}")
+        async def raise_exc(name: str):
+            raise raisers[name]
+
+        return TestClient(test_app)
+
+    @pytest.mark.parametrize("name,status,label,code", [
+        ("validation", 400, "Invalid request", "QUERY_VALIDATION_ERROR"),
+        ("ollama", 503, "Service unavailable", "OLLAMA_UNAVAILABLE"),
+        ("rate", 429, "Too many requests", "RATE_LIMIT_EXCEEDED"),
+        ("timeout", 503, "Service error", "RETRIEVAL_TIMEOUT"),
+    ])
+    def test_subclass_response_uses_class_attributes(self, handler_client, name, status, label, code):
+        """Each subclass maps to its status code, label and error code."""
+        response = handler_client.get(f"/raise/{name}")
+
+        assert response.status_code == status
+        body = response.json()
+        assert body["error"] == label
+        assert body["code"] == code
+        assert body["detail"]
+
+    def test_client_errors_logged_as_warning(self):
+        """Validation and rate-limit errors log at WARNING, others at ERROR."""
+        import logging
+
+        assert QueryValidationError.log_level == logging.WARNING
+        assert RateLimitError.log_level == logging.WARNING
+        assert OllamaUnavailableError.log_level == logging.ERROR
+        assert DatabaseError.log_level == logging.ERROR
+
+    def test_default_detail_body_serialized_once(self, handler_client):
+        """Responses with the class default detail reuse a cached body."""
+        from unittest.mock import patch
+        from app import main
+
+        main._DEFAULT_ERROR_BODIES.clear()
+        with patch("app.main.orjson.dumps", wraps=main.orjson.dumps) as mock_dumps:
+            first = handler_client.get("/raise/ollama")
+            second = handler_client.get("/raise/ollama")
+
+        assert mock_dumps.call_count == 1
+        assert first.content == second.content
+        assert first.json()["detail"] == OllamaUnavailableError.default_detail
+        assert OllamaUnavailableError in main._DEFAULT_ERROR_BODIES
+
+        # Validation errors carry per-request details: never cached
+        handler_client.get("/raise/validation")
+        assert QueryValidationError not in main._DEFAULT_ERROR_BODIES
+
+    def test_custom_detail_not_served_from_cache(self):
+        """An explicit detail is always serialized, even after a cached default."""
+        import json
+        from app import main
+
+        main._DEFAULT_ERROR_BODIES.clear()
+        main._ia_error_body(OllamaUnavailableError("down"))
+        body = main._ia_error_body(OllamaUnavailableError("down", detail="Model is loading"))
+
+        assert json.loads(body) == {
+            "error": "Service unavailable",
+            "detail": "Model is loading",
+            "code": "OLLAMA_UNAVAILABLE"
+        }
+
+
+class TestResponseClass:
+    """Default response class of the application."""
+
+    def test_app_uses_orjson_responses(self, client):
+        """Responses are rendered with ORJSONResponse by default."""
+        from fastapi.responses import ORJSONResponse
+
+        assert app.router.default_response_class is ORJSONResponse
+
+        response = client.get("/api/health")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"status": "ok", "version": "1.0.0"}
@@ -59,4 +59,172 @@ class TestMiddleware:
         response = client.get("/test/admin-only", headers=headers)
         assert response.status_code == 401
         data = response.json()
-        assert data["detail"]["code"] == "INVALID_TOKEN"
\ No newline at end of file
+        assert data["detail"]["code"] == "INVALID_TOKEN"
+
+class TestCurrentUserCache:
+    """get_current_user reutiliza el usuario cacheado sin SELECT"""
+
+    def _credentials(self, user_id):
+        from fastapi.security import HTTPAuthorizationCredentials
+        from app.core.security import create_access_token
+
+        token = create_access_token(data={"user_id": user_id, "role": "user"})
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def test_cached_user_skips_select(self, test_engine, normal_user):
+        from sqlalchemy import event
+        from sqlmodel import Session
+
+        credentials = self._credentials(normal_user.id)
+        with Session(test_engine) as first_session:
+            get_current_user(credentials, first_session)
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            with Session(test_engine) as second_session:
+                user = get_current_user(credentials, second_session)
+                assert user.id == normal_user.id
+                assert user.username == normal_user.username
+                assert user in second_session
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        assert not any("FROM user" in s for s in statements)
+
+    def test_orm_update_invalidates_cached_user(self, test_engine, normal_user):
+        from fastapi import HTTPException
+        from sqlmodel import Session
+
+        credentials = self._credentials(normal_user.id)
+        with Session(test_engine) as session:
+            get_current_user(credentials, session)
+
+        with Session(test_engine) as session:
+            user = session.get(User, normal_user.id)
+            user.is_active = False
+            session.add(user)
+            session.commit()
+
+        with Session(test_engine) as session:
+            with pytest.raises(HTTPException) as exc_info:
+                get_current_user(credentials, session)
+        assert exc_info.value.detail["code"] == "USER_INACTIVE"
+
+    def test_flush_without_commit_keeps_cached_user(self, test_engine, normal_user):
+        from app.middleware.auth import _user_cache
+        from sqlmodel import Session
+
+        credentials = self._credentials(normal_user.id)
+        with Session(test_engine) as session:
+            get_current_user(credentials, session)
+
+        with Session(test_engine) as session:
+            user = session.get(User, normal_user.id)
+            user.is_active = False
+            session.add(user)
+            session.flush()
+            assert _user_cache.get(str(normal_user.id)) is not None
+            session.rollback()
+
+        assert _user_cache.get(str(normal_user.id)) is not None
+
+    def test_failed_login_invalidates_cached_user(self, test_engine, normal_user):
+        from fastapi import HTTPException
+        from sqlmodel import Session
+        from app.auth.models import LoginRequest
+        from app.auth.service import AuthService
+        from app.middleware.auth import _user_cache
+
+        credentials = self._credentials(normal_user.id)
+        with Session(test_engine) as session:
+            get_current_user(credentials, session)
+
+        with Session(test_engine) as session:
+            with pytest.raises(HTTPException):
+                AuthService(session).authenticate_user(
+                    LoginRequest(username=normal_user.username, password="wrong-password")
+                )
+
+        assert _user_cache.get(str(normal_user.id)) is None
+
+
+class TestCurrentPrincipal:
+    """get_current_principal lee solo id, is_active y role"""
+
+    def _credentials(self, user_id):
+        from fastapi.security import HTTPAuthorizationCredentials
+        from app.core.security import create_access_token
+
+        token = create_access_token(data={"user_id": user_id, "role": "admin"})
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def test_selects_only_auth_columns(self, test_engine, admin_user):
+        from sqlalchemy import event
+        from sqlmodel import Session
+        from app.middleware.auth import CurrentUser, get_current_principal
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            with Session(test_engine) as session:
+                principal = get_current_principal(self._credentials(admin_user.id), session)
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        assert principal == CurrentUser(admin_user.id, True, UserRole.admin)
+        assert require_role("admin")(principal) is principal
+        user_selects = [s for s in statements if "FROM user" in s]
+        assert len(user_selects) == 1
+        assert "hashed_password" not in user_selects[0]
+        assert "LIMIT" in user_selects[0]
+
+    def test_unknown_user_rejected(self, test_engine):
+        from fastapi import HTTPException
+        from sqlmodel import Session
+        from app.middleware.auth import get_current_principal
+
+        with Session(test_engine) as session:
+            with pytest.raises(HTTPException) as exc_info:
+                get_current_principal(self._credentials(999999), session)
+        assert exc_info.value.detail["code"] == "USER_NOT_FOUND"
+
+
+class TestCorsOrigins:
+    """CORS valida orígenes contra un frozenset normalizado"""
+
+    def test_allow_origins_is_frozenset(self):
+        from starlette.middleware.cors import CORSMiddleware
+
+        cors = next(m for m in app.user_middleware if m.cls is CORSMiddleware)
+        assert isinstance(cors.kwargs["allow_origins"], frozenset)
+
+    def test_preflight_from_allowed_origin(self, client):
+        response = client.options(
+            "/api/health",
+            headers={
+                "Origin": "http://localhost:5173",
+                "Access-Control-Request-Method": "GET",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+    def test_preflight_from_unknown_origin_rejected(self, client):
+        response = client.options(
+            "/api/health",
+            headers={
+                "Origin": "http://evil.example.com",
+                "Access-Control-Request-Method": "GET",
+            },
+        )
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
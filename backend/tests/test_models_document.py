@@ -369,4 +369,39 @@ class TestDocumentCategorySchemas:
         )
 
         assert cat_update.description == "Updated description"
-        assert cat_update.name is None  # Not provided
\ No newline at end of file
+        assert cat_update.name is None  # Not provided
+
+class TestResponseSchemas:
+    """Schemas solo de respuesta: pydantic BaseModel, no SQLModel"""
+
+    def test_response_schemas_are_plain_pydantic(self):
+        from pydantic import BaseModel, ValidationError
+        from sqlmodel import SQLModel
+        from app.models.document import (
+            CategoryResponse, DocumentResponse, DocumentStatusResponse,
+            SearchResponse, SearchResult
+        )
+
+        for schema in (CategoryResponse, DocumentResponse, DocumentStatusResponse,
+                       SearchResponse, SearchResult):
+            assert issubclass(schema, BaseModel)
+            assert not issubclass(schema, SQLModel)
+
+        # Las restricciones de campo se mantienen
+        with pytest.raises(ValidationError):
+            SearchResult(
+                document_id=1, title="t", category="c",
+                relevance_score=1.5, upload_date=datetime.now(timezone.utc)
+            )
+
+    def test_document_response_from_attributes(self):
+        from types import SimpleNamespace
+        from app.models.document import DocumentResponse
+
+        now = datetime.now(timezone.utc)
+        row = SimpleNamespace(
+            id=1, title="Doc", description=None, category="RRHH", file_type="pdf",
+            file_size_bytes=10, upload_date=now, uploaded_by="admin",
+            is_indexed=True, indexed_at=now
+        )
+        assert DocumentResponse.model_validate(row).uploaded_by == "admin"
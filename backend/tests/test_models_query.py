@@ -46,7 +46,7 @@ class TestQueryModel:
             user_id=test_user.id,
             query_text="¿Cuál es la política de vacaciones?",
             answer_text="Los empleados tienen derecho a 15 días hábiles anuales.",
-            sources_json='[{"document_id": 1, "title": "Política", "relevance_score": 0.95}]',
+            sources_json=[{"document_id": 1, "title": "Política", "relevance_score": 0.95}],
             response_time_ms=1245.5
         )
         test_db_session.add(query_record)
@@ -66,7 +66,7 @@ class TestQueryModel:
             user_id=test_user.id,
             query_text="Pregunta de prueba válida",
             answer_text="Respuesta de prueba",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0
         )
         test_db_session.add(query_record)
@@ -89,7 +89,7 @@ class TestQueryModel:
                 user_id=test_user.id,
                 query_text=f"Pregunta {i}",
                 answer_text=f"Respuesta {i}",
-                sources_json="[]",
+                sources_json=[],
                 response_time_ms=float(100 + i)
             )
             test_db_session.add(query_record)
@@ -109,7 +109,7 @@ class TestQueryModel:
             user_id=test_user.id,
             query_text="Pregunta para búsqueda por timestamp",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0
         )
         test_db_session.add(query_record)
@@ -131,7 +131,7 @@ class TestQueryModel:
             user_id=test_user.id,
             query_text=long_query,
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0
         )
         test_db_session.add(query_record)
@@ -148,7 +148,7 @@ class TestQueryModel:
                 user_id=test_user.id,
                 query_text=f"Query {i}",
                 answer_text=f"Answer {i}",
-                sources_json="[]",
+                sources_json=[],
                 response_time_ms=float(100 + i)
             )
             test_db_session.add(query_record)
@@ -174,7 +174,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta para métrica de performance",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=1245.5
         )
         test_db_session.add(query_record)
@@ -206,7 +206,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta para timing",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=1200.0
         )
         test_db_session.add(query_record)
@@ -235,7 +235,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta cacheable",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0
         )
         test_db_session.add(query_record)
@@ -263,7 +263,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta para FK test",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=1000.0
         )
         test_db_session.add(query_record)
@@ -289,7 +289,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=1000.0
         )
         test_db_session.add(query_record)
@@ -322,7 +322,7 @@ class TestPerformanceMetricModel:
                 user_id=test_user.id,
                 query_text=f"Query {i}",
                 answer_text=f"Answer {i}",
-                sources_json="[]",
+                sources_json=[],
                 response_time_ms=float(1000 + i * 100)
             )
             test_db_session.add(query_record)
@@ -355,7 +355,7 @@ class TestPerformanceMetricModel:
             user_id=test_user.id,
             query_text="Pregunta timestamp",
             answer_text="Respuesta",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=1000.0
         )
         test_db_session.add(query_record)
@@ -386,7 +386,7 @@ class TestPerformanceMetricModel:
             user_id=1,
             query_text="Test query",
             answer_text="Test answer",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0
         )
         assert create_data.user_id == 1
@@ -398,7 +398,7 @@ class TestPerformanceMetricModel:
             user_id=1,
             query_text="Test query",
             answer_text="Test answer",
-            sources_json="[]",
+            sources_json=[],
             response_time_ms=100.0,
             created_at=datetime.now(timezone.utc)
         )
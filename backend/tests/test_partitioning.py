@@ -0,0 +1,42 @@
+"""
+Tests para las definiciones de particionado compartidas por las migraciones
+(app/core/partitioning.py). Las funciones PL/pgSQL solo existen en
+PostgreSQL; aquí se verifica el SQL generado y las tablas elegidas.
+"""
+
+from app.core import partitioning
+
+
+class TestPartitioningDefinitions:
+    """Tablas particionadas y SQL de mantenimiento."""
+
+    def test_fk_targets_are_not_partitioned(self):
+        """Ninguna tabla referida por una FK del modelo se particiona, salvo queries"""
+        from sqlmodel import SQLModel
+        import app.models  # noqa: F401 - registra todas las tablas
+
+        partitioned = {table for table, _ in partitioning.TIME_SERIES_TABLES}
+        assert "generated_content" not in partitioned
+
+        referring = {
+            (table.name, fk.column.table.name)
+            for table in SQLModel.metadata.tables.values()
+            for fk in table.foreign_keys
+            if fk.column.table.name in partitioned
+        }
+        assert referring == {("performance_metrics", "queries")}
+
+    def test_maintenance_function_includes_auditlog_only_when_requested(self):
+        """maintain_time_partitions() agrega auditlog y su retención solo si se pide"""
+        without_audit = partitioning.maintenance_function_sql(with_auditlog=False)
+        with_audit = partitioning.maintenance_function_sql(with_auditlog=True)
+
+        for table, period in partitioning.TIME_SERIES_TABLES:
+            call = f"create_time_partitions('{table}', '{period}'"
+            assert call in without_audit
+            assert call in with_audit
+
+        assert "auditlog" not in without_audit
+        assert "'auditlog', 'week'" in with_audit
+        assert "'timestamp'" in with_audit
+        assert "detach_old_partitions('auditlog', 'week'" in with_audit
@@ -639,6 +639,37 @@ class TestEndToEndRAGPipeline:
             # Verify LLM was called
             mock_llm_service.generate_response_async.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_cache_hit_reports_no_retrieval_or_llm_time(self, test_db, mock_llm_service, sample_search_results, clear_cache):
+        """
+        A response cache hit runs neither retrieval nor the LLM, so its
+        timings (recorded in PerformanceMetric) are zero, not the miss's.
+        """
+        with patch(
+            "app.services.rag_service.RetrievalService.retrieve_relevant_documents",
+            new_callable=AsyncMock,
+            return_value=sample_search_results
+        ):
+            first = await RAGService.rag_query(
+                user_query="¿Cuántos días de vacaciones tengo?",
+                user_id=42,
+                session=test_db,
+                llm_service=mock_llm_service,
+            )
+            second = await RAGService.rag_query(
+                user_query="  ¿cuántos días de vacaciones tengo?  ",
+                user_id=7,
+                session=test_db,
+                llm_service=mock_llm_service,
+            )
+
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["answer"] == first["answer"]
+        assert second["retrieval_time_ms"] == 0.0
+        assert second["llm_time_ms"] == 0.0
+        mock_llm_service.generate_response_async.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_complete_rag_flow_without_documents(self, test_db, mock_llm_service):
         """
@@ -16,7 +16,7 @@ class TestRateLimitStore:
     def test_initial_bucket_creation(self):
         """Test bucket is created with correct initial state."""
         store = RateLimitStore()
-        allowed, remaining = store.get_bucket("test_key", capacity=10, refill_rate=10/60)
+        allowed, remaining, _ = store.get_bucket("test_key", capacity=10, refill_rate=10/60)
 
         assert allowed is True
         assert remaining == 9.0  # Started with 10, used 1
@@ -27,11 +27,11 @@ class TestRateLimitStore:
 
         # Consume all 10 tokens
         for i in range(10):
-            allowed, _ = store.get_bucket("test_key", capacity=10, refill_rate=0)
+            allowed, _, _ = store.get_bucket("test_key", capacity=10, refill_rate=0)
             assert allowed is True
 
         # 11th request should be denied
-        allowed, _ = store.get_bucket("test_key", capacity=10, refill_rate=0)
+        allowed, _, _ = store.get_bucket("test_key", capacity=10, refill_rate=0)
         assert allowed is False
 
     def test_token_refill(self):
@@ -44,7 +44,7 @@ class TestRateLimitStore:
 
         # Wait a bit and refill at 1 token per second
         time.sleep(0.1)
-        allowed, remaining = store.get_bucket("test_key", capacity=10, refill_rate=1.0)
+        allowed, remaining, _ = store.get_bucket("test_key", capacity=10, refill_rate=1.0)
 
         # Should have ~1 more token available (plus the one we consume)
         assert remaining > 0
@@ -55,7 +55,7 @@ class TestRateLimitStore:
 
         # Consume nothing, wait for refill
         time.sleep(0.2)
-        allowed, remaining = store.get_bucket("test_key", capacity=10, refill_rate=100.0)
+        allowed, remaining, _ = store.get_bucket("test_key", capacity=10, refill_rate=100.0)
 
         # Should not exceed 9 (capacity - consumed token)
         assert remaining <= 9.0
@@ -69,7 +69,7 @@ class TestRateLimitStore:
             store.get_bucket("key1", capacity=10, refill_rate=0)
 
         # key2 should still have tokens
-        allowed, remaining = store.get_bucket("key2", capacity=10, refill_rate=0)
+        allowed, remaining, _ = store.get_bucket("key2", capacity=10, refill_rate=0)
         assert allowed is True
         assert remaining == 9.0
 
@@ -82,8 +82,8 @@ class TestRateLimitStore:
         store.get_bucket("new_key", capacity=10, refill_rate=0)
 
         # Manually set old_key's last_refill to past
-        import time as time_module
-        store._buckets["old_key"]["last_refill"] = time_module.time() - 4000
+        from app.middleware.rate_limiter import _MS_MASK, _now_ms, _pack
+        store._buckets["old_key"] = _pack(9000, (_now_ms() - 4_000_000) & _MS_MASK)
 
         # Cleanup with 1 hour threshold
         store.cleanup_old_buckets(max_age_seconds=3600)
@@ -92,24 +92,86 @@ class TestRateLimitStore:
         assert "old_key" not in store._buckets
         assert "new_key" in store._buckets
 
+    def test_idle_buckets_swept_in_bounded_batches(self):
+        """Checks periodically drop a bounded batch of idle buckets."""
+        from unittest.mock import patch
+        from app.middleware.rate_limiter import _SWEEP_BATCH, _SWEEP_EVERY
+
+        store = RateLimitStore(max_age_seconds=60)
+        clock = [1_000]
+        with patch("app.middleware.rate_limiter._now_ms", side_effect=lambda: clock[0]):
+            for i in range(200):
+                store.get_bucket(f"idle_{i}", capacity=10, refill_rate=0)
+
+            clock[0] += 61_000
+            store.get_bucket("idle_0", capacity=10, refill_rate=0)  # touched again
+            for _ in range(_SWEEP_EVERY - 202):
+                store.get_bucket("active", capacity=10, refill_rate=1.0)
+            assert len(store._buckets) == 201
+            store.get_bucket("active", capacity=10, refill_rate=1.0)
+
+        assert len(store._buckets) == 201 - _SWEEP_BATCH
+        assert "idle_1" not in store._buckets
+        assert "idle_0" in store._buckets and "active" in store._buckets
+
     def test_zero_refill_rate(self):
         """Test with zero refill rate (bucket doesn't refill)."""
         store = RateLimitStore()
 
         for i in range(5):
-            allowed, _ = store.get_bucket("test", capacity=5, refill_rate=0)
+            allowed, _, _ = store.get_bucket("test", capacity=5, refill_rate=0)
             assert allowed is True
 
         # 6th should fail with no refill
-        allowed, _ = store.get_bucket("test", capacity=5, refill_rate=0)
+        allowed, _, _ = store.get_bucket("test", capacity=5, refill_rate=0)
         assert allowed is False
 
         # Wait and try again (no refill at rate=0)
         time.sleep(0.1)
-        allowed, _ = store.get_bucket("test", capacity=5, refill_rate=0)
+        allowed, _, _ = store.get_bucket("test", capacity=5, refill_rate=0)
         assert allowed is False
 
 
+    def test_frequent_calls_keep_fractional_refill(self):
+        """Calls closer than one millitoken apart still accumulate refill."""
+        from unittest.mock import patch
+
+        store = RateLimitStore()
+        clock = [1_000]
+        with patch("app.middleware.rate_limiter._now_ms", side_effect=lambda: clock[0]):
+            store.get_bucket("frequent", capacity=1, refill_rate=0)
+            assert store.get_bucket("frequent", capacity=1, refill_rate=0)[0] is False
+
+            # 0.1 millitoken/ms: a single ms adds nothing, 10s add one token
+            for _ in range(10_000):
+                clock[0] += 1
+                allowed, _, _ = store.get_bucket("frequent", capacity=1, refill_rate=0.1)
+                if allowed:
+                    break
+        assert allowed is True
+        assert clock[0] - 1_000 == 10_000
+
+    def test_reset_ms_until_next_token(self):
+        """reset_ms is 0 while tokens remain, time to the next token once empty."""
+        store = RateLimitStore()
+        _, _, reset_ms = store.get_bucket("reset", capacity=1, refill_rate=1.0)
+        # Bucket now empty: 1 token/s refills the next token in ~1000ms
+        assert reset_ms > 900
+
+        store = RateLimitStore()
+        _, _, reset_ms = store.get_bucket("reset", capacity=2, refill_rate=1.0)
+        assert reset_ms == 0
+
+    def test_bucket_state_is_single_int(self):
+        """Buckets are stored as one packed int, not a dict."""
+        store = RateLimitStore()
+        store.get_bucket("packed", capacity=10, refill_rate=0)
+
+        state = store._buckets["packed"]
+        assert isinstance(state, int)
+        assert state >> 32 == 9000
+
+
 class TestCheckRateLimitFunction:
     """Test check_rate_limit helper function."""
 
@@ -200,3 +262,265 @@ class TestRateLimitingAC6:
 
         # Should allow requests again
         assert check_rate_limit(user_key, limit=10, window=1) is True
+
+
+class TestConsume:
+    """Key derivation and token consumption in one call."""
+
+    def test_consume_keys_by_verified_user(self):
+        from fastapi import Request
+        from app.core.security import create_access_token
+        from app.middleware.rate_limiter import consume
+
+        token = create_access_token(data={"user_id": 7})
+        request = Request({
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("10.0.0.1", 1234),
+        })
+        store = RateLimitStore()
+
+        key, allowed, remaining, reset_ms = consume(request, "/api/ia/query", 2, 2 / 60, store=store)
+        assert key == ("user", 7, "/api/ia/query")
+        assert (allowed, remaining, reset_ms) == (True, 1.0, 0)
+
+    def test_consume_ip_fallback_without_token(self):
+        from app.middleware.rate_limiter import consume
+
+        scope = {"type": "http", "headers": [], "client": ("10.0.0.1", 1234)}
+        store = RateLimitStore()
+
+        key, allowed, _, _ = consume(scope, "/api/ia/query", 1, 1 / 60, store=store)
+        assert key == ("ip", "10.0.0.1", "/api/ia/query")
+        assert allowed is True
+        _, allowed, _, reset_ms = consume(scope, "/api/ia/query", 1, 1 / 60, store=store)
+        assert allowed is False
+        assert reset_ms > 0
+
+
+class TestRateLimitMiddleware:
+    """Pure ASGI middleware: buckets checked before routing."""
+
+    @pytest.fixture
+    def limited_app(self):
+        from fastapi import FastAPI
+        from app.middleware.rate_limiter import RateLimitMiddleware
+
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, store=RateLimitStore())
+        calls = []
+
+        @app.get("/api/ia/health")
+        async def ia_health():
+            calls.append(1)
+            return {"status": "ok"}
+
+        @app.post("/api/ia/query")
+        async def ia_query():
+            calls.append(1)
+            return {"answer": "ok"}
+
+        @app.get("/api/other")
+        async def other():
+            return {"ok": True}
+
+        return app, calls
+
+    def test_over_limit_rejected_without_calling_app(self, limited_app):
+        from fastapi.testclient import TestClient
+
+        app, calls = limited_app
+        client = TestClient(app)
+
+        for _ in range(20):
+            response = client.get("/api/ia/health")
+            assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "20"
+
+        response = client.get("/api/ia/health")
+        assert response.status_code == 429
+        assert response.json() == {
+            "detail": "Rate limit exceeded: 20 requests per 60 seconds",
+            "retry_after": 60
+        }
+        assert response.headers["Retry-After"] == "60"
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+        assert len(calls) == 20
+
+    def test_user_buckets_keyed_by_verified_user_id(self, limited_app):
+        from fastapi.testclient import TestClient
+        from app.core.security import create_access_token
+
+        app, _ = limited_app
+        client = TestClient(app)
+        user1 = {"Authorization": f"Bearer {create_access_token(data={'user_id': 1})}"}
+        user2 = {"Authorization": f"Bearer {create_access_token(data={'user_id': 2})}"}
+
+        for _ in range(10):
+            assert client.post("/api/ia/query", headers=user1).status_code == 200
+        assert client.post("/api/ia/query", headers=user1).status_code == 429
+        # Tokens share their first characters (JWT header): separate buckets anyway
+        assert client.post("/api/ia/query", headers=user2).status_code == 200
+
+    def test_reset_header_is_now_while_tokens_remain(self, limited_app):
+        import time
+        from fastapi.testclient import TestClient
+
+        app, _ = limited_app
+        before = int(time.time())
+        response = TestClient(app).get("/api/ia/health")
+        assert int(response.headers["X-RateLimit-Reset"]) in (before, before + 1)
+
+    def test_reject_headers_precomputed_per_limit(self, limited_app):
+        import time
+        from fastapi.testclient import TestClient
+
+        app, _ = limited_app
+        client = TestClient(app)
+        for _ in range(20):
+            client.get("/api/ia/health")
+
+        before = int(time.time())
+        response = client.get("/api/ia/health")
+        assert response.status_code == 429
+        assert response.headers["Content-Length"] == str(len(response.content))
+        assert response.headers["X-RateLimit-Limit"] == "20"
+        # 20 per 60s: next token within 3 seconds
+        reset = int(response.headers["X-RateLimit-Reset"])
+        assert before < reset <= int(time.time()) + 3
+
+    def test_reset_header_cached_within_same_second(self, monkeypatch):
+        from app.middleware import rate_limiter
+
+        monkeypatch.setattr(rate_limiter.time, "time", lambda: 1000.2)
+        first = rate_limiter._reset_header(60_000)
+        monkeypatch.setattr(rate_limiter.time, "time", lambda: 1000.9)
+        assert rate_limiter._reset_header(60_000) is first
+        assert first == (b"x-ratelimit-reset", b"1060")
+
+        monkeypatch.setattr(rate_limiter.time, "time", lambda: 1001.0)
+        assert rate_limiter._reset_header(60_000) == (b"x-ratelimit-reset", b"1061")
+        # Partial seconds round up
+        assert rate_limiter._reset_header(1) == (b"x-ratelimit-reset", b"1002")
+
+    def test_sub_paths_share_the_configured_path_key(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.middleware.rate_limiter import RateLimitMiddleware
+
+        store = RateLimitStore()
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, store=store)
+        middleware = RateLimitMiddleware(app, store=store)
+        configured = next(p for p in middleware._limit_by_prefix if p == "/api/ia/health")
+
+        client = TestClient(app)
+        client.get("/api/ia/health")
+        client.get("/api/ia/health/a")
+        client.get("/api/ia/health/b")
+
+        (key,) = store._buckets
+        assert key == ("ip", "testclient", "/api/ia/health")
+        # Same str object as the configured path, not the request's
+        assert key[2] is configured
+
+    def test_refill_rate_precomputed_per_endpoint(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.middleware.rate_limiter import RateLimitMiddleware
+
+        class RecordingStore(RateLimitStore):
+            def __init__(self):
+                super().__init__()
+                self.rates = []
+
+            def get_bucket(self, key, capacity, refill_rate):
+                self.rates.append((capacity, refill_rate))
+                return super().get_bucket(key, capacity, refill_rate)
+
+        store = RecordingStore()
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, store=store)
+
+        @app.get("/api/ia/health")
+        async def ia_health():
+            return {"status": "ok"}
+
+        client = TestClient(app)
+        client.get("/api/ia/health")
+        client.get("/api/ia/health/extra")
+
+        assert store.rates == [(20, 20 / 60), (20, 20 / 60)]
+
+    def test_bucket_keys_are_tuples(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.core.security import create_access_token
+        from app.middleware.rate_limiter import RateLimitMiddleware
+
+        store = RateLimitStore()
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, store=store)
+
+        @app.post("/api/ia/query")
+        async def ia_query():
+            return {}
+
+        client = TestClient(app)
+        client.post("/api/ia/query")
+        client.post(
+            "/api/ia/query",
+            headers={"Authorization": f"Bearer {create_access_token(data={'user_id': 3})}"}
+        )
+
+        assert set(store._buckets) == {
+            ("ip", "testclient", "/api/ia/query"),
+            ("user", 3, "/api/ia/query"),
+        }
+
+    def test_unlimited_paths_pass_through(self, limited_app):
+        from fastapi.testclient import TestClient
+
+        app, _ = limited_app
+        response = TestClient(app).get("/api/other")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+
+    def test_prefix_match_uses_endpoint_limit(self, limited_app):
+        from fastapi.testclient import TestClient
+        from app.middleware.rate_limiter import RateLimitMiddleware
+
+        app, _ = limited_app
+
+        @app.get("/api/ia/health/details")
+        async def ia_health_details():
+            return {"status": "ok"}
+
+        response = TestClient(app).get("/api/ia/health/details")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "20"
+
+        middleware = RateLimitMiddleware(app)
+        assert middleware._prefixes[0] == max(RateLimitMiddleware.ENDPOINT_LIMITS, key=len)
+
+    def test_token_verified_once_per_request(self, limited_app):
+        """The auth path reuses the payload verified by the rate limiter."""
+        from unittest.mock import patch
+        from fastapi import Request
+        from fastapi.testclient import TestClient
+        from app.core import security
+        from app.core.security import create_access_token, verify_request_token
+
+        app, _ = limited_app
+
+        @app.get("/api/ia/retrieve")
+        async def retrieve(request: Request):
+            token = request.headers["Authorization"][7:]
+            return {"user_id": verify_request_token(token)["user_id"]}
+
+        headers = {"Authorization": f"Bearer {create_access_token(data={'user_id': 5})}"}
+        with patch("app.core.security.verify_token", wraps=security.verify_token) as mock_verify:
+            response = TestClient(app).get("/api/ia/retrieve", headers=headers)
+
+        assert response.json() == {"user_id": 5}
+        assert mock_verify.call_count == 1
@@ -371,3 +371,30 @@ async def test_search_excludes_unindexed(setup_fts5_table, sample_documents):
     result_ids = [r.document_id for r in results.results]
     unindexed_doc = [d for d in sample_documents if not d.is_indexed][0]
     assert unindexed_doc.id not in result_ids
+
+
+@pytest.mark.asyncio
+async def test_search_reflects_content_extracted_after_upload(setup_fts5_table, sample_documents):
+    """
+    Documento cargado sin content_text se indexa cuando la extracción lo actualiza,
+    y un nuevo UPDATE reemplaza los términos anteriores en el índice.
+    """
+    unindexed_doc = [d for d in sample_documents if not d.is_indexed][0]
+
+    unindexed_doc.content_text = "Instructivo de teletrabajo para equipos remotos"
+    setup_fts5_table.add(unindexed_doc)
+    setup_fts5_table.commit()
+
+    results = await SearchService.search_documents(
+        query="teletrabajo", limit=10, offset=0, db=setup_fts5_table
+    )
+    assert [r.document_id for r in results.results] == [unindexed_doc.id]
+
+    unindexed_doc.content_text = "Instructivo de trabajo presencial"
+    setup_fts5_table.add(unindexed_doc)
+    setup_fts5_table.commit()
+
+    results = await SearchService.search_documents(
+        query="teletrabajo", limit=10, offset=0, db=setup_fts5_table
+    )
+    assert results.total_results == 0
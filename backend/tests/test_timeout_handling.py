@@ -113,6 +113,54 @@ class TestDatabaseTimeoutHandling:
                 operation_name="slow_test_operation"
             )
 
+    @pytest.mark.asyncio
+    async def test_execute_with_timeout_uses_dedicated_db_executor(self):
+        """Test DB operations run on the db-op pool, not the default executor."""
+        import threading
+        from app.database import shutdown_db_executor
+
+        result = await execute_with_timeout(
+            operation=lambda: threading.current_thread().name,
+            timeout_ms=1000,
+            operation_name="thread_name_operation"
+        )
+        assert result.startswith("db-op")
+
+        # After shutdown (lifespan exit) the pool is recreated on next use
+        shutdown_db_executor()
+        result = await execute_with_timeout(
+            operation=lambda: threading.current_thread().name,
+            timeout_ms=1000,
+            operation_name="thread_name_operation"
+        )
+        assert result.startswith("db-op")
+
+    def test_statement_timeout_interrupts_sqlite_query(self):
+        """SQLite query is interrupted by the engine, freeing the worker."""
+        import time
+        from sqlalchemy import text
+        from sqlmodel import Session, create_engine
+        from app.database import run_with_statement_timeout
+
+        engine = create_engine("sqlite://")
+        slow_query = text(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+            "SELECT count(*) FROM c"
+        )
+        with Session(engine) as session:
+            start = time.perf_counter()
+            with pytest.raises(TimeoutError):
+                run_with_statement_timeout(
+                    session, lambda: session.exec(slow_query).fetchall(), timeout_ms=50
+                )
+            assert time.perf_counter() - start < 5
+
+            # The connection remains usable after the interrupt
+            fast = run_with_statement_timeout(
+                session, lambda: session.exec(text("SELECT 1")).scalar(), timeout_ms=50
+            )
+            assert fast == 1
+
     @pytest.mark.asyncio
     async def test_execute_with_timeout_default(self):
         """Test database operation uses default timeout from settings."""